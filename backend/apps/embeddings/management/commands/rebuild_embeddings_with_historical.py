@@ -3,19 +3,23 @@ Management command to rebuild embeddings with historical tags.
 
 This command re-processes all items with the enhanced tagging system that includes
 historical market behavior tags, then rebuilds the embeddings for improved AI search.
+Only items whose embedding source text changed (new tags, new historical analysis)
+are re-embedded; see services.embedding_refresh.
 
 Usage:
-    python manage.py rebuild_embeddings_with_historical [--items-limit 100] [--force]
+    python manage.py rebuild_embeddings_with_historical [--items-limit 100] [--force-embeddings]
 """
 
 import asyncio
 import logging
+from asgiref.sync import sync_to_async
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from typing import List
 
 from apps.items.models import Item
 from services.comprehensive_item_tagger import ComprehensiveItemTagger
+from services.embedding_refresh import embedding_refresh_pipeline
 from services.historical_data_service import HistoricalDataService
 from services.multi_agent_ai_service import MultiAgentAIService
 
@@ -45,6 +49,12 @@ class Command(BaseCommand):
             help='Skip historical data fetching and use existing data only'
         )
         
+        parser.add_argument(
+            '--force-embeddings',
+            action='store_true',
+            help='Re-embed selected items even if their embedding text is unchanged'
+        )
+        
         parser.add_argument(
             '--test-run',
             action='store_true',
@@ -70,6 +80,7 @@ class Command(BaseCommand):
         force_historical = options['force_historical']
         skip_historical = options['skip_historical']
         test_run = options['test_run']
+        force_embeddings = options['force_embeddings']
         use_multi_agent = options['use_multi_agent'] and not options['single_agent']
         
         self.stdout.write(
@@ -92,7 +103,8 @@ class Command(BaseCommand):
         try:
             stats = asyncio.run(
                 self._rebuild_embeddings_with_historical(
-                    items_limit, force_historical, skip_historical, test_run, use_multi_agent
+                    items_limit, force_historical, skip_historical, test_run, use_multi_agent,
+                    force_embeddings
                 )
             )
             
@@ -111,7 +123,8 @@ class Command(BaseCommand):
                                                 force_historical: bool,
                                                 skip_historical: bool,
                                                 test_run: bool,
-                                                use_multi_agent: bool) -> dict:
+                                                use_multi_agent: bool,
+                                                force_embeddings: bool = False) -> dict:
         """Rebuild embeddings with historical data integration."""
         
         stats = {
@@ -119,6 +132,7 @@ class Command(BaseCommand):
             'historical_analyses_created': 0,
             'items_retagged': 0,
             'embeddings_rebuilt': 0,
+            'embeddings_unchanged': 0,
             'errors': 0
         }
         
@@ -148,8 +162,10 @@ class Command(BaseCommand):
         
         # Step 3: Rebuild embeddings with new tags
         self.stdout.write('🔄 Rebuilding embeddings...')
-        embedding_stats = await self._rebuild_embeddings(items, test_run)
-        stats['embeddings_rebuilt'] = embedding_stats.get('embeddings_created', 0)
+        embedding_stats = await self._rebuild_embeddings(items, test_run, force_embeddings)
+        stats['embeddings_rebuilt'] = embedding_stats.get('embedded', 0)
+        stats['embeddings_unchanged'] = embedding_stats.get('unchanged', 0)
+        stats['errors'] += embedding_stats.get('failed', 0)
         
         stats['items_processed'] = len(items)
         
@@ -245,151 +261,16 @@ class Command(BaseCommand):
         
         return stats
     
-    async def _rebuild_embeddings(self, items: List[Item], test_run: bool) -> dict:
-        """Rebuild embeddings for items with new tags."""
-        stats = {'embeddings_created': 0, 'errors': 0}
-        
+    async def _rebuild_embeddings(self, items: List[Item], test_run: bool, force: bool = False) -> dict:
+        """Re-embed the items whose source text changed (all of them with force)."""
         if test_run:
             self.stdout.write(self.style.WARNING('[TEST RUN] Skipping embeddings rebuild'))
-            return stats
+            return {}
         
-        # Import embedding service
-        try:
-            from services.embedding_service import EmbeddingService
-            embedding_service = EmbeddingService()
-        except ImportError:
-            self.stdout.write(
-                self.style.WARNING('EmbeddingService not available - skipping embedding rebuild')
-            )
-            return stats
-        
-        # Process items in smaller batches for embeddings
-        batch_size = 25
-        for i in range(0, len(items), batch_size):
-            batch = items[i:i + batch_size]
-            batch_num = i // batch_size + 1
-            total_batches = (len(items) + batch_size - 1) // batch_size
-            
-            self.stdout.write(f'Rebuilding embeddings batch {batch_num}/{total_batches}')
-            
-            for item in batch:
-                try:
-                    # Get enhanced item description with all tags
-                    enhanced_description = await self._get_enhanced_item_description(item)
-                    
-                    # Rebuild embedding
-                    await embedding_service.create_embedding(
-                        item_id=item.item_id,
-                        description=enhanced_description,
-                        replace_existing=True
-                    )
-                    
-                    stats['embeddings_created'] += 1
-                    
-                except Exception as e:
-                    stats['errors'] += 1
-                    logger.error(f"Error creating embedding for {item.name}: {e}")
-            
-            # Small delay between batches
-            await asyncio.sleep(0.5)
+        queryset = Item.objects.filter(pk__in=[item.pk for item in items])
+        stats = await sync_to_async(embedding_refresh_pipeline.refresh)(items=queryset, force=force)
         
+        self.stdout.write(
+            f"  ✅ {stats['embedded']} re-embedded, {stats['unchanged']} unchanged, {stats['failed']} failed"
+        )
         return stats
-    
-    async def _get_enhanced_item_description(self, item: Item) -> str:
-        """Get enhanced item description with all tags for embeddings."""
-        # Base item information
-        description_parts = [
-            f"Item: {item.name}",
-            f"OSRS item ID: {item.item_id}"
-        ]
-        
-        if item.examine:
-            description_parts.append(f"Description: {item.examine}")
-        
-        # Add profit information if available
-        if hasattr(item, 'profit_calc') and item.profit_calc:
-            profit_calc = item.profit_calc
-            description_parts.extend([
-                f"Current price: {profit_calc.current_buy_price or 0:,} GP",
-                f"Profit potential: {profit_calc.current_profit or 0:,} GP",
-                f"Profit margin: {profit_calc.current_profit_margin or 0:.1f}%",
-                f"Daily volume: {profit_calc.daily_volume or 0:,}"
-            ])
-        
-        # Add all tags from categories
-        tag_categories = await self._get_item_tag_categories(item)
-        if tag_categories:
-            # Group tags by category for better semantic understanding
-            tag_descriptions = []
-            for category, tags in tag_categories.items():
-                if tags:
-                    tag_descriptions.append(f"{category}: {', '.join(tags)}")
-            
-            if tag_descriptions:
-                description_parts.append("Market characteristics: " + " | ".join(tag_descriptions))
-        
-        # Add historical context if available
-        try:
-            from apps.prices.models import HistoricalAnalysis
-            analysis = await HistoricalAnalysis.objects.aget(item=item)
-            
-            historical_parts = []
-            if analysis.trend_30d:
-                historical_parts.append(f"30d trend: {analysis.trend_30d}")
-            if analysis.volatility_30d:
-                vol_desc = "high" if analysis.volatility_30d > 0.3 else "low" if analysis.volatility_30d < 0.1 else "medium"
-                historical_parts.append(f"volatility: {vol_desc}")
-            if analysis.current_price_percentile_30d:
-                percentile = analysis.current_price_percentile_30d
-                if percentile > 80:
-                    historical_parts.append("near 30d highs")
-                elif percentile < 20:
-                    historical_parts.append("near 30d lows")
-            
-            if historical_parts:
-                description_parts.append("Historical context: " + ", ".join(historical_parts))
-                
-        except HistoricalAnalysis.DoesNotExist:
-            pass
-        except Exception as e:
-            logger.warning(f"Error getting historical context for {item.name}: {e}")
-        
-        return " | ".join(description_parts)
-    
-    async def _get_item_tag_categories(self, item: Item) -> dict:
-        """Get item tags organized by category."""
-        from apps.items.models import ItemCategoryMapping
-        
-        tag_categories = {}
-        
-        # Get all tag mappings for this item
-        mappings = [
-            mapping async for mapping in ItemCategoryMapping.objects.filter(item=item)
-            .select_related('category')
-        ]
-        
-        # Organize by category type (this is a simplified categorization)
-        category_mapping = {
-            'price': ['under-1k', '1k-5k', '5k-25k', '25k-100k', '100k-1m', '1m-plus'],
-            'type': ['weapon', 'armor', 'consumable', 'material', 'rare', 'potion', 'food'],
-            'trading': ['bulk-flip', 'high-margin', 'quick-flip', 'scalable', 'volume-play'],
-            'behavior': ['stable', 'volatile', 'trending-up', 'trending-down', 'seasonal'],
-            'capital': ['micro-capital', 'small-capital', 'medium-capital', 'large-capital', 'whale-capital'],
-            'risk': ['low-risk', 'medium-risk', 'high-risk'],
-            'liquidity': ['high-liquidity', 'medium-liquidity', 'low-liquidity'],
-            'historical': ['historically-stable', 'historically-volatile', 'long-term-uptrend', 
-                          'breaking-resistance', 'at-historical-high', 'low-volatility-30d']
-        }
-        
-        for mapping in mappings:
-            tag_name = mapping.category.name
-            
-            # Find which category this tag belongs to
-            for category, tags in category_mapping.items():
-                if tag_name in tags:
-                    if category not in tag_categories:
-                        tag_categories[category] = []
-                    tag_categories[category].append(tag_name)
-                    break
-        
-        return tag_categories
\ No newline at end of file
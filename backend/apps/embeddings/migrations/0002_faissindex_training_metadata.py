@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("embeddings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faissindex",
+            name="index_params",
+            field=models.JSONField(
+                default=dict,
+                help_text="Construction/search parameters (HNSW M, IVF nlist, ...)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="faissindex",
+            name="is_trained",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="faissindex",
+            name="training_vectors",
+            field=models.IntegerField(
+                default=0, help_text="Vectors used to train the index"
+            ),
+        ),
+        migrations.AddField(
+            model_name="faissindex",
+            name="training_seconds",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="faissindex",
+            name="last_trained",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="faissindex",
+            name="rebuild_seconds",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="faissindex",
+            name="rebuild_count",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("embeddings", "0002_faissindex_training_metadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="itemembedding",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Hash of the normalized source text and model (see compute_content_hash)",
+                max_length=64,
+            ),
+        ),
+    ]
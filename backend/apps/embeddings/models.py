@@ -1,9 +1,19 @@
+import hashlib
+import re
+
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
 from apps.items.models import Item
 import numpy as np
 
 
+# Numbers in source text are compared at this many significant digits, so
+# price jitter ("1,234 GP" -> "1,236 GP") does not count as a content change
+CONTENT_HASH_SIGNIFICANT_DIGITS = 2
+_NUMBER_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
 class ItemEmbedding(models.Model):
     """
     Stores vector embeddings for items to enable semantic search.
@@ -22,6 +32,10 @@ class ItemEmbedding(models.Model):
     
     # Text used for embedding
     source_text = models.TextField(help_text="Text that was embedded")
+    content_hash = models.CharField(
+        max_length=64, blank=True, db_index=True,
+        help_text="Hash of the normalized source text and model (see compute_content_hash)"
+    )
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -66,8 +80,45 @@ class ItemEmbedding(models.Model):
             profit_calc = item.profit_calc
             cls._add_profit_analysis_context(parts, profit_calc)
         
+        # Long-term market behaviour
+        if hasattr(item, 'historical_analysis') and item.historical_analysis:
+            cls._add_historical_context(parts, item.historical_analysis)
+        
         return " | ".join(parts)
     
+    @staticmethod
+    def _round_number(match) -> str:
+        value = float(match.group().replace(',', ''))
+        rounded = float(f"{value:.{CONTENT_HASH_SIGNIFICANT_DIGITS}g}")
+        return str(int(rounded)) if rounded.is_integer() else str(rounded)
+    
+    @classmethod
+    def normalize_source_text(cls, source_text: str) -> str:
+        """
+        Normalize source text for change detection.
+        
+        Lowercases, collapses whitespace and rounds numbers to
+        CONTENT_HASH_SIGNIFICANT_DIGITS, so only meaningful edits (names,
+        examine text, categories, strategy context, price magnitude) change it.
+        """
+        text = _WHITESPACE_PATTERN.sub(' ', (source_text or '').lower()).strip()
+        return _NUMBER_PATTERN.sub(cls._round_number, text)
+    
+    @classmethod
+    def compute_content_hash(cls, source_text: str, model_name: str) -> str:
+        """
+        Hash the normalized source text together with the embedding model.
+        
+        Args:
+            source_text: Text from create_source_text
+            model_name: Embedding model (a model change invalidates every hash)
+            
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = f"{model_name}\n{cls.normalize_source_text(source_text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
     @classmethod
     def _add_flipping_context(cls, parts: list, item):
         """Add flipping-specific embedding context."""
@@ -300,6 +351,25 @@ class ItemEmbedding(models.Model):
             parts.append("Very low trading volume")
             parts.append("Poor liquidity not recommended for active strategies")
     
+    @classmethod
+    def _add_historical_context(cls, parts: list, analysis):
+        """Add 30-day trend, volatility and price position context."""
+        if analysis.trend_30d:
+            parts.append(f"30d trend: {analysis.trend_30d}")
+        
+        if analysis.volatility_30d:
+            if analysis.volatility_30d > 0.3:
+                parts.append("Historically volatile price")
+            elif analysis.volatility_30d < 0.1:
+                parts.append("Historically stable price")
+        
+        percentile = analysis.current_price_percentile_30d
+        if percentile is not None:
+            if percentile > 80:
+                parts.append("Trading near 30d highs")
+            elif percentile < 20:
+                parts.append("Trading near 30d lows")
+    
     @property
     def vector_numpy(self):
         """Return the vector as a numpy array."""
@@ -408,6 +478,15 @@ class FaissIndex(models.Model):
     dimension = models.IntegerField(help_text="Vector dimension")
     index_type = models.CharField(max_length=50, help_text="FAISS index type (e.g., IndexFlatIP)")
     num_vectors = models.IntegerField(default=0)
+    index_params = models.JSONField(default=dict, help_text="Construction/search parameters (HNSW M, IVF nlist, ...)")
+    
+    # Training / rebuild metadata
+    is_trained = models.BooleanField(default=False)
+    training_vectors = models.IntegerField(default=0, help_text="Vectors used to train the index")
+    training_seconds = models.FloatField(default=0.0)
+    last_trained = models.DateTimeField(null=True, blank=True)
+    rebuild_seconds = models.FloatField(default=0.0)
+    rebuild_count = models.IntegerField(default=0)
     
     # File paths
     index_file_path = models.CharField(max_length=500, help_text="Path to FAISS index file")
@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from django.db import models
 from django.utils import timezone
 
@@ -40,6 +42,58 @@ class Item(models.Model):
     def __str__(self):
         return f"{self.name} (ID: {self.item_id})"
     
+    # Mapping columns compared and refreshed by bulk_upsert
+    UPSERT_UPDATE_FIELDS = [
+        'name', 'examine', 'icon', 'value', 'high_alch', 'low_alch', 'limit', 'members', 'is_active',
+    ]
+    
+    @classmethod
+    def bulk_upsert(cls, items: List['Item'], batch_size: int = 1000) -> Dict[str, List[int]]:
+        """
+        Insert new items and update changed ones from unsaved Item instances.
+        
+        Existing rows are diffed in memory against the incoming values so only
+        new or changed items are written, in one INSERT ... ON CONFLICT per
+        batch. Duplicate item IDs are collapsed (last one wins).
+        
+        Args:
+            items: Unsaved Item instances (e.g. built from the /mapping payload)
+            batch_size: Rows per upsert statement
+            
+        Returns:
+            Dict with 'created', 'updated' and 'unchanged' lists of OSRS item IDs
+        """
+        incoming = {item.item_id: item for item in items}
+        existing = {
+            row[0]: row[1:]
+            for row in cls.objects.values_list('item_id', *cls.UPSERT_UPDATE_FIELDS).iterator(chunk_size=5000)
+        }
+        
+        result = {'created': [], 'updated': [], 'unchanged': []}
+        to_write = []
+        for item_id, item in incoming.items():
+            current = existing.get(item_id)
+            if current is None:
+                result['created'].append(item_id)
+            elif current != tuple(getattr(item, field) for field in cls.UPSERT_UPDATE_FIELDS):
+                result['updated'].append(item_id)
+            else:
+                result['unchanged'].append(item_id)
+                continue
+            to_write.append(item)
+        
+        if to_write:
+            # updated_at is auto_now, so bulk_create stamps it on both paths
+            cls.objects.bulk_create(
+                to_write,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['item_id'],
+                update_fields=cls.UPSERT_UPDATE_FIELDS + ['updated_at'],
+            )
+        
+        return result
+    
     @property
     def base_profit_per_item(self):
         """
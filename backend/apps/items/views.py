@@ -17,7 +17,7 @@ from .serializers import (
     ItemListSerializer, ItemDetailSerializer, SearchResponseSerializer,
     ProfitRecommendationsSerializer, SearchResultSerializer
 )
-from services.search_service import HybridSearchService
+from services.search_runtime import get_search_service
 from services.ai_service import SyncOpenRouterAIService
 
 logger = logging.getLogger(__name__)
@@ -148,7 +148,7 @@ def search_items(request):
             members_only = members_only.lower() == 'true'
         
         # Perform search
-        search_service = HybridSearchService()
+        search_service = get_search_service()
         results = search_service.search_items(
             query=query,
             limit=limit,
@@ -193,7 +193,7 @@ def get_similar_items(request, item_id):
         limit = min(int(request.query_params.get('limit', 10)), 20)
         threshold = float(request.query_params.get('threshold', 0.3))
         
-        search_service = HybridSearchService()
+        search_service = get_search_service()
         similar_items = search_service.get_similar_items(
             item_id=item_id,
             limit=limit,
@@ -238,7 +238,7 @@ def get_profit_recommendations(request):
         if max_risk_level not in ['low', 'medium', 'high']:
             max_risk_level = 'medium'
         
-        search_service = HybridSearchService()
+        search_service = get_search_service()
         recommendations = search_service.get_profit_recommendations(
             limit=limit,
             min_profit_margin=min_profit_margin,
@@ -336,7 +336,7 @@ def api_health_check(request):
         item_count = Item.objects.count()
         
         # Test search service
-        search_service = HybridSearchService()
+        search_service = get_search_service()
         
         # Test AI service
         ai_service = SyncOpenRouterAIService()
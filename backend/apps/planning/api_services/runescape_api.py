@@ -3,12 +3,11 @@ RuneScape API service for fetching item data and prices.
 """
 
 import logging
-import requests
 from typing import Dict, List, Any, Optional
 from django.conf import settings
 from django.core.cache import cache
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from services.http_transport import HttpTransportError, http_transport
 
 logger = logging.getLogger(__name__)
 
@@ -20,21 +19,9 @@ class RuneScapeAPIService:
         self.base_url = getattr(settings, 'RUNESCAPE_API_BASE_URL', 'https://prices.runescape.wiki/api/v1/osrs')
         self.user_agent = getattr(settings, 'RUNESCAPE_USER_AGENT', 'OSRS_High_Alch_Tracker - @latchy Discord')
         
-        # Configure session with retries
-        self.session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"],
-            backoff_factor=1
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
-        self.session.headers.update({
-            'User-Agent': self.user_agent
-        })
+        # Pooled, rate-limited transport shared with the async API clients
+        # (retries, ETag/Last-Modified revalidation, request coalescing)
+        self.transport = http_transport
     
     def get_latest_prices(self, use_cache: bool = True) -> Dict[str, Any]:
         """
@@ -57,10 +44,7 @@ class RuneScapeAPIService:
         
         try:
             logger.info("📈 Fetching latest prices from RuneScape API...")
-            response = self.session.get(f"{self.base_url}/latest", timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self.transport.get_json_sync(f"{self.base_url}/latest", timeout=30)
             
             # Cache the data
             if use_cache:
@@ -69,7 +53,7 @@ class RuneScapeAPIService:
             logger.info(f"✅ Fetched price data for {len(data.get('data', {}))} items")
             return data
             
-        except requests.exceptions.RequestException as e:
+        except HttpTransportError as e:
             logger.error(f"❌ Failed to fetch latest prices: {e}")
             raise
         except Exception as e:
@@ -97,10 +81,7 @@ class RuneScapeAPIService:
         
         try:
             logger.info("📊 Fetching 5-minute prices from RuneScape API...")
-            response = self.session.get(f"{self.base_url}/5m", timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self.transport.get_json_sync(f"{self.base_url}/5m", timeout=30)
             
             # Cache the data
             if use_cache:
@@ -109,7 +90,7 @@ class RuneScapeAPIService:
             logger.info(f"✅ Fetched 5m price data for {len(data.get('data', {}))} items")
             return data
             
-        except requests.exceptions.RequestException as e:
+        except HttpTransportError as e:
             logger.error(f"❌ Failed to fetch 5m prices: {e}")
             raise
         except Exception as e:
@@ -137,10 +118,7 @@ class RuneScapeAPIService:
         
         try:
             logger.info("📊 Fetching 1-hour prices from RuneScape API...")
-            response = self.session.get(f"{self.base_url}/1h", timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self.transport.get_json_sync(f"{self.base_url}/1h", timeout=30)
             
             # Cache the data
             if use_cache:
@@ -149,7 +127,7 @@ class RuneScapeAPIService:
             logger.info(f"✅ Fetched 1h price data for {len(data.get('data', {}))} items")
             return data
             
-        except requests.exceptions.RequestException as e:
+        except HttpTransportError as e:
             logger.error(f"❌ Failed to fetch 1h prices: {e}")
             raise
         except Exception as e:
@@ -177,10 +155,7 @@ class RuneScapeAPIService:
         
         try:
             logger.info("📦 Fetching item mapping from RuneScape API...")
-            response = self.session.get(f"{self.base_url}/mapping", timeout=60)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self.transport.get_json_sync(f"{self.base_url}/mapping", timeout=60)
             
             # Cache the data
             if use_cache:
@@ -189,7 +164,7 @@ class RuneScapeAPIService:
             logger.info(f"✅ Fetched mapping data for {len(data)} items")
             return data
             
-        except requests.exceptions.RequestException as e:
+        except HttpTransportError as e:
             logger.error(f"❌ Failed to fetch item mapping: {e}")
             raise
         except Exception as e:
@@ -215,14 +190,11 @@ class RuneScapeAPIService:
                 params['id'] = item_id
             
             logger.info(f"📊 Fetching {timestep} timeseries data...")
-            response = self.session.get(url, params=params, timeout=60)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self.transport.get_json_sync(url, params=params, timeout=60)
             logger.info(f"✅ Fetched timeseries data")
             return data
             
-        except requests.exceptions.RequestException as e:
+        except HttpTransportError as e:
             logger.error(f"❌ Failed to fetch timeseries data: {e}")
             raise
         except Exception as e:
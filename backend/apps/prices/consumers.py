@@ -15,7 +15,9 @@ from django.utils import timezone
 from django.contrib.auth.models import AnonymousUser
 
 from services.reactive_trading_engine import ReactiveTradingEngine, MarketEvent, RecommendationUpdate
-from apps.prices.models import HistoricalPricePoint, PriceTrend, MarketAlert
+from services.websocket_fanout import TRADING_ALL_GROUP, chart_group, item_group, route_group
+from services.chart_data_service import chart_data_service
+from apps.prices.models import PriceTrend, MarketAlert
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +39,7 @@ class TradingIntelligenceConsumer(AsyncWebsocketConsumer):
         self.trading_engine: Optional[ReactiveTradingEngine] = None
         self.user_id: Optional[int] = None
         self.subscriptions: set = set()
-        self.group_name = "trading_intelligence"
+        self.group_name = TRADING_ALL_GROUP  # Left once the socket subscribes to specific items
     
     async def connect(self):
         """Handle WebSocket connection."""
@@ -81,11 +83,16 @@ class TradingIntelligenceConsumer(AsyncWebsocketConsumer):
             if self.trading_engine:
                 await self.trading_engine.unsubscribe_from_updates(self.channel_name)
             
-            # Leave the trading intelligence group
+            # Leave the trading intelligence group and every subscription group
             await self.channel_layer.group_discard(
                 self.group_name,
                 self.channel_name
             )
+            for subscription in self.subscriptions:
+                await self.channel_layer.group_discard(
+                    self._subscription_group(subscription),
+                    self.channel_name
+                )
             
             logger.info(f"Trading intelligence WebSocket disconnected: {self.channel_name}")
             
@@ -141,7 +148,11 @@ class TradingIntelligenceConsumer(AsyncWebsocketConsumer):
         
         # Add to subscriptions
         subscription_key = f"item_{item_id}"
+        if not self._has_item_subscriptions():
+            # Item subscribers only receive their items, not the broad stream
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
         self.subscriptions.add(subscription_key)
+        await self.channel_layer.group_add(item_group(item_id), self.channel_name)
         
         # Subscribe to item-specific updates in trading engine
         if self.trading_engine:
@@ -166,6 +177,7 @@ class TradingIntelligenceConsumer(AsyncWebsocketConsumer):
         # Add to subscriptions
         subscription_key = f"route_{route_type}"
         self.subscriptions.add(subscription_key)
+        await self.channel_layer.group_add(route_group(route_type), self.channel_name)
         
         # Subscribe to route-specific updates in trading engine
         if self.trading_engine:
@@ -181,7 +193,7 @@ class TradingIntelligenceConsumer(AsyncWebsocketConsumer):
         """Handle unsubscription from updates."""
         subscription = data.get('subscription')
         if subscription in self.subscriptions:
-            self.subscriptions.remove(subscription)
+            await self._leave_subscription(subscription)
             
             # Unsubscribe from trading engine
             if self.trading_engine:
@@ -214,7 +226,7 @@ class TradingIntelligenceConsumer(AsyncWebsocketConsumer):
         
         # Handle as standard unsubscription
         if subscription_key in self.subscriptions:
-            self.subscriptions.remove(subscription_key)
+            await self._leave_subscription(subscription_key)
             
             # Unsubscribe from trading engine
             if self.trading_engine:
@@ -231,6 +243,23 @@ class TradingIntelligenceConsumer(AsyncWebsocketConsumer):
                 'message': f'No active subscription found for item {item_id}'
             }))
     
+    @staticmethod
+    def _subscription_group(subscription: str) -> str:
+        if subscription.startswith('item_'):
+            return item_group(subscription.replace('item_', ''))
+        return route_group(subscription.replace('route_', ''))
+    
+    def _has_item_subscriptions(self) -> bool:
+        return any(subscription.startswith('item_') for subscription in self.subscriptions)
+    
+    async def _leave_subscription(self, subscription: str):
+        """Drop a subscription and its channel group (rejoining the broad group after the last item)."""
+        self.subscriptions.remove(subscription)
+        await self.channel_layer.group_discard(self._subscription_group(subscription), self.channel_name)
+        
+        if subscription.startswith('item_') and not self._has_item_subscriptions():
+            await self.channel_layer.group_add(self.group_name, self.channel_name)
+    
     async def _handle_recommendations_request(self, data: Dict[str, Any]):
         """Handle request for current recommendations."""
         route_type = data.get('route_type', 'all')
@@ -307,6 +336,10 @@ class TradingIntelligenceConsumer(AsyncWebsocketConsumer):
     
     # Channel layer event handlers (called by ReactiveTrading Engine)
     
+    async def ws_frame(self, event):
+        """Relay a frame the engine already serialized for the whole group."""
+        await self.send(text_data=event['text'])
+    
     async def market_event_update(self, event):
         """Handle market event updates from channel layer."""
         try:
@@ -393,12 +426,6 @@ class PriceChartsConsumer(AsyncWebsocketConsumer):
         """Handle WebSocket connection for price charts."""
         await self.accept()
         
-        # Join the price charts group
-        await self.channel_layer.group_add(
-            "price_charts",
-            self.channel_name
-        )
-        
         await self.send(text_data=json.dumps({
             'type': 'chart_connection_established',
             'timestamp': timezone.now().isoformat()
@@ -408,10 +435,8 @@ class PriceChartsConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
-        await self.channel_layer.group_discard(
-            "price_charts",
-            self.channel_name
-        )
+        for item_id in self.subscribed_items:
+            await self.channel_layer.group_discard(chart_group(item_id), self.channel_name)
         
         logger.info(f"Price charts WebSocket disconnected: {self.channel_name}")
     
@@ -428,6 +453,7 @@ class PriceChartsConsumer(AsyncWebsocketConsumer):
                 if item_id:
                     self.subscribed_items.add(item_id)
                     self.chart_timeframe = timeframe
+                    await self.channel_layer.group_add(chart_group(item_id), self.channel_name)
                     
                     # Send historical chart data
                     await self._send_historical_chart_data(item_id, timeframe)
@@ -442,6 +468,7 @@ class PriceChartsConsumer(AsyncWebsocketConsumer):
                 item_id = data.get('item_id')
                 if item_id in self.subscribed_items:
                     self.subscribed_items.remove(item_id)
+                    await self.channel_layer.group_discard(chart_group(item_id), self.channel_name)
                     
                     await self.send(text_data=json.dumps({
                         'type': 'chart_unsubscription_confirmed',
@@ -454,65 +481,19 @@ class PriceChartsConsumer(AsyncWebsocketConsumer):
     async def _send_historical_chart_data(self, item_id: int, timeframe: str):
         """Send historical chart data for initial chart population."""
         try:
-            # Get historical data based on timeframe
-            hours_back = 24 if timeframe == '5m' else 168  # 24h for 5m, 1 week for 1h
-            
-            historical_data = await self._get_historical_chart_data(item_id, hours_back)
-            
-            await self.send(text_data=json.dumps({
-                'type': 'historical_chart_data',
-                'item_id': item_id,
-                'timeframe': timeframe,
-                'data': historical_data,
-                'timestamp': timezone.now().isoformat()
-            }))
+            frame = await self._get_historical_chart_frame(item_id, timeframe)
+            await self.send(text_data=frame)
             
         except Exception as e:
             logger.error(f"Error sending historical chart data: {e}")
     
     @database_sync_to_async
-    def _get_historical_chart_data(self, item_id: int, hours_back: int) -> list:
-        """Get historical price data for charts."""
-        try:
-            cutoff_time = timezone.now() - timezone.timedelta(hours=hours_back)
-            
-            historical_points = HistoricalPricePoint.objects.filter(
-                item__item_id=item_id,
-                timestamp__gte=cutoff_time
-            ).order_by('timestamp')[:500]  # Limit to 500 points
-            
-            return [
-                {
-                    'timestamp': point.timestamp.isoformat(),
-                    'high_price': point.high_price,
-                    'low_price': point.low_price,
-                    'high_volume': point.high_volume,
-                    'low_volume': point.low_volume
-                }
-                for point in historical_points
-            ]
-            
-        except Exception as e:
-            logger.error(f"Error querying historical chart data: {e}")
-            return []
+    def _get_historical_chart_frame(self, item_id: int, timeframe: str) -> str:
+        """Get the encoded historical chart frame (cached per item/timeframe bucket)."""
+        return chart_data_service.get_chart_frame(item_id, timeframe)
     
     # Channel layer event handlers
     
-    async def chart_price_update(self, event):
-        """Handle real-time price updates for charts."""
-        item_id = event.get('item_id')
-        
-        # Only send updates for subscribed items
-        if item_id in self.subscribed_items:
-            try:
-                await self.send(text_data=json.dumps({
-                    'type': 'chart_price_update',
-                    'item_id': item_id,
-                    'timestamp': event['timestamp'],
-                    'high_price': event['high_price'],
-                    'low_price': event['low_price'],
-                    'high_volume': event['high_volume'],
-                    'low_volume': event['low_volume']
-                }))
-            except Exception as e:
-                logger.error(f"Error sending chart price update: {e}")
\ No newline at end of file
+    async def ws_frame(self, event):
+        """Relay a chart frame already serialized for the item's group (subscribers only)."""
+        await self.send(text_data=event['text'])
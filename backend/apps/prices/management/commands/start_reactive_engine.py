@@ -3,6 +3,9 @@ Management command for starting the reactive trading engine.
 
 This command initializes and runs the reactive trading engine that continuously
 monitors market conditions and generates real-time trading intelligence.
+
+Run exactly one instance: engines share the price tick consumer group (so
+they would split the stream) and keep last known prices in process.
 """
 
 import asyncio
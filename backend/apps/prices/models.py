@@ -826,8 +826,22 @@ class HistoricalPricePoint(models.Model):
             models.Index(fields=['volume_weighted_price']),
         ]
     
+    # Columns refreshed when an upsert hits an existing (item, interval, timestamp) row
+    UPSERT_UPDATE_FIELDS = [
+        'avg_high_price', 'avg_low_price', 'high_price_volume', 'low_price_volume',
+        'volume_weighted_price', 'total_volume', 'price_spread', 'spread_percentage',
+        'data_source',
+    ]
+    
     def save(self, *args, **kwargs):
         # Calculate derived fields before saving
+        self.calculate_derived_fields()
+        super().save(*args, **kwargs)
+    
+    def calculate_derived_fields(self):
+        """Populate total volume, volume-weighted price and spread from the raw API fields."""
+        self.high_price_volume = self.high_price_volume or 0
+        self.low_price_volume = self.low_price_volume or 0
         self.total_volume = self.high_price_volume + self.low_price_volume
         
         if self.avg_high_price and self.avg_low_price and self.total_volume > 0:
@@ -847,8 +861,39 @@ class HistoricalPricePoint(models.Model):
             # Calculate spread percentage
             if self.volume_weighted_price and self.volume_weighted_price > 0:
                 self.spread_percentage = (self.price_spread / self.volume_weighted_price) * 100
+    
+    @classmethod
+    def bulk_upsert(cls, points: List['HistoricalPricePoint'], batch_size: int = 5000) -> int:
+        """
+        Insert or update many price points with set-based writes.
         
-        super().save(*args, **kwargs)
+        Derived columns are computed in memory (save() is bypassed by bulk_create),
+        duplicate keys are collapsed so each statement touches a row once, and rows
+        are upserted on the (item, interval, timestamp) unique key in large chunks.
+        
+        Args:
+            points: Unsaved HistoricalPricePoint instances
+            batch_size: Rows per INSERT ... ON CONFLICT statement
+            
+        Returns:
+            Number of points written (inserted or updated)
+        """
+        unique_points = {}
+        for point in points:
+            point.calculate_derived_fields()
+            unique_points[(point.item_id, point.interval, point.timestamp)] = point
+        
+        if not unique_points:
+            return 0
+        
+        cls.objects.bulk_create(
+            list(unique_points.values()),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['item', 'interval', 'timestamp'],
+            update_fields=cls.UPSERT_UPDATE_FIELDS,
+        )
+        return len(unique_points)
     
     def __str__(self):
         return f"{self.item.name} - {self.interval} - {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
@@ -560,10 +560,11 @@ class MoneyMakerOpportunityViewSet(viewsets.ViewSet):
         """
         try:
             min_profit_gp = int(request.query_params.get('min_profit', 1000))
+            batch = request.query_params.get('batch', 'true').lower() != 'false'
             scanner = UniversalOpportunityScanner(min_profit_gp=min_profit_gp)
             
             # Perform comprehensive scan
-            results = scanner.scan_all_opportunities()
+            results = scanner.scan_all_opportunities(batch=batch)
             
             # Calculate summary statistics
             total_opportunities = sum(len(opportunities) for strategy_type, opportunities in results.items() if strategy_type != 'cross_strategy_analysis')
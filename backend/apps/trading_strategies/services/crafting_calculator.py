@@ -1,9 +1,9 @@
 from typing import List, Dict, Optional, Tuple
 from decimal import Decimal
 from django.db import transaction
-from apps.prices.models import PriceSnapshot, ProfitCalculation
 from apps.items.models import Item
 from apps.trading_strategies.models import TradingStrategy, CraftingOpportunity, StrategyType
+from services.market_matrix import MarketSnapshot, market_matrix
 from services.runescape_wiki_client import SyncRuneScapeWikiAPIClient
 import logging
 import asyncio
@@ -202,15 +202,28 @@ class CraftingCalculator:
         self.min_profit_margin = min_profit_margin
         self.min_profit_gp = min_profit_gp
         self.wiki_client = SyncRuneScapeWikiAPIClient()
+        self.market: Optional[MarketSnapshot] = None
+        self.wiki_prices: Dict = {}
     
-    def calculate_opportunities(self) -> List[Dict]:
+    def calculate_opportunities(self, market: Optional[MarketSnapshot] = None) -> List[Dict]:
         """
         Calculate all profitable crafting opportunities.
         
+        Args:
+            market: Shared market snapshot (defaults to the current market matrix)
+        
         Returns:
             List of profitable crafting opportunities
         """
         opportunities = []
+        self.market = market or market_matrix.snapshot()
+        
+        # One /latest call covers every recipe item instead of one request per item
+        try:
+            self.wiki_prices = self.wiki_client.get_latest_prices() or {}
+        except Exception as wiki_error:
+            logger.debug(f"OSRS Wiki API unavailable for crafting scan: {wiki_error}")
+            self.wiki_prices = {}
         
         for recipe_name, recipe_data in self.CRAFTING_RECIPES.items():
             try:
@@ -402,9 +415,9 @@ class CraftingCalculator:
             Price data dictionary or None if not available
         """
         try:
-            # Try to get real-time data from OSRS Wiki API first
+            # Try real-time data from the OSRS Wiki snapshot fetched for this scan first
             try:
-                wiki_prices = self.wiki_client.get_latest_prices(item_id=item_id)
+                wiki_prices = self.wiki_prices
                 if wiki_prices and item_id in wiki_prices:
                     wiki_data = wiki_prices[item_id]
                     if wiki_data.has_valid_prices:
@@ -420,29 +433,9 @@ class CraftingCalculator:
             except Exception as wiki_error:
                 logger.debug(f"OSRS Wiki API unavailable for item {item_id}: {wiki_error}")
             
-            # Fallback to cached data from ProfitCalculation
-            profit_calc = ProfitCalculation.objects.filter(item_id=item_id).first()
-            if profit_calc and profit_calc.current_buy_price and profit_calc.current_sell_price:
-                return {
-                    'high': profit_calc.current_buy_price or 0,
-                    'low': profit_calc.current_sell_price or 0,
-                    'highTime': profit_calc.daily_volume or 0,
-                    'lowTime': profit_calc.hourly_volume or 0,
-                    'data_source': 'cached_profit_calc'
-                }
-            
-            # Final fallback to latest PriceSnapshot
-            price_obj = PriceSnapshot.objects.filter(item_id=item_id).order_by('-created_at').first()
-            if not price_obj:
-                return None
-            
-            return {
-                'high': price_obj.high_price or 0,
-                'low': price_obj.low_price or 0,
-                'highTime': price_obj.high_price_volume or 0,
-                'lowTime': price_obj.low_price_volume or 0,
-                'data_source': 'price_snapshot'
-            }
+            # Fallback to cached market data (ProfitCalculation, then latest PriceSnapshot)
+            market = self.market or market_matrix.snapshot()
+            return market.get_price(item_id)
         except Exception as e:
             logger.warning(f"Error getting price for item {item_id}: {e}")
             return None
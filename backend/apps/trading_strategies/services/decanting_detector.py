@@ -1,10 +1,10 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from decimal import Decimal
 from django.db import transaction
-from django.db.models import Q
-from apps.prices.models import PriceSnapshot, ProfitCalculation
 from apps.items.models import Item
 from apps.trading_strategies.models import TradingStrategy, DecantingOpportunity, StrategyType
+from services.market_matrix import MarketSnapshot, market_matrix
+import numpy as np
 import logging
 import re
 
@@ -70,6 +70,22 @@ class DecantingDetector:
         },
     }
     
+    # Potions produced per conversion, keyed by (from_dose, to_dose):
+    # - 4-dose → drink once → 1x 3-dose, 2x 2-dose or 3x 1-dose potions
+    # - 3-dose → drink once → 1x 2-dose or 2x 1-dose potions
+    # - 2-dose → split directly → 2x 1-dose potions
+    POTIONS_GAINED = {
+        (4, 3): 1,
+        (4, 2): 2,
+        (4, 1): 3,
+        (3, 2): 1,
+        (3, 1): 2,
+        (2, 1): 2,
+    }
+    
+    MAX_REASONABLE_PRICE = 50000  # 50k GP max for any potion dose
+    MIN_REASONABLE_PRICE = 5      # 5 GP minimum (allow low-value single doses)
+    
     def __init__(self, min_profit_margin: float = 0.02, min_profit_gp: int = 50):
         """
         Initialize the decanting detector.
@@ -80,33 +96,47 @@ class DecantingDetector:
         """
         self.min_profit_margin = min_profit_margin
         self.min_profit_gp = min_profit_gp
+        self.market: Optional[MarketSnapshot] = None
     
-    def detect_opportunities(self) -> List[Dict]:
+    def detect_opportunities(self, market: Optional[MarketSnapshot] = None, batch: bool = False) -> List[Dict]:
         """
         Scan for profitable decanting opportunities using market-driven discovery.
         
+        Args:
+            market: Shared market snapshot (defaults to the current market matrix)
+            batch: Score every dose pair with array operations before building results
+        
         Returns:
             List of opportunity dictionaries with profit data
         """
         opportunities = []
+        self.market = market or market_matrix.snapshot()
         
         # Step 1: Discover all potion families from market data
         potion_families = self._discover_potion_families_from_market()
         logger.info(f"Discovered {len(potion_families)} potion families from market data")
         
         # Step 2: Analyze each potion family for decanting opportunities
-        for potion_name, dose_mapping in potion_families.items():
-            for from_dose in [4, 3, 2]:  # We can only decant from higher to lower
-                for to_dose in range(1, from_dose):  # Target all lower doses
-                    if from_dose in dose_mapping and to_dose in dose_mapping:
-                        try:
-                            opportunity = self._analyze_decanting_pair(
-                                potion_name, dose_mapping, from_dose, to_dose
-                            )
-                            if opportunity:
-                                opportunities.append(opportunity)
-                        except Exception as e:
-                            logger.warning(f"Error analyzing {potion_name} {from_dose}->{to_dose}: {e}")
+        pairs = [
+            (potion_name, dose_mapping, from_dose, to_dose)
+            for potion_name, dose_mapping in potion_families.items()
+            for from_dose in [4, 3, 2]  # We can only decant from higher to lower
+            for to_dose in range(1, from_dose)  # Target all lower doses
+            if from_dose in dose_mapping and to_dose in dose_mapping
+        ]
+        
+        if batch:
+            pairs = self._filter_profitable_pairs_batch(pairs)
+        
+        for potion_name, dose_mapping, from_dose, to_dose in pairs:
+            try:
+                opportunity = self._analyze_decanting_pair(
+                    potion_name, dose_mapping, from_dose, to_dose
+                )
+                if opportunity:
+                    opportunities.append(opportunity)
+            except Exception as e:
+                logger.warning(f"Error analyzing {potion_name} {from_dose}->{to_dose}: {e}")
         
         # Sort by profit potential
         opportunities.sort(key=lambda x: x['profit_per_conversion'], reverse=True)
@@ -114,6 +144,63 @@ class DecantingDetector:
         logger.info(f"Found {len(opportunities)} profitable decanting opportunities")
         return opportunities
     
+    def _filter_profitable_pairs_batch(self, pairs: List[Tuple]) -> List[Tuple]:
+        """
+        Score all decanting pairs at once and keep only the profitable ones.
+        
+        Mirrors the checks in _analyze_decanting_pair (price sanity, GE tax,
+        minimum profit and margin) as array operations, so the per-pair analysis
+        only runs for pairs that will produce an opportunity.
+        
+        Args:
+            pairs: (potion_name, dose_mapping, from_dose, to_dose) tuples
+            
+        Returns:
+            Subset of pairs that pass every profitability filter
+        """
+        from services.weird_gloop_client import GrandExchangeTax
+        
+        if not pairs:
+            return []
+        
+        market = self.market or market_matrix.snapshot()
+        if not len(market):
+            return []
+        
+        from_rows = market.rows_for(mapping[from_dose] for _, mapping, from_dose, _ in pairs)
+        to_rows = market.rows_for(mapping[to_dose] for _, mapping, _, to_dose in pairs)
+        potions_gained = np.fromiter(
+            (self.POTIONS_GAINED[(from_dose, to_dose)] for _, _, from_dose, to_dose in pairs),
+            dtype=np.int64
+        )
+        
+        priced = (from_rows >= 0) & (to_rows >= 0)
+        from_price = np.where(priced, market.buy_prices[from_rows], 0)  # Price we buy at
+        to_price = np.where(priced, market.sell_prices[to_rows], 0)     # Price we sell at
+        to_item_ids = np.where(priced, market.item_ids[to_rows], 0)
+        
+        # Validate prices are realistic (potions shouldn't cost millions)
+        realistic = (
+            (from_price >= self.MIN_REASONABLE_PRICE) & (from_price <= self.MAX_REASONABLE_PRICE) &
+            (to_price >= self.MIN_REASONABLE_PRICE) & (to_price <= self.MAX_REASONABLE_PRICE)
+        )
+        
+        # Revenue after GE tax (we're selling), cost is the buy price
+        ge_tax = GrandExchangeTax.calculate_tax_array(to_price, to_item_ids) * potions_gained
+        profit = to_price * potions_gained - ge_tax - from_price
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin = np.where(from_price > 0, profit / from_price * 100, 0.0)
+        
+        keep = (
+            priced & realistic &
+            (profit >= self.min_profit_gp) &
+            (margin >= self.min_profit_margin * 100) &
+            (margin <= 1000)
+        )
+        
+        logger.debug(f"Batch decanting scoring kept {int(keep.sum())} of {len(pairs)} dose pairs")
+        return [pair for pair, passed in zip(pairs, keep.tolist()) if passed]
+    
     def _discover_potion_families_from_market(self) -> Dict[str, Dict[int, int]]:
         """
         Discover potion families dynamically from items with active market data.
@@ -124,18 +211,15 @@ class DecantingDetector:
         """
         potion_families = {}
         
-        # Get all items with recent price data that match potion patterns
-        items_with_prices = ProfitCalculation.objects.filter(
-            Q(current_buy_price__gt=0) | Q(current_sell_price__gt=0)
-        ).select_related('item')
+        # Get all items with recent price data from the shared market matrix
+        market = self.market or market_matrix.snapshot()
         
         # Pattern to match dose potions: "Potion name(X)" where X is 1-4
         dose_pattern = re.compile(r'^(.+?)\s*\((\d)\)$')
         
-        logger.info(f"Analyzing {items_with_prices.count()} items for potion patterns...")
+        logger.info(f"Analyzing {len(market)} items for potion patterns...")
         
-        for price_data in items_with_prices:
-            item_name = price_data.item.name
+        for row, item_name in enumerate(market.names):
             match = dose_pattern.match(item_name)
             
             if match:
@@ -149,7 +233,7 @@ class DecantingDetector:
                         if base_name not in potion_families:
                             potion_families[base_name] = {}
                         
-                        potion_families[base_name][dose_count] = price_data.item.item_id
+                        potion_families[base_name][dose_count] = int(market.item_ids[row])
         
         # Filter out incomplete families (need at least 2 dose variants)
         complete_families = {
@@ -235,11 +319,8 @@ class DecantingDetector:
         to_price = to_price_data['low']       # Price we sell at
         
         # Validate prices are realistic (potions shouldn't cost millions)
-        max_reasonable_price = 50000  # 50k GP max for any potion dose
-        min_reasonable_price = 5      # 5 GP minimum (allow low-value single doses)
-        
-        if (from_price > max_reasonable_price or from_price < min_reasonable_price or
-            to_price > max_reasonable_price or to_price < min_reasonable_price):
+        if (from_price > self.MAX_REASONABLE_PRICE or from_price < self.MIN_REASONABLE_PRICE or
+            to_price > self.MAX_REASONABLE_PRICE or to_price < self.MIN_REASONABLE_PRICE):
             logger.warning(f"Skipping {potion_name} {from_dose}→{to_dose}: unrealistic prices "
                           f"(from: {from_price}, to: {to_price})")
             return None
@@ -253,25 +334,8 @@ class DecantingDetector:
         # - Drinking a 4-dose potion once gives you 3 doses worth of effect + 1 empty vial
         # - You can then split those 3 doses into separate potions (e.g., 1x 3-dose, or 1x 2-dose + 1x 1-dose)
         
-        if from_dose == 4 and to_dose == 2:
-            # 4-dose → drink once → split into 2x 2-dose potions  
-            potions_gained = 2
-        elif from_dose == 4 and to_dose == 3:
-            # 4-dose → drink once → 1x 3-dose potion
-            potions_gained = 1  
-        elif from_dose == 4 and to_dose == 1:
-            # 4-dose → drink once → split into 3x 1-dose potions
-            potions_gained = 3
-        elif from_dose == 3 and to_dose == 2:
-            # 3-dose → drink once → 1x 2-dose potion
-            potions_gained = 1
-        elif from_dose == 3 and to_dose == 1:
-            # 3-dose → drink once → split into 2x 1-dose potions  
-            potions_gained = 2
-        elif from_dose == 2 and to_dose == 1:
-            # 2-dose → split directly → 2x 1-dose potions
-            potions_gained = 2
-        else:
+        potions_gained = self.POTIONS_GAINED.get((from_dose, to_dose))
+        if not potions_gained:
             # Invalid or unsupported conversion
             return None
         
@@ -335,7 +399,7 @@ class DecantingDetector:
     
     def _get_item_price(self, item_id: int) -> Optional[Dict]:
         """
-        Get current price data for an item from market sources.
+        Get current price data for an item from the shared market matrix.
         
         Args:
             item_id: OSRS item ID
@@ -344,44 +408,32 @@ class DecantingDetector:
             Price data dictionary or None if not available
         """
         try:
-            # Try to get from ProfitCalculation first (most recent cached data)
-            profit_calc = ProfitCalculation.objects.filter(item__item_id=item_id).first()
-            if profit_calc and (profit_calc.current_buy_price or profit_calc.current_sell_price):
-                buy_price = profit_calc.current_buy_price or 0
-                sell_price = profit_calc.current_sell_price or 0
-                
+            market = self.market or market_matrix.snapshot()
+            price_data = market.get_price(item_id)
+            if not price_data:
+                return None
+            
+            if price_data['data_source'] == 'cached_profit_calc':
                 # VOLUME VALIDATION: Ensure realistic volume data
-                daily_volume = self._validate_volume(profit_calc.daily_volume, "daily")
-                hourly_volume = self._validate_volume(profit_calc.hourly_volume, "hourly")
+                daily_volume = self._validate_volume(price_data['highTime'], "daily")
+                hourly_volume = self._validate_volume(price_data['lowTime'], "hourly")
                 
                 # If both volumes are 0, estimate from volume category
                 if daily_volume == 0 and hourly_volume == 0:
-                    daily_volume, hourly_volume = self._estimate_volume_from_category(profit_calc.volume_category)
+                    daily_volume, hourly_volume = self._estimate_volume_from_category(price_data['volume_category'])
                 
-                logger.debug(f"Item {item_id} volume data: daily={daily_volume}, hourly={hourly_volume}, category={profit_calc.volume_category}")
-                
-                # Correct price mapping: current_buy_price is what we pay (high), current_sell_price is what we receive (low)
-                return {
-                    'high': buy_price,   # What we pay to buy instantly (current_buy_price)
-                    'low': sell_price,   # What we receive when selling instantly (current_sell_price)
-                    'highTime': daily_volume,
-                    'lowTime': hourly_volume,
-                }
-            
-            # Fallback to latest PriceSnapshot
-            price_obj = PriceSnapshot.objects.filter(item_id=item_id).order_by('-created_at').first()
-            if not price_obj:
-                return None
-            
-            # Validate snapshot volumes
-            high_volume = self._validate_volume(price_obj.high_price_volume, "price_volume")
-            low_volume = self._validate_volume(price_obj.low_price_volume, "price_volume")
+                logger.debug(f"Item {item_id} volume data: daily={daily_volume}, hourly={hourly_volume}, category={price_data['volume_category']}")
+            else:
+                # Validate snapshot volumes
+                daily_volume = self._validate_volume(price_data['highTime'], "price_volume")
+                hourly_volume = self._validate_volume(price_data['lowTime'], "price_volume")
             
+            # Correct price mapping: current_buy_price is what we pay (high), current_sell_price is what we receive (low)
             return {
-                'high': price_obj.high_price or 0,
-                'low': price_obj.low_price or 0,
-                'highTime': high_volume,
-                'lowTime': low_volume,
+                'high': price_data['high'],   # What we pay to buy instantly (current_buy_price)
+                'low': price_data['low'],     # What we receive when selling instantly (current_sell_price)
+                'highTime': daily_volume,
+                'lowTime': hourly_volume,
             }
         except Exception as e:
             logger.warning(f"Error getting price for item {item_id}: {e}")
@@ -550,16 +602,19 @@ class DecantingDetector:
         
         return created_count
     
-    def scan_and_create_opportunities(self) -> int:
+    def scan_and_create_opportunities(self, batch: bool = False) -> int:
         """
         Full scan: detect opportunities and create strategy records.
         
+        Args:
+            batch: Use array-based pair scoring (see detect_opportunities)
+        
         Returns:
             Number of strategies created
         """
         logger.info("Starting decanting opportunity scan...")
         
-        opportunities = self.detect_opportunities()
+        opportunities = self.detect_opportunities(batch=batch)
         logger.info(f"Found {len(opportunities)} decanting opportunities")
         
         if opportunities:
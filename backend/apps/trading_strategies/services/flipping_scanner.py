@@ -1,10 +1,10 @@
 from typing import List, Dict, Optional
 from decimal import Decimal
 from django.db import transaction
-from django.db.models import Q
-from apps.prices.models import PriceSnapshot, ProfitCalculation
 from apps.items.models import Item
 from apps.trading_strategies.models import TradingStrategy, FlippingOpportunity, StrategyType
+from services.market_matrix import MarketSnapshot, SOURCE_PROFIT_CALC, market_matrix
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,50 +35,58 @@ class FlippingScanner:
         self.min_price = min_price
         self.max_price = max_price
     
-    def scan_flipping_opportunities(self) -> List[Dict]:
+    def scan_flipping_opportunities(self, market: Optional[MarketSnapshot] = None) -> List[Dict]:
         """
         Scan all items for profitable flipping opportunities.
         
+        Args:
+            market: Shared market snapshot (defaults to the current market matrix)
+        
         Returns:
             List of profitable flipping opportunities
         """
         opportunities = []
+        market = market or market_matrix.snapshot()
+        
+        # Filter candidate rows in one pass over the price columns
+        buy_prices = market.buy_prices
+        sell_prices = market.sell_prices
+        candidates = (
+            (market.sources == SOURCE_PROFIT_CALC) &
+            (buy_prices >= self.min_price) &
+            (buy_prices <= self.max_price) &
+            (buy_prices > 0) &
+            (sell_prices > buy_prices)
+        )
         
-        # Get all items with recent price data and decent margins
-        price_queryset = ProfitCalculation.objects.filter(
-            current_buy_price__gte=self.min_price,
-            current_buy_price__lte=self.max_price,
-            current_sell_price__gt=0,
-            current_buy_price__gt=0
-        ).select_related('item')
-        
-        logger.info(f"Scanning {price_queryset.count()} items for flipping opportunities...")
+        logger.info(f"Scanning {int(candidates.sum())} items for flipping opportunities...")
         
-        for price_data in price_queryset:
+        for row in np.flatnonzero(candidates):
             try:
-                opportunity = self._analyze_flipping_opportunity(price_data)
+                opportunity = self._analyze_flipping_opportunity(market, int(row))
                 if opportunity:
                     opportunities.append(opportunity)
             except Exception as e:
-                logger.warning(f"Error analyzing item {price_data.item_id}: {e}")
+                logger.warning(f"Error analyzing item {market.item_ids[row]}: {e}")
         
         # Sort by margin percentage (highest first)
         opportunities.sort(key=lambda x: x['margin_percentage'], reverse=True)
         
         return opportunities[:200]  # Limit to top 200 opportunities
     
-    def _analyze_flipping_opportunity(self, price_data: ProfitCalculation) -> Optional[Dict]:
+    def _analyze_flipping_opportunity(self, market: MarketSnapshot, row: int) -> Optional[Dict]:
         """
         Analyze a specific item for flipping profitability.
         
         Args:
-            price_data: ItemPrice object with current market data
+            market: Market snapshot holding the item's prices
+            row: Row index of the item in the snapshot
             
         Returns:
             Opportunity dictionary or None if not profitable
         """
-        buy_price = price_data.current_buy_price  # Price we buy at (instant buy)
-        sell_price = price_data.current_sell_price  # Price we sell at (instant sell)
+        buy_price = int(market.buy_prices[row])  # Price we buy at (instant buy)
+        sell_price = int(market.sell_prices[row])  # Price we sell at (instant sell)
         
         if not buy_price or not sell_price or buy_price >= sell_price:
             return None
@@ -95,11 +103,11 @@ class FlippingScanner:
             return None
         
         # Get volume data (transaction frequency)
-        buy_volume = price_data.daily_volume or 0
-        sell_volume = price_data.hourly_volume or 0
+        buy_volume = int(market.daily_volumes[row])
+        sell_volume = int(market.hourly_volumes[row])
         
         # Calculate price stability (how often prices change)
-        price_stability = self._calculate_price_stability(price_data)
+        price_stability = self._calculate_price_stability(buy_volume, sell_volume)
         
         # Estimate flip time based on volume
         flip_time = self._estimate_flip_time(buy_volume, sell_volume)
@@ -110,8 +118,8 @@ class FlippingScanner:
         )
         
         return {
-            'item_id': price_data.item.id,
-            'item_name': price_data.item.name,
+            'item_id': int(market.item_pks[row]),
+            'item_name': market.names[row],
             'buy_price': buy_price,
             'sell_price': sell_price,
             'margin': margin,
@@ -123,12 +131,13 @@ class FlippingScanner:
             'recommended_quantity': recommended_qty,
         }
     
-    def _calculate_price_stability(self, price_data: ProfitCalculation) -> float:
+    def _calculate_price_stability(self, buy_vol: int, sell_vol: int) -> float:
         """
         Calculate price stability score (0-1, higher is more stable).
         
         Args:
-            price_data: ItemPrice object
+            buy_vol: Daily trading volume
+            sell_vol: Hourly trading volume
             
         Returns:
             Stability score between 0 and 1
@@ -136,9 +145,6 @@ class FlippingScanner:
         # For now, use a simple heuristic based on volume consistency
         # More sophisticated analysis could use historical price variance
         
-        buy_vol = price_data.daily_volume or 0
-        sell_vol = price_data.hourly_volume or 0
-        
         if buy_vol == 0 or sell_vol == 0:
             return 0.1  # Low stability if no volume data
         
@@ -1,9 +1,9 @@
 from typing import List, Dict, Optional, Tuple
 from decimal import Decimal
 from django.db import transaction
-from apps.prices.models import PriceSnapshot, ProfitCalculation
 from apps.items.models import Item
 from apps.trading_strategies.models import TradingStrategy, SetCombiningOpportunity, StrategyType
+from services.market_matrix import MarketSnapshot, market_matrix
 import logging
 
 logger = logging.getLogger(__name__)
@@ -171,15 +171,20 @@ class SetCombiningAnalyzer:
         """
         self.min_lazy_tax = min_lazy_tax
         self.min_margin_pct = min_margin_pct
+        self.market: Optional[MarketSnapshot] = None
     
-    def analyze_opportunities(self) -> List[Dict]:
+    def analyze_opportunities(self, market: Optional[MarketSnapshot] = None) -> List[Dict]:
         """
         Analyze all set combining opportunities.
         
+        Args:
+            market: Shared market snapshot (defaults to the current market matrix)
+        
         Returns:
             List of profitable set combining opportunities
         """
         opportunities = []
+        self.market = market or market_matrix.snapshot()
         
         for set_name, set_data in self.SET_COMBINATIONS.items():
             try:
@@ -270,7 +275,7 @@ class SetCombiningAnalyzer:
     
     def _get_item_price(self, item_id: int) -> Optional[Dict]:
         """
-        Get current price data for an item.
+        Get current price data for an item from the shared market matrix.
         
         Args:
             item_id: OSRS item ID
@@ -279,27 +284,8 @@ class SetCombiningAnalyzer:
             Price data dictionary or None if not available
         """
         try:
-            # Try to get from ProfitCalculation first (cached data)
-            profit_calc = ProfitCalculation.objects.filter(item_id=item_id).first()
-            if profit_calc and profit_calc.current_buy_price and profit_calc.current_sell_price:
-                return {
-                    'high': profit_calc.current_buy_price or 0,
-                    'low': profit_calc.current_sell_price or 0,
-                    'highTime': profit_calc.daily_volume or 0,
-                    'lowTime': profit_calc.hourly_volume or 0,
-                }
-            
-            # Fallback to latest PriceSnapshot
-            price_obj = PriceSnapshot.objects.filter(item_id=item_id).order_by('-created_at').first()
-            if not price_obj:
-                return None
-            
-            return {
-                'high': price_obj.high_price or 0,
-                'low': price_obj.low_price or 0,
-                'highTime': price_obj.high_price_volume or 0,
-                'lowTime': price_obj.low_price_volume or 0,
-            }
+            market = self.market or market_matrix.snapshot()
+            return market.get_price(item_id)
         except Exception as e:
             logger.warning(f"Error getting price for item {item_id}: {e}")
             return None
@@ -13,13 +13,12 @@ It then recommends the most profitable strategy per item.
 
 from typing import List, Dict, Optional, Tuple
 from decimal import Decimal
-from django.db.models import Q
-from apps.prices.models import PriceSnapshot, ProfitCalculation
-from apps.items.models import Item
+from services.market_matrix import MarketSnapshot, market_matrix
 from .decanting_detector import DecantingDetector
 from .flipping_scanner import FlippingScanner
 from .crafting_calculator import CraftingCalculator
 from .set_combining_analyzer import SetCombiningAnalyzer
+import numpy as np
 import logging
 import re
 
@@ -31,6 +30,15 @@ class UniversalOpportunityScanner:
     Scans all items with market data and evaluates the best trading strategy for each.
     """
     
+    # Nature rune cost (usually around 180 GP)
+    NATURE_RUNE_COST = 180
+    
+    # Simple heuristic for raw materials
+    RAW_MATERIAL_KEYWORDS = [
+        'ore', 'bar', 'log', 'plank', 'hide', 'leather', 'cloth', 'thread',
+        'gem', 'crystal', 'herb', 'seed', 'essence', 'shard', 'scale'
+    ]
+    
     def __init__(self, min_profit_gp: int = 1000):
         """
         Initialize the universal scanner.
@@ -45,15 +53,22 @@ class UniversalOpportunityScanner:
         self.flipping_scanner = FlippingScanner(min_margin_gp=min_profit_gp)
         self.crafting_calculator = CraftingCalculator()
         self.set_combining_analyzer = SetCombiningAnalyzer()
+        
+        # Decanting opportunities keyed by from-dose item ID, rebuilt every scan
+        self._decanting_by_item: Dict[int, Dict] = {}
     
-    def scan_all_opportunities(self) -> Dict[str, List[Dict]]:
+    def scan_all_opportunities(self, batch: bool = False) -> Dict[str, List[Dict]]:
         """
         Scan all items with market data and return the best opportunities by strategy type.
         
+        Args:
+            batch: Score every item for every strategy with array operations instead
+                   of analyzing one item at a time (same results, far less Python CPU)
+        
         Returns:
             Dictionary with strategy types and their best opportunities
         """
-        logger.info("Starting universal opportunity scan...")
+        logger.info(f"Starting universal opportunity scan{' (batch mode)' if batch else ''}...")
         
         results = {
             'decanting': [],
@@ -64,21 +79,24 @@ class UniversalOpportunityScanner:
             'cross_strategy_analysis': []
         }
         
-        # Get all items with active market data
-        items_with_prices = ProfitCalculation.objects.filter(
-            Q(current_buy_price__gt=0) | Q(current_sell_price__gt=0)
-        ).select_related('item')
+        # One bulk load of every item with active market data, shared by all strategies
+        market = market_matrix.snapshot()
+        self._decanting_by_item = self._index_decanting_opportunities(market, batch=batch)
         
-        logger.info(f"Analyzing {items_with_prices.count()} items with market data...")
+        logger.info(f"Analyzing {len(market)} items with market data...")
         
-        # Analyze each item for all possible strategies
-        for price_data in items_with_prices:
-            item_strategies = self._analyze_item_all_strategies(price_data)
-            
-            # Add to appropriate categories
-            for strategy_type, opportunity in item_strategies.items():
-                if opportunity and opportunity['profit_gp'] >= self.min_profit_gp:
-                    results[strategy_type].append(opportunity)
+        if batch:
+            for strategy_type, opportunities in self._scan_batch(market).items():
+                results[strategy_type].extend(opportunities)
+        else:
+            # Analyze each item for all possible strategies
+            for row in range(len(market)):
+                item_strategies = self._analyze_item_all_strategies(market, row)
+                
+                # Add to appropriate categories
+                for strategy_type, opportunity in item_strategies.items():
+                    if opportunity and opportunity['profit_gp'] >= self.min_profit_gp:
+                        results[strategy_type].append(opportunity)
         
         # Sort each strategy type by profit
         for strategy_type in results:
@@ -98,74 +116,168 @@ class UniversalOpportunityScanner:
         
         return results
     
-    def _analyze_item_all_strategies(self, price_data: ProfitCalculation) -> Dict[str, Optional[Dict]]:
+    def _scan_batch(self, market: MarketSnapshot) -> Dict[str, List[Dict]]:
+        """
+        Score every item for every strategy as array operations over the market matrix.
+        
+        Only rows that clear the profit threshold are turned into opportunity dicts,
+        using the same per-row builders as the item-by-item scan.
+        
+        Args:
+            market: Market snapshot to score
+            
+        Returns:
+            Dictionary mapping strategy types to opportunities (in market row order)
+        """
+        buy = market.buy_prices
+        sell = market.sell_prices
+        flags = market.derived('universal_scanner_flags', self._build_item_flags)
+        
+        # High alchemy: alch value minus buy price and nature rune
+        alch_profit = market.high_alch - buy - self.NATURE_RUNE_COST
+        alch_mask = (buy > 0) & (market.high_alch > 0) & (alch_profit > 0)
+        
+        # Flipping: instant sell minus instant buy
+        flip_profit = sell - buy
+        flip_mask = (buy > 0) & (sell > buy)
+        
+        # Decanting: potions with a detected opportunity from their dose
+        decant_profit = np.zeros(len(market), dtype=np.float64)
+        decant_mask = np.zeros(len(market), dtype=bool)
+        if self._decanting_by_item:
+            decant_rows = market.rows_for(self._decanting_by_item.keys())
+            found = decant_rows >= 0
+            decant_rows = decant_rows[found]
+            decant_profit[decant_rows] = [
+                opp.get('profit_per_conversion', 0)
+                for opp, hit in zip(self._decanting_by_item.values(), found.tolist()) if hit
+            ]
+            decant_mask[decant_rows] = True
+        decant_mask &= flags['potion']
+        
+        # Crafting: raw materials are flagged with zero profit until recipes are looked up
+        craft_profit = np.zeros(len(market), dtype=np.int64)
+        craft_mask = flags['raw_material'].copy()
+        
+        min_profit = self.min_profit_gp
+        scored = {
+            'high_alchemy': (alch_mask & (alch_profit >= min_profit), self._analyze_high_alchemy),
+            'flipping': (flip_mask & (flip_profit >= min_profit), self._analyze_flipping),
+            'decanting': (decant_mask & (decant_profit >= min_profit), self._analyze_decanting),
+            'crafting': (craft_mask & (craft_profit >= min_profit), self._analyze_crafting_potential),
+        }
+        
+        results = {strategy_type: [] for strategy_type in scored}
+        for strategy_type, (mask, build) in scored.items():
+            for row in np.flatnonzero(mask).tolist():
+                opportunity = build(market, row)
+                if opportunity:
+                    results[strategy_type].append(opportunity)
+        
+        # Set combining is handled by the specialized analyzer (see _analyze_set_combining)
+        results['set_combining'] = []
+        return results
+    
+    def _build_item_flags(self, market: MarketSnapshot) -> Dict[str, np.ndarray]:
+        """Classify every item in the snapshot by name once per refresh cycle."""
+        potion = np.fromiter((self._is_potion(name) for name in market.names), dtype=bool, count=len(market))
+        raw_material = np.fromiter(
+            (any(keyword in name.lower() for keyword in self.RAW_MATERIAL_KEYWORDS) for name in market.names),
+            dtype=bool, count=len(market)
+        )
+        return {'potion': potion, 'raw_material': raw_material}
+    
+    def _index_decanting_opportunities(self, market: MarketSnapshot, batch: bool = False) -> Dict[int, Dict]:
+        """
+        Run the decanting detector once per scan and index its results by source item.
+        
+        Args:
+            market: Market snapshot shared with the detector
+            batch: Use the detector's array-based pair scoring
+            
+        Returns:
+            Dictionary mapping from-dose item IDs to their best decanting opportunity
+        """
+        try:
+            detector_opportunities = self.decanting_detector.detect_opportunities(market=market, batch=batch)
+        except Exception as e:
+            logger.warning(f"Decanting detection failed during universal scan: {e}")
+            return {}
+        
+        # Detector output is sorted by profit, so keep the first hit per item
+        by_item = {}
+        for opp in detector_opportunities:
+            by_item.setdefault(opp.get('from_item_id'), opp)
+        return by_item
+    
+    def _analyze_item_all_strategies(self, market: MarketSnapshot, row: int) -> Dict[str, Optional[Dict]]:
         """
         Analyze a single item for all possible trading strategies.
         
         Args:
-            price_data: ProfitCalculation object with market data
+            market: Market snapshot holding the item's prices
+            row: Row index of the item in the snapshot
             
         Returns:
             Dictionary mapping strategy types to opportunity data
         """
-        item = price_data.item
-        item_name = item.name
+        item_name = market.names[row]
         strategies = {}
         
         # 1. High Alchemy Analysis
-        strategies['high_alchemy'] = self._analyze_high_alchemy(price_data)
+        strategies['high_alchemy'] = self._analyze_high_alchemy(market, row)
         
         # 2. Flipping Analysis
-        strategies['flipping'] = self._analyze_flipping(price_data)
+        strategies['flipping'] = self._analyze_flipping(market, row)
         
         # 3. Decanting Analysis (if it's a potion)
         if self._is_potion(item_name):
-            strategies['decanting'] = self._analyze_decanting(price_data)
+            strategies['decanting'] = self._analyze_decanting(market, row)
         else:
             strategies['decanting'] = None
         
         # 4. Set Combining Analysis (if it's armor/equipment)
         if self._is_equipment(item_name):
-            strategies['set_combining'] = self._analyze_set_combining(price_data)
+            strategies['set_combining'] = self._analyze_set_combining(market, row)
         else:
             strategies['set_combining'] = None
         
         # 5. Crafting Analysis (simplified - check if it's a raw material)
-        strategies['crafting'] = self._analyze_crafting_potential(price_data)
+        strategies['crafting'] = self._analyze_crafting_potential(market, row)
         
         return strategies
     
-    def _analyze_high_alchemy(self, price_data: ProfitCalculation) -> Optional[Dict]:
+    def _analyze_high_alchemy(self, market: MarketSnapshot, row: int) -> Optional[Dict]:
         """Analyze high alchemy potential for an item."""
-        item = price_data.item
-        buy_price = price_data.current_buy_price or 0
+        item_name = market.names[row]
+        buy_price = int(market.buy_prices[row])
+        high_alch = int(market.high_alch[row])
         
-        if not buy_price or not item.high_alch:
+        if not buy_price or not high_alch:
             return None
         
-        # Nature rune cost (usually around 180 GP)
-        nature_rune_cost = 180
-        profit_gp = item.high_alch - buy_price - nature_rune_cost
+        profit_gp = high_alch - buy_price - self.NATURE_RUNE_COST
         
         if profit_gp <= 0:
             return None
         
         return {
-            'item_id': item.item_id,
-            'item_name': item.name,
+            'item_id': int(market.item_ids[row]),
+            'item_name': item_name,
             'strategy_type': 'high_alchemy',
             'profit_gp': profit_gp,
             'buy_price': buy_price,
-            'alch_value': item.high_alch,
+            'alch_value': high_alch,
             'profit_per_hour': profit_gp * 1200,  # ~1200 alchs per hour
             'capital_efficiency': profit_gp / buy_price if buy_price > 0 else 0,
-            'description': f"Buy {item.name} for {buy_price} GP, alch for {item.high_alch} GP"
+            'description': f"Buy {item_name} for {buy_price} GP, alch for {high_alch} GP"
         }
     
-    def _analyze_flipping(self, price_data: ProfitCalculation) -> Optional[Dict]:
+    def _analyze_flipping(self, market: MarketSnapshot, row: int) -> Optional[Dict]:
         """Analyze flipping potential for an item."""
-        buy_price = price_data.current_buy_price or 0
-        sell_price = price_data.current_sell_price or 0
+        item_name = market.names[row]
+        buy_price = int(market.buy_prices[row])
+        sell_price = int(market.sell_prices[row])
         
         if not buy_price or not sell_price or sell_price <= buy_price:
             return None
@@ -177,8 +289,8 @@ class UniversalOpportunityScanner:
             return None
         
         return {
-            'item_id': price_data.item.item_id,
-            'item_name': price_data.item.name,
+            'item_id': int(market.item_ids[row]),
+            'item_name': item_name,
             'strategy_type': 'flipping',
             'profit_gp': profit_gp,
             'buy_price': buy_price,
@@ -186,55 +298,46 @@ class UniversalOpportunityScanner:
             'margin_percentage': margin_pct,
             'profit_per_hour': profit_gp * 24,  # Assume ~24 flips per hour
             'capital_efficiency': margin_pct / 100,
-            'description': f"Buy {price_data.item.name} for {buy_price} GP, sell for {sell_price} GP"
+            'description': f"Buy {item_name} for {buy_price} GP, sell for {sell_price} GP"
         }
     
-    def _analyze_decanting(self, price_data: ProfitCalculation) -> Optional[Dict]:
-        """Analyze decanting potential using the decanting detector."""
-        try:
-            # Check if the decanting detector has this item in discovered families
-            detector_opportunities = self.decanting_detector.detect_opportunities()
-            
-            # Find if this item appears in the decanting opportunities
-            for opp in detector_opportunities:
-                if opp.get('item_id') == price_data.item.item_id:
-                    return {
-                        'item_id': price_data.item.item_id,
-                        'item_name': price_data.item.name,
-                        'strategy_type': 'decanting',
-                        'profit_gp': opp.get('profit_per_item', 0),
-                        'from_dose': opp.get('from_dose', 4),
-                        'to_dose': opp.get('to_dose', 3),
-                        'description': f"Decant {price_data.item.name} from {opp.get('from_dose', 4)} to {opp.get('to_dose', 3)} dose"
-                    }
-        except Exception:
-            pass  # If decanting analysis fails, just return None
-        return None
+    def _analyze_decanting(self, market: MarketSnapshot, row: int) -> Optional[Dict]:
+        """Look up this item in the decanting opportunities detected for the current scan."""
+        item_id = int(market.item_ids[row])
+        item_name = market.names[row]
+        
+        opp = self._decanting_by_item.get(item_id)
+        if not opp:
+            return None
+        
+        return {
+            'item_id': item_id,
+            'item_name': item_name,
+            'strategy_type': 'decanting',
+            'profit_gp': opp.get('profit_per_conversion', 0),
+            'from_dose': opp.get('from_dose', 4),
+            'to_dose': opp.get('to_dose', 3),
+            'description': f"Decant {item_name} from {opp.get('from_dose', 4)} to {opp.get('to_dose', 3)} dose"
+        }
     
-    def _analyze_set_combining(self, price_data: ProfitCalculation) -> Optional[Dict]:
+    def _analyze_set_combining(self, market: MarketSnapshot, row: int) -> Optional[Dict]:
         """Analyze set combining potential (simplified check)."""
         # This would need integration with set combining analysis
         # For now, return None as set combining is handled by specialized analyzer
         return None
     
-    def _analyze_crafting_potential(self, price_data: ProfitCalculation) -> Optional[Dict]:
+    def _analyze_crafting_potential(self, market: MarketSnapshot, row: int) -> Optional[Dict]:
         """Analyze if item can be used as crafting material."""
-        item = price_data.item
-        item_name = item.name.lower()
-        
-        # Simple heuristic for raw materials
-        raw_material_keywords = [
-            'ore', 'bar', 'log', 'plank', 'hide', 'leather', 'cloth', 'thread',
-            'gem', 'crystal', 'herb', 'seed', 'essence', 'shard', 'scale'
-        ]
+        item_name = market.names[row]
+        name_lower = item_name.lower()
         
-        if any(keyword in item_name for keyword in raw_material_keywords):
+        if any(keyword in name_lower for keyword in self.RAW_MATERIAL_KEYWORDS):
             return {
-                'item_id': item.item_id,
-                'item_name': item.name,
+                'item_id': int(market.item_ids[row]),
+                'item_name': item_name,
                 'strategy_type': 'crafting',
                 'profit_gp': 0,  # Would need recipe lookup
-                'description': f"Potential crafting material: {item.name}",
+                'description': f"Potential crafting material: {item_name}",
                 'notes': 'Requires recipe analysis'
             }
         
@@ -1358,7 +1358,7 @@ class MassOperationsViewSet(viewsets.GenericViewSet):
             
             # Scan decanting opportunities
             detector = DecantingDetector()
-            decanting_count = detector.scan_and_create_opportunities()
+            decanting_count = detector.scan_and_create_opportunities(batch=True)
             results['decanting_count'] = decanting_count
             results['total_count'] += decanting_count
             
@@ -30,8 +30,7 @@ class EnhancedVectorDatabaseBuilder:
     def __init__(self):
         self.embedding_service = SyncOllamaEmbeddingService()
         self.faiss_db = FaissVectorDatabase(index_name="osrs_items", dimension=1024)
-        self.batch_size = 15  # Optimized for Ollama
-        self.delay_between_batches = 0.3
+        self.batch_size = 512  # Items per build batch; the service splits them into /api/embed requests
         
         # Enhanced categorization patterns
         self.category_patterns = {
@@ -312,40 +311,34 @@ class EnhancedVectorDatabaseBuilder:
             # Get embeddings with retry logic
             logger.info(f"🧠 Getting embeddings for {len(texts)} items...")
             max_retries = 3
-            embeddings = None
+            matrix, ok = None, None
             
             for attempt in range(max_retries):
                 try:
-                    embeddings = self.embedding_service.generate_embeddings_batch(
-                        texts, 
-                        batch_size=5,  # Conservative for stability
-                        use_cache=True
-                    )
-                    if embeddings:
+                    # Already-embedded texts are cache hits on retry
+                    matrix, ok = self.embedding_service.generate_embedding_matrix(texts, use_cache=True)
+                    if ok.all():
                         break
                 except Exception as e:
                     logger.warning(f"⚠️ Embedding attempt {attempt + 1} failed: {e}")
                     if attempt < max_retries - 1:
                         time.sleep(2)  # Wait before retry
             
-            if not embeddings:
+            if ok is None or not ok.any():
                 logger.error("❌ Failed to get embeddings after retries")
                 continue
             
             # Store valid embeddings
             valid_count = 0
-            for item_id, text, embedding in zip(item_ids, texts, embeddings):
-                if embedding is not None:
-                    vectors_data.append((item_id, embedding))
+            for item_id, vector, valid in zip(item_ids, matrix, ok):
+                if valid:
+                    vectors_data.append((item_id, vector))
                     valid_count += 1
                 else:
                     logger.warning(f"⚠️ No embedding for item {item_id}")
             
             processed += valid_count
             logger.info(f"✅ Processed {valid_count}/{len(texts)} items in batch (Total: {processed})")
-            
-            # Brief pause between batches
-            time.sleep(self.delay_between_batches)
         
         logger.info(f"📈 Category distribution:")
         for category, count in sorted(category_stats.items(), key=lambda x: x[1], reverse=True):
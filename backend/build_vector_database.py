@@ -18,7 +18,6 @@ from django.db.models import Q
 from apps.items.models import Item
 from services.faiss_manager import FaissVectorDatabase
 from services.embedding_service import SyncOllamaEmbeddingService
-import time
 from typing import List, Dict, Tuple
 
 logging.basicConfig(level=logging.INFO)
@@ -29,8 +28,7 @@ class VectorDatabaseBuilder:
         self.embedding_service = SyncOllamaEmbeddingService()
         # snowflake-arctic-embed2 has 1024 dimensions
         self.faiss_db = FaissVectorDatabase(index_name="osrs_items", dimension=1024)
-        self.batch_size = 20  # Smaller batches for local Ollama
-        self.delay_between_batches = 0.5
+        self.batch_size = 512  # Items per build batch; the service splits them into /api/embed requests
         
     def create_item_text_representation(self, item: Item) -> str:
         """Create a rich text representation of an item for embedding."""
@@ -72,19 +70,10 @@ class VectorDatabaseBuilder:
         """Get embeddings for a batch of texts."""
         try:
             # Use the existing Ollama embedding service
-            embeddings = self.embedding_service.generate_embeddings_batch(
-                texts, 
-                batch_size=self.batch_size,
-                use_cache=True
-            )
-            # Filter out None values and return valid embeddings
-            valid_embeddings = []
-            for embedding in embeddings:
-                if embedding is not None:
-                    valid_embeddings.append(embedding)
-                else:
-                    logger.warning("Received None embedding from service")
-            return valid_embeddings
+            matrix, ok = self.embedding_service.generate_embedding_matrix(texts, use_cache=True)
+            if not ok.all():
+                logger.warning(f"Received no embedding for {int((~ok).sum())} texts from service")
+            return [vector.tolist() for vector in matrix[ok]]
         except Exception as e:
             logger.error(f"Failed to get embeddings: {e}")
             return []
@@ -132,30 +121,23 @@ class VectorDatabaseBuilder:
                 
             # Get embeddings
             logger.info(f"🧠 Getting embeddings for {len(texts)} items...")
-            embeddings = self.embedding_service.generate_embeddings_batch(
-                texts, 
-                batch_size=5,  # Small batches for Ollama
-                use_cache=True
-            )
+            matrix, ok = self.embedding_service.generate_embedding_matrix(texts, use_cache=True)
             
-            if not embeddings:
+            if not ok.any():
                 logger.error("No embeddings returned from service")
                 continue
             
             # Store valid embeddings for batch rebuild
             valid_count = 0
-            for item_id, text, embedding in zip(item_ids, texts, embeddings):
-                if embedding is not None:
-                    vectors_data.append((item_id, embedding))
+            for item_id, vector, valid in zip(item_ids, matrix, ok):
+                if valid:
+                    vectors_data.append((item_id, vector))
                     valid_count += 1
                 else:
                     logger.warning(f"Skipping item {item_id} due to failed embedding")
                     
             processed += valid_count
             logger.info(f"✅ Got embeddings for {valid_count}/{len(texts)} items. Total: {processed}/{total_items}")
-            
-            # Rate limiting
-            time.sleep(self.delay_between_batches)
         
         if not vectors_data:
             logger.error("No vectors created!")
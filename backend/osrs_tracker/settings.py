@@ -208,24 +208,66 @@ CACHES = {
     }
 }
 
+# IntelligentCache value encoding (orjson/msgpack/json, zstd/lz4/zlib/none)
+INTELLIGENT_CACHE_CODEC = config("INTELLIGENT_CACHE_CODEC", default="orjson")
+INTELLIGENT_CACHE_COMPRESSION = config("INTELLIGENT_CACHE_COMPRESSION", default="zstd")
+INTELLIGENT_CACHE_COMPRESS_THRESHOLD = config("INTELLIGENT_CACHE_COMPRESS_THRESHOLD", default=1024, cast=int)
+
+# Per-process L1 in front of the hot tier, invalidated via Redis pub/sub
+INTELLIGENT_CACHE_L1_ENABLED = config("INTELLIGENT_CACHE_L1_ENABLED", default=True, cast=bool)
+INTELLIGENT_CACHE_L1_MAX_ENTRIES = config("INTELLIGENT_CACHE_L1_MAX_ENTRIES", default=2000, cast=int)
+INTELLIGENT_CACHE_L1_TTL = config("INTELLIGENT_CACHE_L1_TTL", default=10, cast=int)  # Well under the hot tier's 30s
+
 # AI/ML Configuration
 OPENROUTER_API_KEY = config("OPENROUTER_API_KEY", default="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")
 OLLAMA_BASE_URL = config("OLLAMA_BASE_URL", default="http://localhost:11434")
 EMBEDDING_MODEL = config("EMBEDDING_MODEL", default="snowflake-arctic-embed2:latest")
+EMBEDDING_BATCH_SIZE = config("EMBEDDING_BATCH_SIZE", default=64, cast=int)  # texts per /api/embed request
+EMBEDDING_MAX_CONCURRENCY = config("EMBEDDING_MAX_CONCURRENCY", default=4, cast=int)  # embed requests in flight
+EMBEDDING_REFRESH_BATCH_SIZE = config("EMBEDDING_REFRESH_BATCH_SIZE", default=256, cast=int)  # items embedded + saved per chunk
+EMBEDDING_REFRESH_MAX_ITEMS = config("EMBEDDING_REFRESH_MAX_ITEMS", default=2000, cast=int)  # changed items embedded per scheduled run
 
 # RuneScape API Configuration
 RUNESCAPE_API_BASE_URL = "https://prices.runescape.wiki/api/v1/osrs"
 RUNESCAPE_USER_AGENT = "OSRS_High_Alch_Tracker - @latchy Discord"
+WIKI_PRICE_SNAPSHOT_MODE = config("WIKI_PRICE_SNAPSHOT_MODE", default=True, cast=bool)  # /latest + /5m + /1h once per cycle
+WIKI_PRICE_SNAPSHOT_MAX_AGE = config("WIKI_PRICE_SNAPSHOT_MAX_AGE", default=60, cast=int)  # seconds
+# Shared HTTP transport token buckets: host -> (requests per second, burst)
+HTTP_TRANSPORT_RATE_LIMITS = {
+    "prices.runescape.wiki": (5.0, 10),
+    "api.weirdgloop.org": (2.0, 5),
+}
+ASYNC_RUNTIME_CALL_TIMEOUT = config("ASYNC_RUNTIME_CALL_TIMEOUT", default=300, cast=int)  # seconds per sync->async call
+
+# Price tick stream (Redis Stream consumed by the reactive trading engine)
+PRICE_TICK_STREAM_URL = config("PRICE_TICK_STREAM_URL", default="")  # empty = default cache Redis
+PRICE_TICK_STREAM_MAXLEN = config("PRICE_TICK_STREAM_MAXLEN", default=100000, cast=int)
+
+# Historical chart payloads (LTTB-downsampled to this many points)
+CHART_DATA_TARGET_POINTS = config("CHART_DATA_TARGET_POINTS", default=300, cast=int)
 
 # FAISS Configuration
 FAISS_INDEX_PATH = BASE_DIR / "data" / "faiss"
+FAISS_INDEX_TYPE = config("FAISS_INDEX_TYPE", default="hnsw")  # flat, hnsw or ivfpq
+FAISS_HNSW_M = config("FAISS_HNSW_M", default=32, cast=int)
+FAISS_HNSW_EF_CONSTRUCTION = config("FAISS_HNSW_EF_CONSTRUCTION", default=200, cast=int)
+FAISS_HNSW_EF_SEARCH = config("FAISS_HNSW_EF_SEARCH", default=64, cast=int)
+FAISS_IVF_NLIST = config("FAISS_IVF_NLIST", default=0, cast=int)  # 0 = derive from corpus size
+FAISS_IVF_NPROBE = config("FAISS_IVF_NPROBE", default=16, cast=int)
+FAISS_PQ_M = config("FAISS_PQ_M", default=64, cast=int)
 EMBEDDINGS_CACHE_PATH = BASE_DIR / "data" / "embeddings"
+SEARCH_RUNTIME_RELOAD_INTERVAL = config("SEARCH_RUNTIME_RELOAD_INTERVAL", default=5.0, cast=float)  # seconds between index generation checks
 
 # InfluxDB Configuration (Time-series Database)
 INFLUXDB_URL = config("INFLUXDB_URL", default="http://localhost:8086")
 INFLUXDB_TOKEN = config("INFLUXDB_TOKEN", default="")
 INFLUXDB_ORG = config("INFLUXDB_ORG", default="osrs-tracker")
 INFLUXDB_BUCKET = config("INFLUXDB_BUCKET", default="market-data")
+INFLUXDB_BATCH_SIZE = config("INFLUXDB_BATCH_SIZE", default=5000, cast=int)  # Points per HTTP write
+INFLUXDB_FLUSH_INTERVAL = config("INFLUXDB_FLUSH_INTERVAL", default=5.0, cast=float)  # Seconds
+INFLUXDB_MAX_BUFFERED_POINTS = config("INFLUXDB_MAX_BUFFERED_POINTS", default=50000, cast=int)
+INFLUXDB_WRITE_RETRIES = config("INFLUXDB_WRITE_RETRIES", default=3, cast=int)
+INFLUXDB_SPOOL_DIR = BASE_DIR / "data" / "influx_spool"  # Batches kept here while InfluxDB is down
 
 # Data Sync Configuration
 PRICE_UPDATE_INTERVAL = 300  # 5 minutes
@@ -11,6 +11,8 @@ from openai import AsyncOpenAI
 from django.conf import settings
 from django.utils import timezone
 
+from services.async_runtime import run_sync
+
 logger = logging.getLogger(__name__)
 
 
@@ -461,18 +463,8 @@ class SyncOpenRouterAIService:
         self.async_service = OpenRouterAIService()
     
     def _run_async(self, coro):
-        """Run async coroutine in sync context."""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, coro)
-                    return future.result()
-            else:
-                return loop.run_until_complete(coro)
-        except RuntimeError:
-            return asyncio.run(coro)
+        """Run async coroutine on the shared background event loop."""
+        return run_sync(coro)
     
     def analyze_item_profitability(
         self, 
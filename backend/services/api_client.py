@@ -6,10 +6,12 @@ import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
-import httpx
 from django.conf import settings
 from django.utils import timezone as django_timezone
 
+from services.async_runtime import run_sync
+from services.http_transport import HttpTransportError, http_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,36 +31,13 @@ class RuneScapeWikiClient:
         self.client = None
     
     async def __aenter__(self):
-        """Async context manager entry."""
-        self.client = httpx.AsyncClient(
-            headers={"User-Agent": self.user_agent},
-            timeout=httpx.Timeout(30.0, connect=10.0, read=20.0, write=10.0),
-            limits=httpx.Limits(
-                max_keepalive_connections=2,  # Reduced from 5
-                max_connections=5,            # Reduced from 10 
-                keepalive_expiry=30.0         # Close idle connections after 30s
-            ),
-            follow_redirects=True
-        )
+        """Async context manager entry (requests go through the shared pooled transport)."""
+        self.client = http_transport
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit with proper cleanup."""
-        if self.client:
-            try:
-                # Force close with timeout protection
-                await asyncio.wait_for(self.client.aclose(), timeout=3.0)
-            except asyncio.TimeoutError:
-                logger.warning("RuneScape Wiki client close timed out after 3s, forcing cleanup")
-                # Force cleanup if timeout occurs
-                try:
-                    self.client._transport.close()
-                except Exception as e:
-                    logger.debug(f"Force cleanup failed: {e}")
-            except Exception as e:
-                logger.warning(f"Error closing RuneScape Wiki client: {e}")
-            finally:
-                self.client = None
+        """Async context manager exit; the shared transport stays attached for concurrent callers."""
+        pass
     
     async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """
@@ -81,21 +60,10 @@ class RuneScapeWikiClient:
         
         try:
             logger.debug(f"Making request to: {url} with params: {params}")
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
+            return await self.client.get_json(url, params=params)
             
-            data = response.json()
-            logger.debug(f"Received response with {len(str(data))} characters")
-            
-            return data
-            
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code} for {url}: {e.response.text}")
-            raise RuneScapeWikiAPIError(f"HTTP {e.response.status_code}: {e.response.text}")
-            
-        except httpx.RequestError as e:
-            logger.error(f"Request error for {url}: {str(e)}")
-            raise RuneScapeWikiAPIError(f"Request failed: {str(e)}")
+        except HttpTransportError as e:
+            raise RuneScapeWikiAPIError(str(e))
             
         except Exception as e:
             logger.error(f"Unexpected error for {url}: {str(e)}")
@@ -397,21 +365,8 @@ class SyncRuneScapeWikiClient:
         self.async_client = RuneScapeWikiClient()
     
     def _run_async(self, coro):
-        """Run async coroutine in sync context."""
-        try:
-            # Try to get existing event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If we're in an async context, we need to create a new loop
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, coro)
-                    return future.result()
-            else:
-                return loop.run_until_complete(coro)
-        except RuntimeError:
-            # No event loop, create one
-            return asyncio.run(coro)
+        """Run async coroutine on the shared background event loop."""
+        return run_sync(coro)
     
     def get_item_mapping(self) -> Dict:
         """Sync version of get_item_mapping."""
@@ -0,0 +1,132 @@
+"""
+Persistent Background Event Loop
+
+Synchronous callers (Celery tasks, management commands, Django views) submit
+coroutines to one long-lived event loop running in a daemon thread instead of
+spinning up a fresh loop per call. Anything bound to that loop - the pooled
+aiohttp session in http_transport, keep-alive connections, TLS sessions -
+survives between calls, so each sync call costs a queue hop rather than a
+full connection setup.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+from django.conf import settings
+
+from services.http_transport import http_transport
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRuntime:
+    """
+    Owns a background event loop thread and runs coroutines on it.
+
+    The thread is started lazily on first use and restarted after a fork
+    (Celery prefork workers inherit the parent's object but not its threads).
+    """
+
+    def __init__(self, default_timeout: Optional[float] = None):
+        self.default_timeout = (
+            default_timeout if default_timeout is not None
+            else getattr(settings, 'ASYNC_RUNTIME_CALL_TIMEOUT', 300)
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.stats = {'submitted': 0, 'failed': 0, 'timeouts': 0, 'starts': 0}
+        atexit.register(self.shutdown)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Get the running background loop, starting it if needed."""
+        loop = self._loop
+        if loop is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return loop
+
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._start()
+            return self._loop
+
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=_run, name='async-runtime', daemon=True)
+        thread.start()
+        ready.wait()
+
+        self._loop = loop
+        self._thread = thread
+        self._pid = os.getpid()
+        self.stats['starts'] += 1
+        logger.debug(f"Started async runtime loop in pid {self._pid}")
+
+    def in_runtime_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the background loop and block until it finishes.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait before cancelling it (defaults to ASYNC_RUNTIME_CALL_TIMEOUT)
+
+        Returns:
+            The coroutine's result (its exception is re-raised in the caller)
+        """
+        if self.in_runtime_thread():
+            coro.close()
+            raise RuntimeError("AsyncRuntime.run() called from the runtime loop itself; await the coroutine instead")
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.stats['submitted'] += 1
+        try:
+            return future.result(timeout if timeout is not None else self.default_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.stats['timeouts'] += 1
+            raise
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+
+    def shutdown(self, timeout: float = 5.0):
+        """Close loop-bound sessions and stop the background loop."""
+        loop, thread = self._loop, self._thread
+        if loop is None or self._pid != os.getpid() or not thread.is_alive():
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(http_transport.close_session(), loop).result(timeout)
+        except Exception as e:
+            logger.debug(f"Failed to close runtime HTTP session: {e}")
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+        self._loop = None
+        self._thread = None
+
+
+# Global runtime instance
+async_runtime = AsyncRuntime()
+
+
+def run_sync(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on the shared background loop from synchronous code."""
+    return async_runtime.run(coro, timeout=timeout)
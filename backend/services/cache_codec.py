@@ -0,0 +1,208 @@
+"""
+Typed Serialization Envelope for IntelligentCache
+
+Every cached value is stored as a 4-byte header followed by the payload:
+- 2 byte magic marker (never a valid JSON or pickle prefix)
+- 1 byte codec id (orjson, msgpack, json, pickle)
+- 1 byte compression id (none, zstd, lz4, zlib)
+
+Reads decode exactly what the header says instead of trying JSON and
+falling back to pickle. orjson, msgpack, zstandard and lz4 are optional;
+missing libraries fall back to stdlib json / zlib.
+"""
+
+import json
+import logging
+import pickle
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b'\x00\xc1'
+HEADER_SIZE = 4
+
+CODEC_JSON = 1
+CODEC_ORJSON = 2
+CODEC_MSGPACK = 3
+CODEC_PICKLE = 4
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+CODEC_IDS = {'json': CODEC_JSON, 'orjson': CODEC_ORJSON, 'msgpack': CODEC_MSGPACK, 'pickle': CODEC_PICKLE}
+COMPRESSION_IDS = {'none': COMPRESSION_NONE, 'zlib': COMPRESSION_ZLIB, 'zstd': COMPRESSION_ZSTD, 'lz4': COMPRESSION_LZ4}
+
+
+class CacheCodecError(Exception):
+    """Raised when a cached value cannot be encoded or decoded."""
+    pass
+
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def _encode_default(obj: Any) -> Any:
+    """Handle the types DjangoJSONEncoder supports (Decimal, timedelta, Promise, ...)."""
+    return _django_encoder.default(obj)
+
+
+def _encode_json(data: Any) -> bytes:
+    return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def _encode_orjson(data: Any) -> bytes:
+    return orjson.dumps(data, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _encode_msgpack(data: Any) -> bytes:
+    return msgpack.packb(data, default=_encode_default, use_bin_type=True, datetime=False)
+
+
+def _decode_msgpack(payload: bytes) -> Any:
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+def _zstd_compress(payload: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(payload)
+
+
+def _zstd_decompress(payload: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(payload)
+
+
+ENCODERS: Dict[int, Callable[[Any], bytes]] = {
+    CODEC_JSON: _encode_json,
+    CODEC_PICKLE: pickle.dumps,
+}
+DECODERS: Dict[int, Callable[[bytes], Any]] = {
+    CODEC_JSON: json.loads,
+    CODEC_PICKLE: pickle.loads,
+}
+COMPRESSORS: Dict[int, Callable[[bytes], bytes]] = {
+    COMPRESSION_ZLIB: zlib.compress,
+}
+DECOMPRESSORS: Dict[int, Callable[[bytes], bytes]] = {
+    COMPRESSION_NONE: lambda payload: payload,
+    COMPRESSION_ZLIB: zlib.decompress,
+}
+
+if orjson is not None:
+    ENCODERS[CODEC_ORJSON] = _encode_orjson
+    DECODERS[CODEC_ORJSON] = orjson.loads
+
+if msgpack is not None:
+    ENCODERS[CODEC_MSGPACK] = _encode_msgpack
+    DECODERS[CODEC_MSGPACK] = _decode_msgpack
+
+if zstandard is not None:
+    COMPRESSORS[COMPRESSION_ZSTD] = _zstd_compress
+    DECOMPRESSORS[COMPRESSION_ZSTD] = _zstd_decompress
+
+if lz4 is not None:
+    COMPRESSORS[COMPRESSION_LZ4] = lz4.frame.compress
+    DECOMPRESSORS[COMPRESSION_LZ4] = lz4.frame.decompress
+
+
+class CacheCodec:
+    """
+    Encodes cache values into self-describing envelopes.
+
+    Dicts and lists use the structured codec (orjson by default); anything
+    else, or structured data the codec can't represent, is pickled.
+    Payloads above the compression threshold are compressed.
+    """
+
+    def __init__(self, codec: Optional[str] = None, compression: Optional[str] = None,
+                 compress_threshold: Optional[int] = None):
+        codec = codec or getattr(settings, 'INTELLIGENT_CACHE_CODEC', 'orjson')
+        compression = compression or getattr(settings, 'INTELLIGENT_CACHE_COMPRESSION', 'zstd')
+
+        self.codec_id = self._resolve(codec, CODEC_IDS, ENCODERS, fallback=CODEC_JSON, kind='codec')
+        self.compression_id = self._resolve(
+            compression, COMPRESSION_IDS, COMPRESSORS, fallback=COMPRESSION_ZLIB, kind='compression'
+        ) if compression != 'none' else COMPRESSION_NONE
+        self.compress_threshold = (
+            compress_threshold if compress_threshold is not None
+            else getattr(settings, 'INTELLIGENT_CACHE_COMPRESS_THRESHOLD', 1024)
+        )
+
+    @staticmethod
+    def _resolve(name: str, ids: Dict[str, int], available: Dict[int, Callable], fallback: int, kind: str) -> int:
+        type_id = ids.get(name)
+        if type_id is None:
+            raise CacheCodecError(f"Unknown cache {kind} '{name}' (expected one of {sorted(ids)})")
+        if type_id not in available:
+            logger.warning(f"Cache {kind} '{name}' is not installed, falling back to stdlib")
+            return fallback
+        return type_id
+
+    def encode(self, data: Any) -> bytes:
+        """Serialize a value into an envelope."""
+        codec_id, payload = self._encode_payload(data)
+
+        compression_id = COMPRESSION_NONE
+        if self.compression_id != COMPRESSION_NONE and len(payload) >= self.compress_threshold:
+            compressed = COMPRESSORS[self.compression_id](payload)
+            # Incompressible payloads are stored raw
+            if len(compressed) < len(payload):
+                compression_id, payload = self.compression_id, compressed
+
+        return MAGIC + bytes((codec_id, compression_id)) + payload
+
+    def _encode_payload(self, data: Any) -> Tuple[int, bytes]:
+        if isinstance(data, (dict, list)):
+            try:
+                return self.codec_id, ENCODERS[self.codec_id](data)
+            except (TypeError, ValueError, OverflowError) as e:
+                logger.debug(f"Structured cache encoding failed, using pickle: {e}")
+        return CODEC_PICKLE, pickle.dumps(data)
+
+    def decode(self, blob: bytes) -> Any:
+        """Deserialize an envelope (or a value written before envelopes existed)."""
+        if not blob.startswith(MAGIC):
+            return self._decode_legacy(blob)
+
+        codec_id, compression_id = blob[2], blob[3]
+        decoder = DECODERS.get(codec_id)
+        decompressor = DECOMPRESSORS.get(compression_id)
+        if decoder is None or decompressor is None:
+            raise CacheCodecError(
+                f"Cache value uses codec {codec_id} / compression {compression_id}, which is not installed"
+            )
+
+        return decoder(decompressor(blob[HEADER_SIZE:]))
+
+    @staticmethod
+    def _decode_legacy(blob: bytes) -> Any:
+        # Pre-envelope values (JSON or pickle); gone once their TTL expires
+        try:
+            return json.loads(blob.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return pickle.loads(blob)
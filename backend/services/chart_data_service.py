@@ -0,0 +1,209 @@
+"""
+Chart Data Service
+
+Builds the historical series sent to price chart sockets:
+- Picks the stored interval (5m / 1h) and lookback window from the chart timeframe
+- Reads only the needed columns with values_list, newest first, so the query is
+  served by the (item, interval, -timestamp) index
+- Downsamples server-side with Largest-Triangle-Three-Buckets (LTTB), which keeps
+  the visual shape (spikes, dips) of the mid price at a fixed point count
+- Caches the encoded frame per (item, timeframe, time bucket); a repeat open
+  within the bucket is a single cache read
+"""
+
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.items.models import Item
+from apps.prices.models import HistoricalPricePoint
+from services.websocket_fanout import encode_frame
+
+logger = logging.getLogger(__name__)
+
+
+# timeframe -> (stored interval, lookback window, cache bucket seconds)
+TIMEFRAMES: Dict[str, Tuple[str, timedelta, int]] = {
+    '1m': ('5m', timedelta(hours=6), 60),
+    '5m': ('5m', timedelta(hours=24), 300),
+    '15m': ('5m', timedelta(days=3), 300),
+    '1h': ('1h', timedelta(days=7), 3600),
+    '4h': ('1h', timedelta(days=30), 3600),
+    '24h': ('1h', timedelta(days=90), 3600),
+    '7d': ('1h', timedelta(days=365), 3600),
+}
+DEFAULT_TIMEFRAME = '5m'
+
+CHART_COLUMNS = ('timestamp', 'avg_high_price', 'avg_low_price', 'high_price_volume', 'low_price_volume')
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select point indices with Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        x: Sorted x values (e.g. epoch seconds)
+        y: Values to preserve the shape of
+        threshold: Number of points to keep (first and last are always kept)
+
+    Returns:
+        Sorted array of selected indices
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket edges for the n - 2 interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+
+        # Average of the next bucket (the last point for the final bucket)
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous pick and that average
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[bucket + 1] = a
+
+    return selected
+
+
+class ChartDataService:
+    """
+    Historical chart series with downsampling and per-bucket payload caching.
+    """
+
+    CACHE_PREFIX = "chart_data"
+
+    def __init__(self, target_points: Optional[int] = None, max_rows: int = 10000):
+        self.target_points = target_points or getattr(settings, 'CHART_DATA_TARGET_POINTS', 300)
+        self.max_rows = max_rows
+        self._item_pks: Dict[int, int] = {}
+
+    def _resolve_timeframe(self, timeframe: str) -> Tuple[str, Tuple[str, timedelta, int]]:
+        if timeframe not in TIMEFRAMES:
+            timeframe = DEFAULT_TIMEFRAME
+        return timeframe, TIMEFRAMES[timeframe]
+
+    def _cache_key(self, item_id: int, timeframe: str, bucket_seconds: int) -> str:
+        return f"{self.CACHE_PREFIX}:{item_id}:{timeframe}:{int(time.time() // bucket_seconds)}"
+
+    def _item_pk(self, item_id: int) -> Optional[int]:
+        """
+        Map an OSRS item ID to the Item primary key.
+
+        Hits are memoized (pks never change); misses are not, since the item
+        may be inserted by the next mapping sync.
+        """
+        item_pk = self._item_pks.get(item_id)
+        if item_pk is None:
+            item_pk = Item.objects.filter(item_id=item_id).values_list('pk', flat=True).first()
+            if item_pk is not None:
+                self._item_pks[item_id] = item_pk
+        return item_pk
+
+    def get_series(self, item_id: int, timeframe: str) -> List[Dict]:
+        """
+        Load and downsample the historical series for a chart.
+
+        Args:
+            item_id: OSRS item ID
+            timeframe: Chart timeframe (see TIMEFRAMES)
+
+        Returns:
+            List of points with timestamp, high/low price and high/low volume, oldest first
+        """
+        timeframe, (interval, window, _) = self._resolve_timeframe(timeframe)
+        item_pk = self._item_pk(item_id)
+        if item_pk is None:
+            return []
+
+        rows = list(
+            HistoricalPricePoint.objects.filter(
+                item_id=item_pk,
+                interval=interval,
+                timestamp__gte=timezone.now() - window
+            ).order_by('-timestamp').values_list(*CHART_COLUMNS)[:self.max_rows]
+        )
+        if not rows:
+            return []
+        rows.reverse()
+
+        if len(rows) > self.target_points:
+            x = np.fromiter((row[0].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+            high = np.array([row[1] or 0 for row in rows], dtype=np.float64)
+            low = np.array([row[2] or 0 for row in rows], dtype=np.float64)
+            # Mid price where both sides traded, otherwise whichever side did
+            mid = np.where((high > 0) & (low > 0), (high + low) / 2, np.maximum(high, low))
+            rows = [rows[i] for i in lttb_indices(x, mid, self.target_points)]
+
+        return [
+            {
+                'timestamp': ts.isoformat(),
+                'high_price': high_price,
+                'low_price': low_price,
+                'high_volume': high_volume,
+                'low_volume': low_volume,
+            }
+            for ts, high_price, low_price, high_volume, low_volume in rows
+        ]
+
+    def get_chart_frame(self, item_id: int, timeframe: str) -> str:
+        """
+        Get the encoded 'historical_chart_data' frame for a chart socket.
+
+        Frames are cached per (item, timeframe) for the current time bucket, so
+        repeat opens are served without touching the database.
+
+        Args:
+            item_id: OSRS item ID
+            timeframe: Chart timeframe (see TIMEFRAMES)
+
+        Returns:
+            JSON text ready to send
+        """
+        item_id = int(item_id)
+        resolved, (_, _, bucket_seconds) = self._resolve_timeframe(timeframe)
+        cache_key = self._cache_key(item_id, resolved, bucket_seconds)
+
+        try:
+            frame = cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Chart data cache read failed: {e}")
+            frame = None
+        if frame is not None:
+            return frame
+
+        frame = encode_frame({
+            'type': 'historical_chart_data',
+            'item_id': item_id,
+            'timeframe': resolved,
+            'data': self.get_series(item_id, resolved),
+            'timestamp': timezone.now().isoformat()
+        })
+
+        try:
+            cache.set(cache_key, frame, timeout=bucket_seconds)
+        except Exception as e:
+            logger.warning(f"Chart data cache write failed: {e}")
+        return frame
+
+
+# Global service instance
+chart_data_service = ChartDataService()
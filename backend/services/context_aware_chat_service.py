@@ -33,6 +33,7 @@ from django.utils import timezone
 from django.db.models import Q
 
 from .faiss_manager import FaissVectorDatabase
+from .search_runtime import search_runtime
 from .enhanced_embedding_service import EnhancedEmbeddingService
 from .ollama_ai_service import OllamaAIService, TradingView, TradingContext, AIResponse
 from .unified_wiki_price_client import UnifiedPriceClient
@@ -102,8 +103,7 @@ class ContextAwareChatService:
     """
     
     def __init__(self):
-        # Initialize core services
-        self.faiss_db = FaissVectorDatabase("items", dimension=1024)
+        # Initialize core services (the FAISS index comes from the shared search runtime)
         self.embedding_service = EnhancedEmbeddingService()
         self.ai_service = OllamaAIService()
         self.confidence_service = AdvancedConfidenceScoringService()
@@ -201,6 +201,11 @@ class ContextAwareChatService:
         
         return status
     
+    @property
+    def faiss_db(self) -> FaissVectorDatabase:
+        """The process-wide item index (hot-reloaded when rebuilt on disk)."""
+        return search_runtime.get_faiss_db()
+    
     def _detect_query_intent(self, user_message: str) -> str:
         """
         Detect user query intent based on message content.
@@ -0,0 +1,246 @@
+"""
+Incremental Embedding Refresh
+
+Keeps ItemEmbedding rows and the search FAISS index in step with the catalog
+while doing work proportional to what changed:
+- Every item's source text (ItemEmbedding.create_source_text) is hashed after
+  normalization and compared with the content_hash stored on its embedding;
+  only new items and items whose hash changed are embedded
+- Changed rows are written with bulk_create / bulk_update
+- FAISS is patched in place (batch upsert of changed vectors, removal of
+  deactivated items, backfill of rows missing from the index) and saved once,
+  which the search runtime picks up as a new index generation
+
+Building the source texts is the only per-run cost that scales with the
+catalog; it is a handful of prefetched queries and no model calls.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.embeddings.models import ItemEmbedding
+from apps.items.models import Item
+from services.embedding_service import SyncOllamaEmbeddingService
+from services.faiss_manager import FaissVectorDatabase
+from services.search_runtime import SEARCH_INDEX_NAME
+
+logger = logging.getLogger(__name__)
+
+
+# (item, source text, content hash)
+PendingEmbedding = Tuple[Item, str, str]
+
+
+def _split_model(model: str) -> Tuple[str, str]:
+    """Split an Ollama model tag ("name:version") into ItemEmbedding's two columns."""
+    name, _, version = model.partition(':')
+    return name, version or 'latest'
+
+
+class EmbeddingRefreshPipeline:
+    """
+    Content-hash driven embedding refresh for items.
+    """
+
+    def __init__(
+        self,
+        embedding_service: Optional[SyncOllamaEmbeddingService] = None,
+        index_name: str = SEARCH_INDEX_NAME,
+        batch_size: Optional[int] = None
+    ):
+        self._embedding_service = embedding_service
+        self.index_name = index_name
+        self.batch_size = batch_size or getattr(settings, 'EMBEDDING_REFRESH_BATCH_SIZE', 256)
+        self.model = getattr(settings, 'EMBEDDING_MODEL', 'snowflake-arctic-embed2:latest')
+        self.model_name, self.model_version = _split_model(self.model)
+
+    @property
+    def embedding_service(self) -> SyncOllamaEmbeddingService:
+        if self._embedding_service is None:
+            self._embedding_service = SyncOllamaEmbeddingService()
+        return self._embedding_service
+
+    def content_hash(self, source_text: str) -> str:
+        return ItemEmbedding.compute_content_hash(source_text, self.model)
+
+    def _items(self, items=None):
+        queryset = items if items is not None else Item.objects.filter(is_active=True)
+        # Everything create_source_text reads, in three queries per chunk
+        return queryset.select_related('profit_calc', 'historical_analysis').prefetch_related(
+            'categories__category'
+        )
+
+    def find_changed(self, items=None, force: bool = False) -> Tuple[List[PendingEmbedding], List[int]]:
+        """
+        Hash every item's source text and compare it with the stored hash.
+
+        Args:
+            items: Item queryset to check (defaults to all active items)
+            force: Treat every item as changed
+
+        Returns:
+            (changed, unchanged_item_ids): changed items with their new text and
+            hash (items without an embedding first), and the OSRS IDs of the rest
+        """
+        stored: Dict[int, str] = dict(ItemEmbedding.objects.values_list('item_id', 'content_hash'))
+
+        changed: List[PendingEmbedding] = []
+        unchanged: List[int] = []
+        for item in self._items(items).iterator(chunk_size=500):
+            source_text = ItemEmbedding.create_source_text(item)
+            content_hash = self.content_hash(source_text)
+            if force or stored.get(item.pk) != content_hash:
+                changed.append((item, source_text, content_hash))
+            else:
+                unchanged.append(item.item_id)
+
+        changed.sort(key=lambda pending: pending[0].pk in stored)
+        return changed, unchanged
+
+    def embed_and_store(
+        self,
+        pending: List[PendingEmbedding],
+        faiss_db: FaissVectorDatabase
+    ) -> Dict[str, int]:
+        """
+        Embed pending items, save their rows and patch them into the FAISS index.
+
+        Args:
+            pending: (item, source text, content hash) tuples
+            faiss_db: Index to patch (not saved here)
+
+        Returns:
+            Counts of embedded, failed and FAISS-upserted items
+        """
+        stats = {'embedded': 0, 'failed': 0, 'faiss_upserted': 0}
+
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            matrix, ok = self.embedding_service.generate_embedding_matrix([text for _, text, _ in chunk])
+            stats['failed'] += int((~ok).sum())
+
+            done = [entry for entry, valid in zip(chunk, ok) if valid]
+            if not done:
+                continue
+            vectors = matrix[ok]
+
+            upserted = faiss_db.upsert_vectors([item.item_id for item, _, _ in done], vectors)
+            # Without the hash a row counts as changed, so a failed index patch is retried next run
+            self._save_rows(done, vectors, store_hash=upserted == len(done))
+            stats['embedded'] += len(done)
+            stats['faiss_upserted'] += upserted
+
+        return stats
+
+    def _save_rows(self, done: List[PendingEmbedding], vectors: np.ndarray, store_hash: bool = True):
+        """Create or update the ItemEmbedding rows of one embedded chunk (hash left blank unless store_hash)."""
+        existing = {
+            embedding.item_id: embedding
+            for embedding in ItemEmbedding.objects.filter(item__in=[item for item, _, _ in done]).only('id', 'item_id')
+        }
+        now = timezone.now()
+        to_create, to_update = [], []
+
+        for (item, source_text, content_hash), vector in zip(done, vectors):
+            embedding = existing.get(item.pk) or ItemEmbedding(item=item)
+            embedding.vector = vector.tolist()
+            embedding.source_text = source_text
+            embedding.content_hash = content_hash if store_hash else ''
+            embedding.model_name = self.model_name
+            embedding.model_version = self.model_version
+            embedding.updated_at = now
+            (to_update if embedding.pk else to_create).append(embedding)
+
+        with transaction.atomic():
+            if to_create:
+                ItemEmbedding.objects.bulk_create(to_create)
+            if to_update:
+                ItemEmbedding.objects.bulk_update(
+                    to_update,
+                    ['vector', 'source_text', 'content_hash', 'model_name', 'model_version', 'updated_at']
+                )
+
+    def _backfill(self, faiss_db: FaissVectorDatabase, item_ids: Iterable[int]) -> int:
+        """Add stored vectors of up-to-date items that are missing from the index."""
+        indexed = faiss_db.indexed_ids()
+        missing = [item_id for item_id in item_ids if item_id not in indexed]
+        if not missing:
+            return 0
+
+        rows = list(
+            ItemEmbedding.objects.filter(item__item_id__in=missing).values_list('item__item_id', 'vector')
+        )
+        if not rows:
+            return 0
+        return faiss_db.upsert_vectors(
+            [item_id for item_id, _ in rows],
+            np.asarray([vector for _, vector in rows], dtype=np.float32)
+        )
+
+    def refresh(
+        self,
+        items=None,
+        force: bool = False,
+        max_items: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Re-embed changed items and patch the FAISS index in place.
+
+        Args:
+            items: Item queryset to refresh (defaults to all active items, in
+                which case vectors of items no longer active are also removed)
+            force: Re-embed every item regardless of its hash
+            max_items: Cap on items embedded this run; the rest keep their
+                stale hash and are picked up by the next run
+
+        Returns:
+            Dict of counts (checked, unchanged, changed, embedded, failed,
+            deferred, faiss_upserted, faiss_backfilled, faiss_removed)
+        """
+        started = time.perf_counter()
+        changed, unchanged = self.find_changed(items, force=force)
+
+        deferred = 0
+        pending = changed
+        if max_items is not None and len(changed) > max_items:
+            pending, deferred = changed[:max_items], len(changed) - max_items
+
+        faiss_db = FaissVectorDatabase(index_name=self.index_name)
+        stats = {
+            'checked': len(changed) + len(unchanged),
+            'unchanged': len(unchanged),
+            'changed': len(changed),
+            'deferred': deferred,
+            **self.embed_and_store(pending, faiss_db),
+        }
+
+        stats['faiss_backfilled'] = self._backfill(faiss_db, unchanged)
+
+        stats['faiss_removed'] = 0
+        if items is None:
+            active_ids = set(unchanged)
+            active_ids.update(item.item_id for item, _, _ in changed)
+            stats['faiss_removed'] = faiss_db.remove_vectors(faiss_db.indexed_ids() - active_ids)
+
+        if stats['faiss_upserted'] or stats['faiss_backfilled'] or stats['faiss_removed']:
+            if not faiss_db.save_index() and pending:
+                # The patched vectors never reached disk; re-embed these next run
+                ItemEmbedding.objects.filter(item__in=[item for item, _, _ in pending]).update(content_hash='')
+
+        logger.info(
+            f"Embedding refresh: {stats['changed']}/{stats['checked']} items changed, "
+            f"{stats['embedded']} embedded, {stats['failed']} failed, {stats['deferred']} deferred, "
+            f"FAISS +{stats['faiss_upserted'] + stats['faiss_backfilled']}/-{stats['faiss_removed']} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return stats
+
+
+# Global pipeline instance
+embedding_refresh_pipeline = EmbeddingRefreshPipeline()
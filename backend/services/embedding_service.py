@@ -1,16 +1,25 @@
 """
 Embedding service for generating vector embeddings using Ollama.
+
+Batches go through Ollama's multi-input /api/embed endpoint: cached texts are
+fetched with one cache multi-get, the misses are split into requests of
+EMBEDDING_BATCH_SIZE texts, and up to EMBEDDING_MAX_CONCURRENCY requests run
+at once. Results come back as a contiguous float32 matrix ready for FAISS.
+
+Requires ollama-python 0.3+ (Client.embed) and an Ollama server 0.3.4+ (/api/embed).
 """
 
 import asyncio
 import hashlib
 import logging
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 import ollama
 from django.conf import settings
 from django.core.cache import cache
 
+from services.async_runtime import run_sync
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +37,14 @@ class OllamaEmbeddingService:
         self.base_url = getattr(settings, 'OLLAMA_BASE_URL', 'http://localhost:11434')
         self.model_name = getattr(settings, 'EMBEDDING_MODEL', 'snowflake-arctic-embed2:latest')
         self.client = ollama.Client(host=self.base_url)
+        self.batch_size = getattr(settings, 'EMBEDDING_BATCH_SIZE', 64)
+        self.max_concurrency = getattr(settings, 'EMBEDDING_MAX_CONCURRENCY', 4)
+        self.cache_timeout = 86400  # 24 hours
+        self._model_ready = False
+    
+    def _cache_key(self, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode()).hexdigest()
+        return f"embedding:{self.model_name}:{text_hash}"
         
     async def _ensure_model_available(self) -> bool:
         """
@@ -36,6 +53,9 @@ class OllamaEmbeddingService:
         Returns:
             True if model is available, False otherwise
         """
+        if self._model_ready:
+            return True
+        
         try:
             # Check if model is already pulled
             models = await asyncio.get_event_loop().run_in_executor(
@@ -54,6 +74,7 @@ class OllamaEmbeddingService:
                 
                 logger.info(f"Successfully pulled model {self.model_name}")
             
+            self._model_ready = True
             return True
             
         except Exception as e:
@@ -78,8 +99,7 @@ class OllamaEmbeddingService:
         # Create cache key
         cache_key = None
         if use_cache:
-            text_hash = hashlib.sha256(text.encode()).hexdigest()
-            cache_key = f"embedding:{self.model_name}:{text_hash}"
+            cache_key = self._cache_key(text)
             
             # Check cache first
             cached_embedding = cache.get(cache_key)
@@ -95,22 +115,16 @@ class OllamaEmbeddingService:
             logger.debug(f"Generating embedding for text: {text[:100]}...")
             
             # Generate embedding using Ollama
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.client.embeddings(
-                    model=self.model_name,
-                    prompt=text
-                )
-            )
+            response = await asyncio.to_thread(self.client.embed, model=self.model_name, input=text)
             
-            if 'embedding' not in response:
+            if not response.get('embeddings'):
                 raise EmbeddingServiceError("No embedding in response")
             
-            embedding = response['embedding']
+            embedding = list(response['embeddings'][0])
             
             # Cache the result
             if use_cache and cache_key:
-                cache.set(cache_key, embedding, timeout=86400)  # 24 hours
+                cache.set(cache_key, embedding, timeout=self.cache_timeout)
                 logger.debug(f"Cached embedding for text: {text[:50]}...")
             
             logger.debug(f"Generated embedding of dimension {len(embedding)}")
@@ -120,10 +134,112 @@ class OllamaEmbeddingService:
             logger.error(f"Failed to generate embedding: {e}")
             raise EmbeddingServiceError(f"Embedding generation failed: {e}")
     
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.embed(model=self.model_name, input=texts)
+        embeddings = response.get('embeddings') or []
+        if len(embeddings) != len(texts):
+            raise EmbeddingServiceError(f"Got {len(embeddings)} embeddings for {len(texts)} texts")
+        return embeddings
+    
+    async def _embed_request(self, texts: List[str], semaphore: asyncio.Semaphore) -> List[Optional[List[float]]]:
+        """
+        Embed one chunk of texts with a single /api/embed call.
+        
+        If the call fails, the chunk is retried one text at a time so a single
+        bad input only loses its own embedding.
+        """
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(self._embed_texts, texts)
+            except Exception as e:
+                logger.warning(f"Embedding request for {len(texts)} texts failed: {e}")
+                if len(texts) == 1:
+                    return [None]
+            
+            embeddings = []
+            for text in texts:
+                try:
+                    embeddings.extend(await asyncio.to_thread(self._embed_texts, [text]))
+                except Exception as e:
+                    logger.debug(f"Failed to embed text {text[:50]}: {e}")
+                    embeddings.append(None)
+            return embeddings
+    
+    async def generate_embedding_matrix(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generate embeddings for many texts as one float32 matrix.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per /api/embed request (defaults to EMBEDDING_BATCH_SIZE)
+            use_cache: Whether to read and populate the embedding cache
+            
+        Returns:
+            (matrix, ok) where matrix is a C-contiguous (len(texts), dim) float32
+            array and ok is a boolean mask of rows that were embedded
+        """
+        batch_size = batch_size or self.batch_size
+        vectors: Dict[str, List[float]] = {}
+        
+        unique_texts = list(dict.fromkeys(text for text in texts if text and text.strip()))
+        
+        if use_cache and unique_texts:
+            keys = {self._cache_key(text): text for text in unique_texts}
+            try:
+                cached = cache.get_many(list(keys))
+            except Exception as e:
+                logger.warning(f"Embedding cache multi-get failed: {e}")
+                cached = {}
+            vectors.update({keys[key]: vector for key, vector in cached.items() if vector})
+        
+        missing = [text for text in unique_texts if text not in vectors]
+        if missing:
+            if not await self._ensure_model_available():
+                raise EmbeddingServiceError(f"Model {self.model_name} is not available")
+            
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            chunks = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+            responses = await asyncio.gather(*(self._embed_request(chunk, semaphore) for chunk in chunks))
+            
+            fresh = {}
+            for chunk, embeddings in zip(chunks, responses):
+                fresh.update((text, vector) for text, vector in zip(chunk, embeddings) if vector is not None)
+            vectors.update(fresh)
+            
+            if use_cache and fresh:
+                try:
+                    cache.set_many(
+                        {self._cache_key(text): list(vector) for text, vector in fresh.items()},
+                        timeout=self.cache_timeout
+                    )
+                except Exception as e:
+                    logger.warning(f"Embedding cache write failed: {e}")
+            
+            logger.info(
+                f"Embedded {len(fresh)}/{len(missing)} uncached texts in {len(chunks)} requests "
+                f"({len(unique_texts) - len(missing)} cache hits)"
+            )
+        
+        dimension = len(next(iter(vectors.values()))) if vectors else 0
+        matrix = np.zeros((len(texts), dimension), dtype=np.float32)
+        ok = np.zeros(len(texts), dtype=bool)
+        for row, text in enumerate(texts):
+            vector = vectors.get(text)
+            if vector is not None and len(vector) == dimension:
+                matrix[row] = vector
+                ok[row] = True
+        
+        return matrix, ok
+    
     async def generate_embeddings_batch(
         self, 
         texts: List[str], 
-        batch_size: int = 10, 
+        batch_size: Optional[int] = None, 
         use_cache: bool = True
     ) -> List[Optional[List[float]]]:
         """
@@ -131,51 +247,16 @@ class OllamaEmbeddingService:
         
         Args:
             texts: List of texts to generate embeddings for
-            batch_size: Number of texts to process concurrently
+            batch_size: Texts per /api/embed request (defaults to EMBEDDING_BATCH_SIZE)
             use_cache: Whether to use Redis cache
             
         Returns:
             List of embedding vectors (or None for failed embeddings)
         """
-        logger.info(f"Generating embeddings for {len(texts)} texts in batches of {batch_size}")
-        
-        all_embeddings = []
+        matrix, ok = await self.generate_embedding_matrix(texts, batch_size=batch_size, use_cache=use_cache)
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            logger.debug(f"Processing batch {i//batch_size + 1}: texts {i+1}-{min(i+batch_size, len(texts))}")
-            
-            # Create tasks for this batch
-            tasks = [
-                self.generate_embedding(text, use_cache=use_cache) 
-                for text in batch
-            ]
-            
-            try:
-                # Execute batch concurrently
-                batch_embeddings = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Process results
-                for j, (text, embedding) in enumerate(zip(batch, batch_embeddings)):
-                    if isinstance(embedding, Exception):
-                        logger.warning(f"Failed to embed text {i+j+1}: {embedding}")
-                        all_embeddings.append(None)
-                    else:
-                        all_embeddings.append(embedding)
-                
-                # Small delay between batches to avoid overwhelming Ollama
-                if i + batch_size < len(texts):
-                    await asyncio.sleep(0.1)
-                    
-            except Exception as e:
-                logger.error(f"Error in batch {i//batch_size + 1}: {e}")
-                # Add None for failed batch
-                all_embeddings.extend([None] * len(batch))
-        
-        successful_count = sum(1 for emb in all_embeddings if emb is not None)
-        logger.info(f"Generated {successful_count}/{len(texts)} embeddings successfully")
-        
-        return all_embeddings
+        logger.info(f"Generated {int(ok.sum())}/{len(texts)} embeddings successfully")
+        return [row.tolist() if valid else None for row, valid in zip(matrix, ok)]
     
     def calculate_similarity(
         self, 
@@ -287,21 +368,8 @@ class SyncOllamaEmbeddingService:
         self.async_service = OllamaEmbeddingService()
     
     def _run_async(self, coro):
-        """Run async coroutine in sync context."""
-        try:
-            # Try to get existing event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If we're in an async context, create new loop in thread
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, coro)
-                    return future.result()
-            else:
-                return loop.run_until_complete(coro)
-        except RuntimeError:
-            # No event loop, create one
-            return asyncio.run(coro)
+        """Run async coroutine on the shared background event loop."""
+        return run_sync(coro)
     
     def generate_embedding(self, text: str, use_cache: bool = True) -> Optional[List[float]]:
         """Sync version of generate_embedding."""
@@ -312,7 +380,7 @@ class SyncOllamaEmbeddingService:
     def generate_embeddings_batch(
         self, 
         texts: List[str], 
-        batch_size: int = 10, 
+        batch_size: Optional[int] = None, 
         use_cache: bool = True
     ) -> List[Optional[List[float]]]:
         """Sync version of generate_embeddings_batch."""
@@ -320,6 +388,17 @@ class SyncOllamaEmbeddingService:
             self.async_service.generate_embeddings_batch(texts, batch_size, use_cache)
         )
     
+    def generate_embedding_matrix(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Sync version of generate_embedding_matrix."""
+        return self._run_async(
+            self.async_service.generate_embedding_matrix(texts, batch_size, use_cache)
+        )
+    
     def calculate_similarity(
         self, 
         embedding1: List[float], 
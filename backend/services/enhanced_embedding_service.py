@@ -554,47 +554,45 @@ class EnhancedEmbeddingService:
     
     async def regenerate_all_embeddings(self, force: bool = False) -> Dict[str, Any]:
         """
-        Regenerate all embeddings with enhanced context.
+        Bring all item embeddings up to date.
+        
+        Items are re-embedded only when the hash of their source text changed
+        (or they have no embedding yet), and the search index is patched in
+        place; see services.embedding_refresh.
         
         Args:
-            force: Whether to regenerate existing embeddings
+            force: Whether to re-embed every item regardless of its hash
             
         Returns:
             Dictionary with regeneration results
         """
-        logger.info("Starting enhanced embedding regeneration")
+        from .embedding_refresh import embedding_refresh_pipeline
+        
+        logger.info("Starting incremental embedding regeneration")
         
         try:
-            # Get all active items
-            def get_items():
-                query = Item.objects.filter(is_active=True)
-                if not force:
-                    # Skip items that already have embeddings
-                    query = query.filter(embedding__isnull=True)
-                return list(query.values_list('item_id', flat=True))
-            
-            item_ids = await asyncio.get_event_loop().run_in_executor(None, get_items)
+            stats = await asyncio.get_event_loop().run_in_executor(
+                None, lambda: embedding_refresh_pipeline.refresh(force=force)
+            )
             
-            if not item_ids:
+            if not stats['changed']:
                 return {
                     'status': 'completed',
                     'message': 'No items need embedding generation',
                     'total_items': 0,
-                    'successful_embeddings': 0
+                    'successful_embeddings': 0,
+                    'unchanged_items': stats['unchanged']
                 }
             
-            # Generate embeddings
-            embeddings = await self.batch_generate_embeddings(item_ids, save_to_db=True)
-            
-            # Calculate results
-            successful_count = sum(1 for emb in embeddings.values() if emb is not None)
-            
             return {
                 'status': 'completed',
-                'total_items': len(item_ids),
-                'successful_embeddings': successful_count,
-                'failed_embeddings': len(item_ids) - successful_count,
-                'success_rate': (successful_count / len(item_ids)) * 100 if item_ids else 0
+                'total_items': stats['changed'],
+                'successful_embeddings': stats['embedded'],
+                'failed_embeddings': stats['failed'],
+                'success_rate': (stats['embedded'] / stats['changed']) * 100,
+                'unchanged_items': stats['unchanged'],
+                'faiss_upserted': stats['faiss_upserted'],
+                'faiss_removed': stats['faiss_removed']
             }
             
         except Exception as e:
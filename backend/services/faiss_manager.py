@@ -1,12 +1,27 @@
 """
 FAISS vector database manager for fast similarity search.
+
+Indices are wrapped in IndexIDMap2 so vectors are addressed by their native
+int64 item IDs. The underlying ANN structure is selectable:
+- flat: exact IndexFlatIP (small corpora, tests)
+- hnsw: IndexHNSWFlat graph search (default, no training needed)
+- ivfpq: IndexIVFPQ compressed lists (large corpora, trained on rebuild)
+
+On disk an index is three files: the bare ANN index (.faiss), the slot ->
+item ID map (_ids.npy) and a small JSON metadata file. Read-only workers
+memory-map the first two, so every gunicorn/Daphne/Celery process shares
+one copy of the pages; the in-memory ID-mapped index is only materialized
+when a process writes.
 """
 
 import json
 import logging
+import math
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 import faiss
 import numpy as np
 from django.conf import settings
@@ -15,6 +30,27 @@ from django.utils import timezone
 logger = logging.getLogger(__name__)
 
 
+INDEX_TYPE_FLAT = 'flat'
+INDEX_TYPE_HNSW = 'hnsw'
+INDEX_TYPE_IVFPQ = 'ivfpq'
+INDEX_TYPES = (INDEX_TYPE_FLAT, INDEX_TYPE_HNSW, INDEX_TYPE_IVFPQ)
+
+# IVF training wants ~39 points per list; 8-bit PQ codebooks need 256 points
+IVF_MIN_POINTS_PER_LIST = 39
+PQ_MIN_TRAINING_VECTORS = 256
+
+# Only flat indices renumber on delete; ANN indices retire ID-map slots and
+# are compacted once this fraction of slots is dead
+RETIRED_COMPACT_RATIO = 0.2
+
+# Re-reads of an index caught mid-save before giving up
+GENERATION_READ_ATTEMPTS = 5
+
+# IO_FLAG_MMAP only maps IVF lists; IO_FLAG_MMAP_IFC (newer FAISS) maps every
+# index type's storage, so prefer it when available (the two don't combine)
+MMAP_IO_FLAGS = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
 class FaissManagerError(Exception):
     """Custom exception for FAISS manager errors."""
     pass
@@ -23,25 +59,54 @@ class FaissManagerError(Exception):
 class FaissVectorDatabase:
     """
     FAISS-based vector database for fast similarity search.
+    
+    Nothing is read from disk until the first search or write.
     """
     
-    def __init__(self, index_name: str = "items", dimension: int = 1024):
+    def __init__(self, index_name: str = "items", dimension: int = 1024, index_type: Optional[str] = None):
         self.index_name = index_name
         self.dimension = dimension
+        self.index_type = (index_type or getattr(settings, 'FAISS_INDEX_TYPE', INDEX_TYPE_HNSW)).lower()
+        if self.index_type not in INDEX_TYPES:
+            raise FaissManagerError(f"Unknown FAISS index type '{self.index_type}' (expected one of {INDEX_TYPES})")
         
         # Paths
         self.base_path = Path(settings.FAISS_INDEX_PATH)
         self.base_path.mkdir(parents=True, exist_ok=True)
         
         self.index_file = self.base_path / f"{index_name}.faiss"
+        self.ids_file = self.base_path / f"{index_name}_ids.npy"
         self.metadata_file = self.base_path / f"{index_name}_metadata.json"
         
-        # FAISS index
+        # Writable ID-mapped index (only built when this process writes)
         self.index = None
+        # Read-only, memory-mapped ANN index and slot -> item ID map
+        self._mmap_index = None
+        self._id_map: Optional[np.ndarray] = None
+        
         self.metadata = {}
+        self._known_ids: Optional[Set[int]] = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+    
+    def _ensure_loaded(self):
+        """Load the index from disk on first use."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_index()
+                self._loaded = True
+    
+    def load(self) -> bool:
+        """
+        Load the index now instead of on the first search.
         
-        # Load existing index if available
-        self._load_index()
+        Returns:
+            True if an index with vectors is loaded
+        """
+        self._ensure_loaded()
+        return self._live_count() > 0
     
     def _load_index(self) -> bool:
         """
@@ -54,14 +119,28 @@ class FaissVectorDatabase:
             if self.index_file.exists() and self.metadata_file.exists():
                 logger.info(f"Loading existing FAISS index: {self.index_file}")
                 
-                # Load FAISS index
-                self.index = faiss.read_index(str(self.index_file))
-                
                 # Load metadata
                 with open(self.metadata_file, 'r') as f:
                     self.metadata = json.load(f)
+                self._known_ids = None
+                
+                if self.ids_file.exists():
+                    # Map the index and ID map instead of reading them into this process
+                    self._mmap_index = faiss.read_index(str(self.index_file), MMAP_IO_FLAGS)
+                    self._id_map = np.load(self.ids_file, mmap_mode='r')
+                    if len(self._id_map) != self._mmap_index.ntotal:
+                        raise FaissManagerError(
+                            f"ID map has {len(self._id_map)} slots for {self._mmap_index.ntotal} vectors"
+                        )
+                else:
+                    index = faiss.read_index(str(self.index_file))
+                    if isinstance(index, faiss.IndexIDMap2):
+                        self.index = index
+                    else:
+                        self._upgrade_legacy_index(index)
                 
-                logger.info(f"Loaded index with {self.index.ntotal} vectors")
+                self._apply_search_params()
+                logger.info(f"Loaded {self.metadata.get('index_type')} index with {self._base_index().ntotal} vectors")
                 return True
             else:
                 logger.info("No existing index found, will create new one")
@@ -69,27 +148,302 @@ class FaissVectorDatabase:
                 
         except Exception as e:
             logger.error(f"Failed to load FAISS index: {e}")
+            self._mmap_index = None
+            self._id_map = None
             self._create_new_index()
             return False
     
-    def _create_new_index(self):
-        """Create a new FAISS index."""
-        logger.info(f"Creating new FAISS index with dimension {self.dimension}")
+    def _upgrade_legacy_index(self, legacy_index):
+        """
+        Wrap a pre-ID-map index (positions mapped through metadata['item_ids']).
+        
+        The vectors are kept in an exact flat index; the next rebuild switches
+        to the configured ANN type.
+        """
+        legacy_ids = self.metadata.get('item_ids', [])
+        if len(legacy_ids) != legacy_index.ntotal:
+            raise FaissManagerError(
+                f"Legacy metadata has {len(legacy_ids)} ids for {legacy_index.ntotal} vectors"
+            )
+        
+        vectors = legacy_index.reconstruct_n(0, legacy_index.ntotal) if legacy_index.ntotal else None
+        self._create_new_index(INDEX_TYPE_FLAT)
+        if vectors is not None:
+            self.index.add_with_ids(vectors, np.asarray(legacy_ids, dtype=np.int64))
+        
+        logger.info(f"Upgraded legacy FAISS index {self.index_name} to an ID-mapped flat index")
+    
+    def _ensure_writable(self):
+        """
+        Materialize the in-memory ID-mapped index before a write.
+        
+        A memory-mapped index is read-only, so the index, its ID map and the
+        metadata are re-read into memory together.
+        """
+        self._ensure_loaded()
+        if self.index is not None:
+            return
+        
+        if self._mmap_index is None:
+            self._create_new_index()
+            return
+        
+        # Another process may have saved since the files were mapped, so the
+        # mapped ID map cannot be paired with a fresh read of the index file
+        self.index, self.metadata = self._read_generation()
+        self._mmap_index = None
+        self._id_map = None
+        self._known_ids = None
+        self._apply_search_params()
+    
+    def _file_generation(self) -> Tuple[Tuple[int, int], ...]:
+        """(inode, mtime_ns) of the index, ID map and metadata files, in save order."""
+        return tuple(
+            (stat.st_ino, stat.st_mtime_ns)
+            for stat in (os.stat(path) for path in (self.index_file, self.ids_file, self.metadata_file))
+        )
+    
+    def _read_generation(self) -> Tuple[faiss.IndexIDMap2, Dict]:
+        """
+        Read the index, ID map and metadata into memory, all from the same save.
+        
+        save_index replaces the three files one after another, so a read is
+        only accepted when no file was replaced while reading and their mtimes
+        are in save order (not caught between two of the renames).
+        """
+        for attempt in range(GENERATION_READ_ATTEMPTS):
+            generation = self._file_generation()
+            base = faiss.read_index(str(self.index_file))
+            id_map = np.load(self.ids_file)
+            metadata = json.loads(self.metadata_file.read_text())
+            
+            mtimes = [mtime for _, mtime in generation]
+            if (self._file_generation() == generation and mtimes == sorted(mtimes)
+                    and len(id_map) == base.ntotal):
+                return self._wrap_id_map(base, id_map), metadata
+            time.sleep(0.05 * (attempt + 1))
+        
+        raise FaissManagerError(f"FAISS index {self.index_name} kept changing on disk while being read")
+    
+    @staticmethod
+    def _wrap_id_map(base, id_map: np.ndarray) -> faiss.IndexIDMap2:
+        """Wrap an already populated index in an IndexIDMap2 with the given slot IDs."""
+        # IndexIDMap2 only accepts an empty index, so construct it around an
+        # empty placeholder and swap the populated index in
+        wrapper = faiss.IndexIDMap2(faiss.IndexFlat(base.d, base.metric_type))
+        wrapper.index = base
+        wrapper.ntotal = base.ntotal
+        wrapper.referenced_objects = [base]
+        faiss.copy_array_to_vector(np.ascontiguousarray(id_map, dtype=np.int64), wrapper.id_map)
+        wrapper.construct_rev_map()
+        return wrapper
+    
+    def _create_new_index(self, index_type: Optional[str] = None, training_size: int = 0):
+        """
+        Create a new, empty FAISS index.
         
-        # Create IndexFlatIP (Inner Product) for cosine similarity
-        # We'll normalize vectors, so inner product = cosine similarity
-        self.index = faiss.IndexFlatIP(self.dimension)
+        Args:
+            index_type: One of INDEX_TYPES (defaults to the configured type)
+            training_size: Number of vectors available for training
+        """
+        index_type = self._effective_index_type(index_type or self.index_type, training_size)
+        logger.info(f"Creating new {index_type} FAISS index with dimension {self.dimension}")
+        
+        # Vectors are normalized, so inner product = cosine similarity
+        self.index, params = self._build_index(index_type, training_size)
+        self._mmap_index = None
+        self._id_map = None
+        self._known_ids = set()
+        self._loaded = True
         
         # Initialize metadata
         self.metadata = {
             'dimension': self.dimension,
-            'index_type': 'IndexFlatIP',
+            'index_type': index_type,
+            'faiss_index': self._describe_index(),
+            'index_params': params,
+            'is_trained': bool(self.index.is_trained),
+            'training_vectors': 0,
+            'retired_vectors': 0,
             'created_at': timezone.now().isoformat(),
             'last_updated': timezone.now().isoformat(),
-            'item_ids': [],  # Maps FAISS index position to item ID
-            'id_to_position': {}  # Maps item ID to FAISS index position
         }
     
+    def _effective_index_type(self, index_type: str, training_size: int) -> str:
+        """Fall back from IVF-PQ to HNSW when there is too little data to train on."""
+        if index_type == INDEX_TYPE_IVFPQ and training_size < PQ_MIN_TRAINING_VECTORS:
+            if training_size:
+                logger.warning(
+                    f"Only {training_size} vectors for IVF-PQ training (need {PQ_MIN_TRAINING_VECTORS}), "
+                    f"using HNSW instead"
+                )
+            return INDEX_TYPE_HNSW
+        return index_type
+    
+    def _index_params(self, index_type: str, training_size: int) -> Dict:
+        """Resolve construction and search parameters from settings."""
+        if index_type == INDEX_TYPE_HNSW:
+            return {
+                'hnsw_m': getattr(settings, 'FAISS_HNSW_M', 32),
+                'ef_construction': getattr(settings, 'FAISS_HNSW_EF_CONSTRUCTION', 200),
+                'ef_search': getattr(settings, 'FAISS_HNSW_EF_SEARCH', 64),
+            }
+        
+        if index_type == INDEX_TYPE_IVFPQ:
+            nlist = getattr(settings, 'FAISS_IVF_NLIST', 0) or int(4 * math.sqrt(training_size))
+            nlist = max(1, min(nlist, training_size // IVF_MIN_POINTS_PER_LIST))
+            
+            # Sub-quantizers must evenly divide the vector dimension
+            pq_m = getattr(settings, 'FAISS_PQ_M', 64)
+            while pq_m > 1 and self.dimension % pq_m:
+                pq_m -= 1
+            
+            return {
+                'nlist': nlist,
+                'pq_m': pq_m,
+                'pq_bits': 8,
+                'nprobe': min(getattr(settings, 'FAISS_IVF_NPROBE', 16), nlist),
+            }
+        
+        return {}
+    
+    def _build_index(self, index_type: str, training_size: int = 0) -> Tuple[faiss.IndexIDMap2, Dict]:
+        """Build an empty ID-mapped index of the given type."""
+        params = self._index_params(index_type, training_size)
+        
+        if index_type == INDEX_TYPE_HNSW:
+            base = faiss.IndexHNSWFlat(self.dimension, params['hnsw_m'], faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efConstruction = params['ef_construction']
+            base.hnsw.efSearch = params['ef_search']
+        elif index_type == INDEX_TYPE_IVFPQ:
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            base = faiss.IndexIVFPQ(
+                quantizer, self.dimension, params['nlist'], params['pq_m'], params['pq_bits'],
+                faiss.METRIC_INNER_PRODUCT,
+            )
+            base.nprobe = params['nprobe']
+            # Array direct map keeps reconstruct() working for get_vector()
+            base.set_direct_map_type(faiss.DirectMap.Array)
+        else:
+            base = faiss.IndexFlatIP(self.dimension)
+        
+        return faiss.IndexIDMap2(base), params
+    
+    def _base_index(self):
+        """Get the ANN index behind the ID map (memory-mapped or in memory)."""
+        if self.index is not None:
+            return faiss.downcast_index(self.index.index)
+        return self._mmap_index
+    
+    def _slot_ids(self) -> np.ndarray:
+        """Get the slot -> item ID map (-1 for retired slots)."""
+        if self.index is not None:
+            return faiss.vector_to_array(self.index.id_map)
+        if self._id_map is not None:
+            return self._id_map
+        return np.empty(0, dtype=np.int64)
+    
+    def _search_labels(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Run a FAISS search and return (similarities, item IDs)."""
+        if self.index is not None:
+            return self.index.search(queries, k)
+        
+        similarities, slots = self._mmap_index.search(queries, k)
+        labels = np.where(slots >= 0, self._id_map[np.maximum(slots, 0)], -1)
+        return similarities, labels
+    
+    def _describe_index(self) -> str:
+        return f"IndexIDMap2+{type(self._base_index()).__name__}"
+    
+    def _apply_search_params(self):
+        """Re-apply search-time parameters, which may have changed since the index was built."""
+        base = self._base_index()
+        if base is None:
+            return
+        params = self._index_params(self.metadata.get('index_type', INDEX_TYPE_FLAT), 0)
+        if isinstance(base, faiss.IndexHNSW):
+            base.hnsw.efSearch = params['ef_search']
+        elif isinstance(base, faiss.IndexIVF):
+            base.nprobe = min(getattr(settings, 'FAISS_IVF_NPROBE', 16), base.nlist)
+    
+    def _supports_remove(self) -> bool:
+        return isinstance(self._base_index(), faiss.IndexFlat)
+    
+    def _ids(self) -> Set[int]:
+        """Get the set of item IDs currently stored in the index."""
+        self._ensure_loaded()
+        if self._known_ids is None:
+            id_map = self._slot_ids()
+            self._known_ids = set(id_map[id_map >= 0].tolist())
+        return self._known_ids
+    
+    def _live_count(self) -> int:
+        self._ensure_loaded()
+        base = self._base_index()
+        if base is None:
+            return 0
+        return base.ntotal - self.metadata.get('retired_vectors', 0)
+    
+    def _remove_ids(self, item_ids: Iterable[int]) -> int:
+        """
+        Remove vectors by item ID.
+        
+        Flat indices delete natively. HNSW graphs cannot delete nodes and IVF
+        lists do not renumber under the ID map, so for those the ID-map slots
+        are retired (searches skip them) and the index is compacted once
+        enough slots are dead.
+        
+        Returns:
+            Number of vectors removed
+        """
+        known = self._ids()
+        item_ids = [item_id for item_id in item_ids if item_id in known]
+        if not item_ids:
+            return 0
+        
+        self._ensure_writable()
+        # Materializing may have re-read a newer save than the mapped ID map
+        known = self._ids()
+        item_ids = [item_id for item_id in item_ids if item_id in known]
+        if not item_ids:
+            return 0
+        
+        id_array = np.asarray(item_ids, dtype=np.int64)
+        if self._supports_remove():
+            removed = int(self.index.remove_ids(id_array))
+        else:
+            id_map = faiss.vector_to_array(self.index.id_map)
+            retire = np.isin(id_map, id_array)
+            removed = int(retire.sum())
+            id_map[retire] = -1
+            faiss.copy_array_to_vector(id_map, self.index.id_map)
+            self.index.construct_rev_map()
+            self.metadata['retired_vectors'] = self.metadata.get('retired_vectors', 0) + removed
+        
+        known.difference_update(item_ids)
+        self.metadata['last_updated'] = timezone.now().isoformat()
+        
+        if self.metadata.get('retired_vectors', 0) > RETIRED_COMPACT_RATIO * self.index.ntotal:
+            self._compact()
+        return removed
+    
+    def _compact(self):
+        """Re-add live vectors to an empty copy of the index, dropping retired slots."""
+        base = self._base_index()
+        id_map = faiss.vector_to_array(self.index.id_map)
+        live = id_map >= 0
+        vectors = base.reconstruct_n(0, self.index.ntotal)[live]
+        
+        logger.info(f"Compacting {self.index_name} index: dropping {int((~live).sum())} retired vectors")
+        
+        # Cloning keeps IVF-PQ training, so compaction never retrains
+        compacted = faiss.clone_index(base)
+        compacted.reset()
+        self.index = faiss.IndexIDMap2(compacted)
+        if len(vectors):
+            self.index.add_with_ids(vectors, id_map[live])
+        self.metadata['retired_vectors'] = 0
+    
     def _normalize_vector(self, vector: np.ndarray) -> np.ndarray:
         """
         Normalize vector for cosine similarity.
@@ -117,8 +471,7 @@ class FaissVectorDatabase:
             True if added successfully, False otherwise
         """
         try:
-            if self.index is None:
-                self._create_new_index()
+            self._ensure_writable()
             
             # Convert to numpy array and normalize
             np_vector = np.array(vector, dtype=np.float32)
@@ -128,20 +481,21 @@ class FaissVectorDatabase:
             normalized_vector = self._normalize_vector(np_vector)
             
             # Check if item already exists
-            if item_id in self.metadata.get('id_to_position', {}):
+            if item_id in self._ids():
                 logger.debug(f"Item {item_id} already exists in index, updating")
                 return self.update_vector(item_id, vector)
             
-            # Add to FAISS index
-            self.index.add(normalized_vector.reshape(1, -1))
+            if not self.index.is_trained:
+                raise FaissManagerError("Index is not trained; call rebuild_index() first")
             
-            # Update metadata
-            position = len(self.metadata['item_ids'])
-            self.metadata['item_ids'].append(item_id)
-            self.metadata['id_to_position'][str(item_id)] = position
+            # Add to FAISS index under the item's own ID
+            self.index.add_with_ids(
+                normalized_vector.reshape(1, -1), np.asarray([item_id], dtype=np.int64)
+            )
+            self._ids().add(item_id)
             self.metadata['last_updated'] = timezone.now().isoformat()
             
-            logger.debug(f"Added vector for item {item_id} at position {position}")
+            logger.debug(f"Added vector for item {item_id}")
             return True
             
         except Exception as e:
@@ -150,8 +504,7 @@ class FaissVectorDatabase:
     
     def update_vector(self, item_id: int, vector: List[float]) -> bool:
         """
-        Update an existing vector in the index.
-        Note: FAISS doesn't support in-place updates, so we rebuild if needed.
+        Replace an existing vector in the index.
         
         Args:
             item_id: Item identifier
@@ -161,13 +514,8 @@ class FaissVectorDatabase:
             True if updated successfully, False otherwise
         """
         try:
-            if str(item_id) not in self.metadata.get('id_to_position', {}):
-                return self.add_vector(item_id, vector)
-            
-            # For now, we'll track that an update is needed
-            # In production, you might want to batch updates and rebuild periodically
-            logger.warning(f"Vector update for item {item_id} requires index rebuild (not implemented)")
-            return True
+            self._remove_ids([item_id])
+            return self.add_vector(item_id, vector)
             
         except Exception as e:
             logger.error(f"Failed to update vector for item {item_id}: {e}")
@@ -191,38 +539,16 @@ class FaissVectorDatabase:
             List of (item_id, similarity_score) tuples
         """
         try:
-            if self.index is None or self.index.ntotal == 0:
-                logger.debug("Empty or missing index")
-                return []
-            
-            # Convert and normalize query vector
-            np_vector = np.array(query_vector, dtype=np.float32)
-            if len(np_vector) != self.dimension:
+            np_vector = np.asarray(query_vector, dtype=np.float32)
+            if np_vector.shape != (self.dimension,):
                 raise ValueError(f"Query vector dimension {len(np_vector)} != expected {self.dimension}")
             
-            normalized_query = self._normalize_vector(np_vector)
-            
-            # Search FAISS index
-            similarities, indices = self.index.search(
-                normalized_query.reshape(1, -1), 
-                min(k, self.index.ntotal)
-            )
-            
-            # Convert results to (item_id, score) tuples
-            results = []
-            for idx, similarity in zip(indices[0], similarities[0]):
-                if idx == -1:  # FAISS returns -1 for invalid results
-                    continue
-                
-                if idx >= len(self.metadata['item_ids']):
-                    logger.warning(f"Invalid index {idx} returned by FAISS")
-                    continue
-                
-                if similarity < threshold:
-                    continue
-                
-                item_id = self.metadata['item_ids'][idx]
-                results.append((item_id, float(similarity)))
+            item_ids, similarities = self.search_batch(np_vector.reshape(1, -1), k=k, threshold=threshold)
+            results = [
+                (int(item_id), float(similarity))
+                for item_id, similarity in zip(item_ids[0], similarities[0])
+                if item_id >= 0
+            ]
             
             logger.debug(f"Found {len(results)} similar items")
             return results
@@ -231,9 +557,77 @@ class FaissVectorDatabase:
             logger.error(f"Search failed: {e}")
             return []
     
+    def search_batch(
+        self,
+        query_matrix: np.ndarray,
+        k: int = 10,
+        threshold: float = 0.0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search for many query vectors with a single FAISS call.
+        
+        Args:
+            query_matrix: (n, dimension) array of query vectors (normalized here)
+            k: Number of results per query
+            threshold: Minimum similarity threshold
+            
+        Returns:
+            (item_ids, similarities) arrays of shape (n, k), best match first.
+            Rows with fewer than k hits are padded with item ID -1 and
+            similarity 0.0.
+        """
+        queries = np.array(query_matrix, dtype=np.float32, order='C', ndmin=2)
+        if queries.shape[1] != self.dimension:
+            raise ValueError(f"Query vector dimension {queries.shape[1]} != expected {self.dimension}")
+        
+        empty_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        empty_scores = np.zeros((len(queries), k), dtype=np.float32)
+        if self._live_count() == 0 or len(queries) == 0:
+            logger.debug("Empty or missing index")
+            return empty_ids, empty_scores
+        
+        faiss.normalize_L2(queries)
+        
+        # Over-fetch by the number of retired slots so k live hits remain
+        fetch = min(k + self.metadata.get('retired_vectors', 0), self._base_index().ntotal)
+        similarities, labels = self._search_labels(queries, fetch)
+        
+        # Labels are item IDs; FAISS returns -1 for empty or retired slots.
+        # Move valid hits to the front of each row, keeping score order.
+        valid = (labels >= 0) & (similarities >= threshold)
+        order = np.argsort(~valid, axis=1, kind='stable')[:, :k]
+        labels = np.take_along_axis(labels, order, axis=1)
+        similarities = np.take_along_axis(similarities, order, axis=1)
+        valid = np.take_along_axis(valid, order, axis=1)
+        
+        width = labels.shape[1]
+        empty_ids[:, :width] = np.where(valid, labels, -1)
+        empty_scores[:, :width] = np.where(valid, similarities, 0.0)
+        return empty_ids, empty_scores
+    
+    def export_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get every live vector stored in the index.
+        
+        IVF-PQ indices return decoded, approximate vectors.
+        
+        Returns:
+            (item_ids, vectors) with vectors shaped (n, dimension)
+        """
+        self._ensure_loaded()
+        base = self._base_index()
+        if base is None or base.ntotal == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, self.dimension), dtype=np.float32)
+        
+        slot_ids = np.asarray(self._slot_ids())
+        live = slot_ids >= 0
+        return slot_ids[live], base.reconstruct_n(0, base.ntotal)[live]
+    
     def get_vector(self, item_id: int) -> Optional[np.ndarray]:
         """
-        Get vector for a specific item (not efficiently supported by FAISS).
+        Get the stored (normalized) vector for an item.
+        
+        IVF-PQ indices return the decoded, approximate vector.
         
         Args:
             item_id: Item identifier
@@ -242,15 +636,14 @@ class FaissVectorDatabase:
             Vector if found, None otherwise
         """
         try:
-            if str(item_id) not in self.metadata.get('id_to_position', {}):
+            if item_id not in self._ids():
                 return None
             
-            position = self.metadata['id_to_position'][str(item_id)]
+            if self.index is not None:
+                return self.index.reconstruct(int(item_id))
             
-            # FAISS doesn't directly support getting vectors by index
-            # This is a limitation - in production you might want to store vectors separately
-            logger.warning("Getting individual vectors is not efficiently supported")
-            return None
+            slot = int(np.flatnonzero(self._id_map == item_id)[0])
+            return self._mmap_index.reconstruct(slot)
             
         except Exception as e:
             logger.error(f"Failed to get vector for item {item_id}: {e}")
@@ -258,7 +651,7 @@ class FaissVectorDatabase:
     
     def remove_vector(self, item_id: int) -> bool:
         """
-        Remove a vector from the index (requires rebuild).
+        Remove a vector from the index.
         
         Args:
             item_id: Item identifier
@@ -267,19 +660,70 @@ class FaissVectorDatabase:
             True if removed successfully, False otherwise
         """
         try:
-            if str(item_id) not in self.metadata.get('id_to_position', {}):
+            if not self._remove_ids([item_id]):
                 logger.debug(f"Item {item_id} not found in index")
-                return True
-            
-            # FAISS doesn't support efficient removal
-            # For production, implement batched rebuilding
-            logger.warning(f"Vector removal for item {item_id} requires index rebuild (not implemented)")
             return True
             
         except Exception as e:
             logger.error(f"Failed to remove vector for item {item_id}: {e}")
             return False
     
+    def upsert_vectors(self, item_ids: Sequence[int], vectors: np.ndarray) -> int:
+        """
+        Add or replace many vectors in place with one removal pass and one add.
+        
+        Args:
+            item_ids: Unique item identifiers
+            vectors: (n, dimension) array aligned with item_ids
+        
+        Returns:
+            Number of vectors written (0 on failure)
+        """
+        try:
+            ids = np.asarray(item_ids, dtype=np.int64)
+            matrix = np.array(vectors, dtype=np.float32, order='C', ndmin=2)
+            if not len(ids):
+                return 0
+            if matrix.shape != (len(ids), self.dimension):
+                raise ValueError(f"Vectors shaped {matrix.shape}, expected ({len(ids)}, {self.dimension})")
+        
+            self._ensure_writable()
+            if not self.index.is_trained:
+                raise FaissManagerError("Index is not trained; call rebuild_index() first")
+        
+            self._remove_ids(ids.tolist())
+            faiss.normalize_L2(matrix)
+            self.index.add_with_ids(matrix, ids)
+            self._ids().update(ids.tolist())
+            self.metadata['last_updated'] = timezone.now().isoformat()
+        
+            logger.debug(f"Upserted {len(ids)} vectors into {self.index_name}")
+            return len(ids)
+        
+        except Exception as e:
+            logger.error(f"Failed to upsert {len(item_ids)} vectors: {e}")
+            return 0
+    
+    def remove_vectors(self, item_ids: Iterable[int]) -> int:
+        """
+        Remove many vectors in one pass.
+        
+        Args:
+            item_ids: Item identifiers (IDs not in the index are ignored)
+        
+        Returns:
+            Number of vectors removed
+        """
+        try:
+            return self._remove_ids(list(item_ids))
+        except Exception as e:
+            logger.error(f"Failed to remove vectors: {e}")
+            return 0
+    
+    def indexed_ids(self) -> Set[int]:
+        """Get a copy of the item IDs currently stored in the index."""
+        return set(self._ids())
+    
     def save_index(self) -> bool:
         """
         Save the FAISS index and metadata to disk.
@@ -289,66 +733,98 @@ class FaissVectorDatabase:
         """
         try:
             if self.index is None:
+                if self._mmap_index is not None:
+                    logger.debug(f"FAISS index {self.index_name} is unchanged, nothing to save")
+                    return True
                 logger.warning("No index to save")
                 return False
             
-            # Save FAISS index
-            faiss.write_index(self.index, str(self.index_file))
+            # Other workers may have the current files mapped; write new files
+            # and swap them in so their mappings stay valid until they reload
+            id_map = faiss.vector_to_array(self.index.id_map)
+            self._write_atomic(self.index_file, lambda path: faiss.write_index(self.index.index, path))
+            self._write_atomic(self.ids_file, lambda path: np.save(path, id_map))
             
             # Save metadata
             self.metadata['last_updated'] = timezone.now().isoformat()
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            self.metadata.pop('item_ids', None)
+            self.metadata.pop('id_to_position', None)
+            self._write_atomic(
+                self.metadata_file,
+                lambda path: Path(path).write_text(json.dumps(self.metadata, indent=2))
+            )
+            
+            self._record_index_metadata()
             
-            logger.info(f"Saved FAISS index with {self.index.ntotal} vectors to {self.index_file}")
+            logger.info(f"Saved FAISS index with {self._live_count()} vectors to {self.index_file}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to save FAISS index: {e}")
             return False
     
-    def rebuild_index(self, vectors_data: List[Tuple[int, List[float]]]) -> bool:
+    @staticmethod
+    def _write_atomic(target: Path, writer: Callable[[str], None]):
+        """Write a file next to its target and rename it into place."""
+        tmp_path = target.with_name(f"{target.stem}.tmp{target.suffix}")
+        writer(str(tmp_path))
+        os.replace(tmp_path, target)
+    
+    def rebuild_index(self, vectors_data: List[Tuple[int, List[float]]], index_type: Optional[str] = None) -> bool:
         """
-        Rebuild the entire index from scratch.
+        Rebuild the entire index from scratch, training it if required.
         
         Args:
             vectors_data: List of (item_id, vector) tuples
+            index_type: Override the configured index type for this rebuild
             
         Returns:
             True if rebuilt successfully, False otherwise
         """
         try:
             logger.info(f"Rebuilding FAISS index with {len(vectors_data)} vectors")
+            started = time.perf_counter()
             
-            # Create new index
-            self._create_new_index()
-            
-            # Prepare vectors
-            vectors = []
-            item_ids = []
-            
+            # Prepare vectors (last vector wins for duplicate IDs)
+            vectors_by_id = {}
             for item_id, vector in vectors_data:
-                np_vector = np.array(vector, dtype=np.float32)
-                if len(np_vector) != self.dimension:
-                    logger.warning(f"Skipping item {item_id} with wrong dimension {len(np_vector)}")
+                if len(vector) != self.dimension:
+                    logger.warning(f"Skipping item {item_id} with wrong dimension {len(vector)}")
                     continue
-                
-                normalized_vector = self._normalize_vector(np_vector)
-                vectors.append(normalized_vector)
-                item_ids.append(item_id)
+                vectors_by_id[item_id] = vector
             
-            if not vectors:
+            if not vectors_by_id:
                 logger.warning("No valid vectors to add")
                 return False
             
+            item_ids = np.fromiter(vectors_by_id.keys(), dtype=np.int64, count=len(vectors_by_id))
+            vectors_array = np.array(list(vectors_by_id.values()), dtype=np.float32)
+            faiss.normalize_L2(vectors_array)
+            
+            # Create new index
+            self._create_new_index(index_type, training_size=len(item_ids))
+            
+            training_seconds = 0.0
+            if not self.index.is_trained:
+                train_started = time.perf_counter()
+                self.index.train(vectors_array)
+                training_seconds = time.perf_counter() - train_started
+                self.metadata['training_vectors'] = len(vectors_array)
+                self.metadata['last_trained'] = timezone.now().isoformat()
+                logger.info(f"Trained {self.metadata['index_type']} index on {len(vectors_array)} vectors in {training_seconds:.2f}s")
+            
             # Add all vectors at once
-            vectors_array = np.array(vectors, dtype=np.float32)
-            self.index.add(vectors_array)
+            self.index.add_with_ids(vectors_array, item_ids)
+            self._known_ids = set(vectors_by_id.keys())
             
             # Update metadata
-            self.metadata['item_ids'] = item_ids
-            self.metadata['id_to_position'] = {str(item_id): i for i, item_id in enumerate(item_ids)}
-            self.metadata['last_updated'] = timezone.now().isoformat()
+            self.metadata['is_trained'] = True
+            self.metadata['training_seconds'] = training_seconds
+            self.metadata['rebuild_seconds'] = time.perf_counter() - started
+            self.metadata['last_rebuilt'] = timezone.now().isoformat()
+            self.metadata['last_updated'] = self.metadata['last_rebuilt']
+            
+            self._record_index_metadata(rebuilt=True)
             
             logger.info(f"Successfully rebuilt index with {len(item_ids)} vectors")
             return True
@@ -357,6 +833,45 @@ class FaissVectorDatabase:
             logger.error(f"Failed to rebuild index: {e}")
             return False
     
+    def _record_index_metadata(self, rebuilt: bool = False):
+        """Mirror index state into the FaissIndex table (best effort)."""
+        try:
+            from django.db.models import F
+            from apps.embeddings.models import FaissIndex
+            
+            model_name, _, model_version = getattr(
+                settings, 'EMBEDDING_MODEL', 'snowflake-arctic-embed2:latest'
+            ).partition(':')
+            
+            defaults = {
+                'model_name': model_name,
+                'model_version': model_version or 'latest',
+                'dimension': self.dimension,
+                'index_type': self.metadata.get('faiss_index', self._describe_index()),
+                'index_params': self.metadata.get('index_params', {}),
+                'num_vectors': self._live_count(),
+                'index_file_path': str(self.index_file),
+                'metadata_file_path': str(self.metadata_file),
+                'is_trained': self.metadata.get('is_trained', False),
+                'training_vectors': self.metadata.get('training_vectors', 0),
+            }
+            if rebuilt:
+                now = timezone.now()
+                defaults.update({
+                    'last_rebuilt': now,
+                    'rebuild_seconds': self.metadata.get('rebuild_seconds', 0.0),
+                    'training_seconds': self.metadata.get('training_seconds', 0.0),
+                })
+                if self.metadata.get('training_seconds'):
+                    defaults['last_trained'] = now
+            
+            record, _ = FaissIndex.objects.update_or_create(name=self.index_name, defaults=defaults)
+            if rebuilt:
+                FaissIndex.objects.filter(pk=record.pk).update(rebuild_count=F('rebuild_count') + 1)
+                
+        except Exception as e:
+            logger.warning(f"Failed to record FAISS index metadata for {self.index_name}: {e}")
+    
     def get_stats(self) -> Dict:
         """
         Get index statistics.
@@ -364,12 +879,20 @@ class FaissVectorDatabase:
         Returns:
             Dictionary with index statistics
         """
+        total_vectors = self._live_count()
         return {
             'index_name': self.index_name,
             'dimension': self.dimension,
-            'total_vectors': self.index.ntotal if self.index else 0,
+            'index_type': self.metadata.get('index_type'),
+            'index_params': self.metadata.get('index_params', {}),
+            'is_trained': self.metadata.get('is_trained', False),
+            'total_vectors': total_vectors,
+            'retired_vectors': self.metadata.get('retired_vectors', 0),
+            'memory_mapped': self._mmap_index is not None,
             'index_file_exists': self.index_file.exists(),
+            'ids_file_exists': self.ids_file.exists(),
             'metadata_file_exists': self.metadata_file.exists(),
             'last_updated': self.metadata.get('last_updated'),
+            'last_rebuilt': self.metadata.get('last_rebuilt'),
             'created_at': self.metadata.get('created_at')
-        }
\ No newline at end of file
+        }
@@ -550,25 +550,30 @@ Return status: 'ready_for_fetch' or 'skip_existing' with reasoning."""
         """Store historical data points for an item."""
         from services.weirdgloop_api_client import HistoricalDataPoint
         
-        historical_prices = []
+        # Keyed by timestamp so a repeated point can't hit the same row twice in one upsert
+        historical_prices = {}
         
         for dp in data_points:
-            historical_prices.append(HistoricalPrice(
+            historical_prices[dp.timestamp] = HistoricalPrice(
                 item=item,
                 price=dp.price,
                 volume=dp.volume,
                 timestamp=dp.timestamp,
                 data_source='weirdgloop',
                 is_validated=False
-            ))
+            )
+        historical_prices = list(historical_prices.values())
         
-        # Batch insert with conflict handling
+        # Batch upsert on the (item, timestamp, data_source) unique key so revised
+        # prices replace stale rows instead of being dropped as conflicts
         created_count = 0
         try:
             await HistoricalPrice.objects.abulk_create(
                 historical_prices,
-                ignore_conflicts=True,
-                batch_size=1000
+                update_conflicts=True,
+                unique_fields=['item', 'timestamp', 'data_source'],
+                update_fields=['price', 'volume'],
+                batch_size=5000
             )
             created_count = len(historical_prices)
             logger.info(f"Stored {created_count} historical data points for {item.name}")
@@ -0,0 +1,377 @@
+"""
+Shared HTTP Transport for the RuneScape Wiki and WeirdGloop API Clients
+
+One pooled transport used by every price API client in the process:
+- Keep-alive aiohttp sessions reused across calls (one per event loop)
+- ETag / Last-Modified conditional GETs; a 304 serves the stored body
+- Concurrent identical GETs coalesced into a single request
+- Per-host token-bucket rate limits shared by async and sync callers
+- Retries with backoff for connection errors, 429 and 5xx (honours Retry-After)
+
+Responses are stored and shared as raw bytes and decoded per caller, so
+coalesced waiters never share mutable objects.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Requests per second and burst size per host
+DEFAULT_RATE_LIMITS = {
+    'prices.runescape.wiki': (5.0, 10),
+    'api.weirdgloop.org': (2.0, 5),
+}
+DEFAULT_RATE_LIMIT = (5.0, 10)
+
+
+class HttpTransportError(Exception):
+    """Raised when a request fails after retries or returns an error status."""
+
+    def __init__(self, message: str, status: Optional[int] = None, body: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers reserve a token and sleep for the returned delay."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token, returning how long to wait before it may be used."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+@dataclass
+class ConditionalEntry:
+    """Validators and body of the last 200 response for a request."""
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = field(default_factory=time.time)
+
+
+class SharedHttpTransport:
+    """
+    Process-wide HTTP transport for JSON GET APIs.
+    """
+
+    def __init__(self, user_agent: Optional[str] = None, rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 max_conditional_entries: int = 256, max_retries: int = 3, backoff_factor: float = 1.0,
+                 timeout: float = 30.0):
+        self.user_agent = user_agent or getattr(settings, 'RUNESCAPE_USER_AGENT', 'OSRS-AI-Tracker/2.0')
+        self.rate_limits = rate_limits if rate_limits is not None else getattr(
+            settings, 'HTTP_TRANSPORT_RATE_LIMITS', DEFAULT_RATE_LIMITS
+        )
+        self.max_conditional_entries = max_conditional_entries
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+
+        # aiohttp sessions and in-flight fetch tasks are bound to their event loop
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = \
+            weakref.WeakKeyDictionary()
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = \
+            weakref.WeakKeyDictionary()
+
+        self._sync_session: Optional[requests.Session] = None
+        self._sync_in_flight: Dict[str, concurrent.futures.Future] = {}
+        self._sync_lock = threading.Lock()
+
+        self._conditional: "OrderedDict[str, ConditionalEntry]" = OrderedDict()
+        self._conditional_lock = threading.Lock()
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+        self.stats = {
+            'requests': 0,
+            'not_modified': 0,
+            'coalesced': 0,
+            'retries': 0,
+            'throttled_seconds': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+
+    async def get_json(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                       timeout: Optional[float] = None) -> Any:
+        """
+        GET a JSON resource through the shared session.
+
+        Args:
+            url: Absolute URL
+            params: Query parameters (None values are dropped)
+            headers: Extra request headers
+            timeout: Total timeout in seconds (defaults to the transport timeout)
+
+        Returns:
+            Decoded JSON body
+
+        Raises:
+            HttpTransportError: On error statuses or when retries are exhausted
+        """
+        return json.loads(await self.get_bytes(url, params, headers, timeout))
+
+    async def get_bytes(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                        timeout: Optional[float] = None) -> bytes:
+        """GET a resource's raw body, coalescing concurrent identical requests."""
+        params = self._clean_params(params)
+        key = self._request_key(url, params, headers)
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.setdefault(loop, {})
+
+        fetch = in_flight.get(key)
+        if fetch is not None:
+            self.stats['coalesced'] += 1
+        else:
+            # The request runs as its own task so no single caller's cancellation reaches it
+            fetch = loop.create_task(self._fetch(key, url, params, headers, timeout))
+            in_flight[key] = fetch
+            fetch.add_done_callback(lambda task: self._fetch_done(in_flight, key, task))
+
+        # Shielded so a cancelled caller doesn't cancel the shared request
+        return await asyncio.shield(fetch)
+
+    @staticmethod
+    def _fetch_done(in_flight: Dict[str, asyncio.Task], key: str, task: asyncio.Task):
+        if in_flight.get(key) is task:
+            in_flight.pop(key)
+        if not task.cancelled():
+            task.exception()  # Mark retrieved when every caller has gone
+
+    async def _fetch(self, key: str, url: str, params: Optional[Dict], headers: Optional[Dict],
+                     timeout: Optional[float]) -> bytes:
+        session = self._session()
+        request_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._throttle_delay(url))
+            entry, request_headers = self._conditional_headers(key, headers)
+
+            try:
+                self.stats['requests'] += 1
+                async with session.get(url, params=params, headers=request_headers,
+                                       timeout=request_timeout) as response:
+                    body = await response.read()
+                    status = response.status
+                    response_headers = response.headers
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self._retry_delay(attempt, None))
+                    continue
+                raise HttpTransportError(f"Request failed: {e or type(e).__name__}") from e
+
+            if status in RETRY_STATUSES and attempt < self.max_retries:
+                await asyncio.sleep(self._retry_delay(attempt, response_headers))
+                continue
+
+            return self._handle_response(key, url, status, response_headers, body, entry)
+
+        raise HttpTransportError(f"Request failed after {self.max_retries + 1} attempts: {url}")
+
+    def _session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                headers={'User-Agent': self.user_agent, 'Accept': 'application/json'},
+                connector=aiohttp.TCPConnector(limit=20, limit_per_host=10, keepalive_timeout=60, ttl_dns_cache=300),
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def close_session(self):
+        """Close the session bound to the running event loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+    # ------------------------------------------------------------------
+    # Sync API
+    # ------------------------------------------------------------------
+
+    def get_json_sync(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                      timeout: Optional[float] = None) -> Any:
+        """Blocking get_json for sync callers (pooled requests session, same cache and limits)."""
+        return json.loads(self.get_bytes_sync(url, params, headers, timeout))
+
+    def get_bytes_sync(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                       timeout: Optional[float] = None) -> bytes:
+        params = self._clean_params(params)
+        key = self._request_key(url, params, headers)
+
+        with self._sync_lock:
+            leader = self._sync_in_flight.get(key)
+            if leader is None:
+                future = concurrent.futures.Future()
+                self._sync_in_flight[key] = future
+
+        if leader is not None:
+            self.stats['coalesced'] += 1
+            return leader.result()
+
+        try:
+            body = self._fetch_sync(key, url, params, headers, timeout)
+            future.set_result(body)
+            return body
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._sync_lock:
+                self._sync_in_flight.pop(key, None)
+
+    def _fetch_sync(self, key: str, url: str, params: Optional[Dict], headers: Optional[Dict],
+                    timeout: Optional[float]) -> bytes:
+        session = self._get_sync_session()
+
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._throttle_delay(url))
+            entry, request_headers = self._conditional_headers(key, headers)
+
+            try:
+                self.stats['requests'] += 1
+                response = session.get(url, params=params, headers=request_headers, timeout=timeout or self.timeout)
+            except requests.exceptions.RequestException as e:
+                if attempt < self.max_retries:
+                    time.sleep(self._retry_delay(attempt, None))
+                    continue
+                raise HttpTransportError(f"Request failed: {e}") from e
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(self._retry_delay(attempt, response.headers))
+                continue
+
+            return self._handle_response(key, url, response.status_code, response.headers, response.content, entry)
+
+        raise HttpTransportError(f"Request failed after {self.max_retries + 1} attempts: {url}")
+
+    def _get_sync_session(self) -> requests.Session:
+        if self._sync_session is None:
+            with self._sync_lock:
+                if self._sync_session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=10)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers.update({'User-Agent': self.user_agent, 'Accept': 'application/json'})
+                    self._sync_session = session
+        return self._sync_session
+
+    # ------------------------------------------------------------------
+    # Shared helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _clean_params(params: Optional[Dict]) -> Optional[Dict[str, str]]:
+        if not params:
+            return None
+        return {name: str(value) for name, value in params.items() if value is not None}
+
+    @staticmethod
+    def _request_key(url: str, params: Optional[Dict], headers: Optional[Dict]) -> str:
+        key = url
+        if params:
+            key += '?' + '&'.join(f"{name}={value}" for name, value in sorted(params.items()))
+        if headers:
+            key += '|' + '|'.join(f"{name.lower()}:{value}" for name, value in sorted(headers.items()))
+        return key
+
+    def _throttle_delay(self, url: str) -> float:
+        host = urlsplit(url).hostname or ''
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._buckets_lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    rate, burst = self.rate_limits.get(host, DEFAULT_RATE_LIMIT)
+                    bucket = self._buckets[host] = TokenBucket(rate, burst)
+
+        delay = bucket.reserve()
+        if delay > 0:
+            self.stats['throttled_seconds'] += delay
+            logger.debug(f"Rate limiting {host}: waiting {delay:.2f}s")
+        return delay
+
+    def _retry_delay(self, attempt: int, headers) -> float:
+        self.stats['retries'] += 1
+        retry_after = headers.get('Retry-After') if headers is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 60.0)
+        return self.backoff_factor * (2 ** attempt)
+
+    def _conditional_headers(self, key: str, headers: Optional[Dict]) -> Tuple[Optional[ConditionalEntry], Dict]:
+        request_headers = dict(headers or {})
+        with self._conditional_lock:
+            entry = self._conditional.get(key)
+        if entry is not None:
+            if entry.etag:
+                request_headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                request_headers['If-Modified-Since'] = entry.last_modified
+        return entry, request_headers
+
+    def _handle_response(self, key: str, url: str, status: int, headers, body: bytes,
+                         entry: Optional[ConditionalEntry]) -> bytes:
+        if status == 304 and entry is not None:
+            self.stats['not_modified'] += 1
+            with self._conditional_lock:
+                if key in self._conditional:
+                    self._conditional.move_to_end(key)
+            logger.debug(f"Not modified: {url}")
+            return entry.body
+
+        if status >= 400:
+            text = body.decode('utf-8', errors='replace')[:500]
+            logger.error(f"HTTP error {status} for {url}: {text}")
+            raise HttpTransportError(f"HTTP {status}: {text}", status=status, body=text)
+
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        with self._conditional_lock:
+            if etag or last_modified:
+                self._conditional[key] = ConditionalEntry(body=body, etag=etag, last_modified=last_modified)
+                self._conditional.move_to_end(key)
+                while len(self._conditional) > self.max_conditional_entries:
+                    self._conditional.popitem(last=False)
+            else:
+                self._conditional.pop(key, None)
+
+        return body
+
+
+# Global shared transport instance
+http_transport = SharedHttpTransport()
+
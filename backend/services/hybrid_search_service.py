@@ -16,7 +16,8 @@ from django.utils import timezone
 
 from .runescape_wiki_client import RuneScapeWikiAPIClient, WikiPriceData, ItemMetadata
 from .embedding_service import OllamaEmbeddingService
-from apps.items.models import Item
+from .keyword_index import IndexedItem, KeywordIndex, reciprocal_rank_fusion
+from apps.items.models import Item, ItemCategoryMapping
 
 logger = logging.getLogger(__name__)
 
@@ -72,8 +73,9 @@ class HybridSearchService:
         self.faiss_index = None
         self.item_embeddings = {}  # item_id -> embedding
         self.item_metadata_cache = {}  # item_id -> metadata
+        self.keyword_index = KeywordIndex()
         
-        # Search parameters
+        # Search parameters (per-list weights for reciprocal-rank fusion)
         self.vector_weight = 0.6
         self.keyword_weight = 0.4
         self.cache_timeout = 3600  # 1 hour
@@ -129,6 +131,18 @@ class HybridSearchService:
             # Get enriched price data from Wiki API
             item_ids = [item['item_id'] for item in db_items[:500]]  # Limit for testing
             
+            # Comprehensive tags (category mappings) for keyword search
+            tag_rows = await asyncio.to_thread(
+                lambda: list(ItemCategoryMapping.objects.filter(
+                    item__item_id__in=item_ids
+                ).values_list('item__item_id', 'category__name'))
+            )
+            item_tags = {}
+            for item_id, tag in tag_rows:
+                item_tags.setdefault(item_id, []).append(tag)
+            for item in db_items:
+                item['tags'] = item_tags.get(item['item_id'], [])
+            
             async with self.wiki_client as client:
                 enriched_data = await client.get_enriched_price_data(item_ids)
             
@@ -213,6 +227,31 @@ class HybridSearchService:
             logger.info(f"Built FAISS index with {len(valid_embeddings)} item embeddings")
         else:
             logger.warning("No valid embeddings generated")
+        
+        self._build_keyword_index()
+    
+    def _item_name(self, context: Dict[str, Any]) -> str:
+        wiki_metadata = context['wiki_metadata']
+        return wiki_metadata.name if wiki_metadata else context['db_item'].get('name', f"Item {context['item_id']}")
+    
+    def _build_keyword_index(self):
+        """Build the inverted keyword index and filter postings from the item cache."""
+        indexed_items = []
+        for item_id, context in self.item_metadata_cache.items():
+            wiki_metadata = context['wiki_metadata']
+            db_item = context['db_item']
+            name = self._item_name(context)
+            indexed_items.append(IndexedItem(
+                item_id=item_id,
+                name=name,
+                examine=(wiki_metadata.examine if wiki_metadata else db_item.get('examine', '')) or '',
+                tags=tuple(db_item.get('tags', ())),
+                category=self._classify_item_category(name),
+                price=context['price_data'].best_buy_price or 0
+            ))
+        
+        self.keyword_index = KeywordIndex.build(indexed_items)
+        logger.info(f"Built keyword index over {len(self.keyword_index)} items ({len(self.keyword_index.postings)} terms)")
     
     async def _create_embedding_context(
         self,
@@ -383,59 +422,32 @@ Members: {'Yes' if wiki_metadata and wiki_metadata.members else 'Unknown'}"""
         self,
         query_text: str,
         category_filter: Optional[str] = None,
-        price_range: Optional[Tuple[int, int]] = None
+        price_range: Optional[Tuple[int, int]] = None,
+        limit: Optional[int] = None
     ) -> List[SearchResult]:
-        """Perform keyword-based search with filters."""
-        keywords = query_text.lower().split()
-        results = []
+        """
+        Perform BM25 keyword search over the inverted index with filters.
         
-        for item_id, context in self.item_metadata_cache.items():
-            price_data = context['price_data']
-            wiki_metadata = context['wiki_metadata']
-            db_item = context['db_item']
-            
-            name = wiki_metadata.name if wiki_metadata else db_item.get('name', '')
-            name_lower = name.lower()
-            
-            # Keyword matching
-            keyword_score = 0.0
-            for keyword in keywords:
-                if keyword in name_lower:
-                    keyword_score += 1.0
-                elif any(keyword in word for word in name_lower.split()):
-                    keyword_score += 0.5
-            
-            if len(keywords) > 0:
-                keyword_score /= len(keywords)  # Normalize
-            
-            # Category filter
-            if category_filter:
-                item_category = self._classify_item_category(name)
-                if category_filter.lower() not in item_category.lower():
-                    continue
-            
-            # Price filter
-            if price_range and price_data.best_buy_price:
-                min_price, max_price = price_range
-                if not (min_price <= price_data.best_buy_price <= max_price):
-                    continue
-            
-            if keyword_score > 0:
-                result = SearchResult(
-                    item_id=item_id,
-                    name=name,
-                    price_data=price_data,
-                    metadata=wiki_metadata,
-                    vector_score=0.0,  # Will be calculated if needed
-                    keyword_score=keyword_score,
-                    combined_score=keyword_score,
-                    context=context
-                )
-                
-                results.append(result)
+        keyword_score is the BM25 score relative to the best match (0-1].
+        """
+        allowed_ids = self.keyword_index.filter_ids(category_filter, price_range)
+        ranked = self.keyword_index.search(query_text, limit=limit, allowed_ids=allowed_ids)
         
-        # Sort by keyword score
-        results.sort(key=lambda x: x.keyword_score, reverse=True)
+        results = []
+        top_score = ranked[0][1] if ranked else 1.0
+        for item_id, score in ranked:
+            context = self.item_metadata_cache[item_id]
+            keyword_score = score / top_score
+            results.append(SearchResult(
+                item_id=item_id,
+                name=self._item_name(context),
+                price_data=context['price_data'],
+                metadata=context['wiki_metadata'],
+                vector_score=0.0,  # Will be calculated if needed
+                keyword_score=keyword_score,
+                combined_score=keyword_score,
+                context=context
+            ))
         
         logger.info(f"Keyword search found {len(results)} results for: {query_text}")
         return results
@@ -455,7 +467,7 @@ Members: {'Yes' if wiki_metadata and wiki_metadata.members else 'Unknown'}"""
         # Perform both searches in parallel
         vector_task = self.vector_search(query_text, k * 2, vector_threshold)
         keyword_task = asyncio.to_thread(
-            self.keyword_search, query_text, category_filter, price_range
+            self.keyword_search, query_text, category_filter, price_range, k * 2
         )
         
         vector_results, keyword_results = await asyncio.gather(
@@ -470,30 +482,30 @@ Members: {'Yes' if wiki_metadata and wiki_metadata.members else 'Unknown'}"""
             logger.error(f"Keyword search failed: {keyword_results}")
             keyword_results = []
         
-        # Combine and deduplicate results
-        combined_results = {}
+        # Vector hits obey the same category / price filters as keyword hits
+        allowed_ids = self.keyword_index.filter_ids(category_filter, price_range)
+        if allowed_ids is not None:
+            vector_results = [r for r in vector_results if r.item_id in allowed_ids]
+        keyword_results = [r for r in keyword_results if r.keyword_score >= keyword_threshold]
         
-        # Add vector results
-        for result in vector_results:
-            combined_results[result.item_id] = result
-        
-        # Merge keyword results
+        # Combine and deduplicate results
+        combined_results = {result.item_id: result for result in vector_results}
         for result in keyword_results:
-            if result.item_id in combined_results:
-                # Update existing result with keyword score
-                existing = combined_results[result.item_id]
+            existing = combined_results.get(result.item_id)
+            if existing:
                 existing.keyword_score = result.keyword_score
-                existing.combined_score = (
-                    self.vector_weight * existing.vector_score +
-                    self.keyword_weight * existing.keyword_score
-                )
-            elif result.keyword_score >= keyword_threshold:
-                # Add new result
+            else:
                 combined_results[result.item_id] = result
         
-        # Convert to list and sort by combined score
-        final_results = list(combined_results.values())
-        final_results.sort(key=lambda x: x.combined_score, reverse=True)
+        # Reciprocal-rank fusion of the two rankings (both lists are best first)
+        fused = reciprocal_rank_fusion(
+            [[r.item_id for r in vector_results], [r.item_id for r in keyword_results]],
+            weights=[self.vector_weight, self.keyword_weight]
+        )
+        for item_id, result in combined_results.items():
+            result.combined_score = fused[item_id]
+        
+        final_results = sorted(combined_results.values(), key=lambda x: x.combined_score, reverse=True)
         
         # Limit results
         final_results = final_results[:k]
@@ -11,18 +11,42 @@ Implements a sophisticated caching strategy for the OSRS trading terminal:
 import json
 import logging
 import hashlib
-from typing import Any, Dict, List, Optional, Union, Callable
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union, Callable
 from datetime import datetime, timedelta
 from django.core.cache import cache
-from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.conf import settings
 import redis
-import pickle
+
+from services.cache_codec import CacheCodec
 
 logger = logging.getLogger(__name__)
 
 
+# Tag index sets live in each tier's DB next to the keys they reference
+TAG_KEY_PREFIX = "osrs_cache:tag:"
+
+# Deletes every key in a tag's index set, then the set itself.
+# KEYS[1] = tag set key; returns {number of keys deleted, member keys}.
+INVALIDATE_TAG_SCRIPT = """
+local members = redis.call('SMEMBERS', KEYS[1])
+local deleted = 0
+for i = 1, #members, 500 do
+    deleted = deleted + redis.call('DEL', unpack(members, i, math.min(i + 499, #members)))
+end
+redis.call('DEL', KEYS[1])
+return {deleted, members}
+"""
+
+# Pub/sub channel carrying key invalidations for the per-process L1 caches
+INVALIDATION_CHANNEL = "osrs_cache:invalidate"
+
+
 class CacheTier:
     """Cache tier configuration and behavior."""
     
@@ -34,6 +58,86 @@ class CacheTier:
         self.key_prefix = f"osrs_cache:{name}:"
 
 
+class LocalCache:
+    """
+    Size-bounded in-process LRU with a TTL, sitting in front of the hot tier.
+    
+    Entries hold the encoded bytes so callers never share mutable objects.
+    Every entry is stamped with the local version at which its Redis read
+    started; invalidations bump the version and record it per key, so a read
+    that raced an invalidation is never stored.
+    """
+    
+    def __init__(self, max_entries: int, ttl: float, max_tracked_invalidations: int = 10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_tracked_invalidations = max_tracked_invalidations
+        self._entries: "OrderedDict[str, Tuple[bytes, int, float]]" = OrderedDict()
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._invalidation_floor = 0  # Reads older than this may have missed a pruned invalidation
+        self._version = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def current_version(self) -> int:
+        """Version to stamp on a Redis read that is about to start."""
+        return self._version
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Get the encoded value for a key, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            data, _, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+    
+    def put(self, key: str, data: bytes, version: int):
+        """Store an encoded value read from Redis at the given version."""
+        with self._lock:
+            if version < self._invalidated.get(key, self._invalidation_floor):
+                return  # Invalidated while the read was in flight
+            
+            self._entries[key] = (data, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, keys: List[str]):
+        """Drop keys and reject in-flight reads of them."""
+        with self._lock:
+            self._version += 1
+            for key in keys:
+                self._entries.pop(key, None)
+                self._invalidated[key] = self._version
+                self._invalidated.move_to_end(key)
+            
+            while len(self._invalidated) > self.max_tracked_invalidations:
+                _, pruned_version = self._invalidated.popitem(last=False)
+                self._invalidation_floor = max(self._invalidation_floor, pruned_version)
+    
+    def clear(self):
+        """Drop every entry and reject all in-flight reads."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._invalidated.clear()
+            self._invalidation_floor = self._version
+
+
 class IntelligentCache:
     """
     Multi-tier intelligent caching system for high-performance data access.
@@ -50,6 +154,26 @@ class IntelligentCache:
         self.access_patterns = {}  # Track access patterns for prediction
         self.cache_hits = {}       # Track cache performance
         self.cache_misses = {}
+        self.codec = CacheCodec()
+        self._invalidate_scripts = {}
+        self._redis_address = None
+        
+        # Optional per-process L1 in front of the hot tier, kept coherent via pub/sub
+        self.local_cache = None
+        self._instance_id = uuid.uuid4().hex
+        self._listener_thread = None
+        self._listener_connected = False
+        self._listener_lock = threading.Lock()
+        if getattr(settings, 'INTELLIGENT_CACHE_L1_ENABLED', False):
+            self.local_cache = LocalCache(
+                max_entries=getattr(settings, 'INTELLIGENT_CACHE_L1_MAX_ENTRIES', 2000),
+                ttl=getattr(settings, 'INTELLIGENT_CACHE_L1_TTL', 10),
+            )
+        
+        # Prefork workers inherit this instance; each child needs its own origin id
+        # (or it would ignore its siblings' invalidations) and an empty L1
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
         
         # Initialize Redis connections
         self._initialize_redis_clients()
@@ -62,6 +186,7 @@ class IntelligentCache:
         redis_url = getattr(settings, 'CACHES', {}).get('default', {}).get('LOCATION', 'redis://127.0.0.1:6379/1')
         redis_host = redis_url.replace('redis://', '').split('/')[0].split(':')[0]
         redis_port = int(redis_url.replace('redis://', '').split('/')[0].split(':')[1]) if ':' in redis_url else 6379
+        self._redis_address = (redis_host, redis_port)
         
         for tier in [self.HOT_TIER, self.WARM_TIER, self.COLD_TIER, self.PREDICTION_TIER]:
             try:
@@ -78,6 +203,7 @@ class IntelligentCache:
                 # Test connection
                 client.ping()
                 self.redis_clients[tier.name] = client
+                self._invalidate_scripts[tier.name] = client.register_script(INVALIDATE_TAG_SCRIPT)
                 logger.debug(f"✅ Connected to Redis tier: {tier.name} (DB {tier.redis_db})")
                 
             except Exception as e:
@@ -88,31 +214,167 @@ class IntelligentCache:
         """Generate cache key with tier prefix."""
         return f"{tier.key_prefix}{key}"
     
+    def _get_tag_key(self, tag: str) -> str:
+        """Generate the key of a tag's index set (one per tier DB)."""
+        return f"{TAG_KEY_PREFIX}{tag}"
+    
+    def _get_tier(self, name: str) -> Optional[CacheTier]:
+        return {
+            "hot": self.HOT_TIER,
+            "warm": self.WARM_TIER,
+            "cold": self.COLD_TIER,
+            "predict": self.PREDICTION_TIER
+        }.get(name)
+    
     def _serialize_data(self, data: Any) -> bytes:
         """Serialize data for Redis storage."""
-        try:
-            if isinstance(data, (dict, list)):
-                # Use JSON for simple objects
-                return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
-            else:
-                # Use pickle for complex objects
-                return pickle.dumps(data)
-        except Exception as e:
-            logger.error(f"Data serialization failed: {e}")
-            return pickle.dumps(data)  # Fallback to pickle
+        return self.codec.encode(data)
     
     def _deserialize_data(self, data: bytes) -> Any:
         """Deserialize data from Redis."""
         try:
-            # Try JSON first (faster)
-            return json.loads(data.decode('utf-8'))
-        except (json.JSONDecodeError, UnicodeDecodeError):
+            return self.codec.decode(data)
+        except Exception as e:
+            logger.error(f"Data deserialization failed: {e}")
+            return None
+    
+    def _local_cache_active(self) -> bool:
+        """Whether the L1 can be trusted (its invalidation listener is subscribed)."""
+        if self.local_cache is None:
+            return False
+        self._ensure_invalidation_listener()
+        return self._listener_connected
+    
+    def _reset_after_fork(self):
+        """Give a forked child its own origin id, listener and empty L1."""
+        self._instance_id = uuid.uuid4().hex
+        self._listener_thread = None
+        self._listener_connected = False
+        self._listener_lock = threading.Lock()
+        if self.local_cache is not None:
+            # Fresh instance: the parent's entries may be stale and its lock may be held
+            self.local_cache = LocalCache(
+                max_entries=self.local_cache.max_entries,
+                ttl=self.local_cache.ttl,
+                max_tracked_invalidations=self.local_cache.max_tracked_invalidations,
+            )
+    
+    def _ensure_invalidation_listener(self):
+        """Start the pub/sub listener thread on first use (and again after a fork)."""
+        if self._listener_thread is not None and self._listener_thread.is_alive():
+            return
+        
+        with self._listener_lock:
+            if self._listener_thread is not None and self._listener_thread.is_alive():
+                return
+            if self._redis_address is None:
+                return
+            
+            self._listener_connected = False
+            self._listener_thread = threading.Thread(
+                target=self._listen_for_invalidations,
+                name="intelligent-cache-invalidations",
+                daemon=True
+            )
+            self._listener_thread.start()
+    
+    def _listen_for_invalidations(self):
+        """Apply invalidations published by other processes, reconnecting on failure."""
+        host, port = self._redis_address
+        
+        while True:
+            pubsub = None
             try:
-                # Fallback to pickle
-                return pickle.loads(data)
+                # Dedicated connection without a read timeout; idle channels are normal
+                client = redis.Redis(
+                    host=host,
+                    port=port,
+                    db=self.HOT_TIER.redis_db,
+                    socket_connect_timeout=5,
+                    health_check_interval=30
+                )
+                pubsub = client.pubsub()
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                
+                for message in pubsub.listen():
+                    if message['type'] == 'subscribe':
+                        # Entries cached before the subscription may have missed messages
+                        self.local_cache.clear()
+                        self._listener_connected = True
+                        logger.debug("L1 cache invalidation listener subscribed")
+                    elif message['type'] == 'message':
+                        self._apply_invalidation_message(message['data'])
+                        
             except Exception as e:
-                logger.error(f"Data deserialization failed: {e}")
-                return None
+                logger.warning(f"L1 cache invalidation listener disconnected: {e}")
+            finally:
+                self._listener_connected = False
+                self.local_cache.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            
+            time.sleep(1)
+    
+    def _apply_invalidation_message(self, data: bytes):
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed cache invalidation message")
+            return
+        
+        if message.get('origin') == self._instance_id:
+            return  # Already applied locally when published
+        
+        if message.get('all'):
+            self.local_cache.clear()
+        else:
+            self.local_cache.invalidate(message.get('keys', []))
+    
+    def _invalidate_local(self, keys: Optional[List[str]] = None):
+        """Drop keys (or everything, if keys is None) from this process's L1."""
+        if self.local_cache is None:
+            return
+        if keys is None:
+            self.local_cache.clear()
+        elif keys:
+            self.local_cache.invalidate(keys)
+    
+    def _publish_invalidation(self, keys: Optional[List[str]] = None, pipe=None):
+        """
+        Drop keys (or everything, if keys is None) from this process's L1 and
+        tell the other processes to do the same.
+        
+        Queued on pipe when given so writes pay no extra round trip; the caller
+        must then call _invalidate_local once the pipeline has executed, so a
+        concurrent read cannot re-cache the value being replaced.
+        """
+        if self.local_cache is None:
+            return
+        
+        if keys is None:
+            payload = {'origin': self._instance_id, 'all': True}
+        else:
+            if not keys:
+                return
+            payload = {'origin': self._instance_id, 'keys': keys}
+        
+        message = json.dumps(payload)
+        if pipe is not None:
+            pipe.publish(INVALIDATION_CHANNEL, message)
+            return
+        
+        self._invalidate_local(keys)
+        
+        client = next((client for client in self.redis_clients.values() if client), None)
+        if client is None:
+            return
+        try:
+            client.publish(INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            logger.error(f"Failed to publish cache invalidation: {e}")
     
     def set(self, key: str, value: Any, tier: str = "warm", tags: List[str] = None) -> bool:
         """
@@ -146,28 +408,86 @@ class IntelligentCache:
             return False
         
         try:
-            cache_key = self._get_cache_key(tier_obj, key)
-            serialized_data = self._serialize_data(value)
-            
-            # Set with TTL
-            success = client.setex(cache_key, tier_obj.ttl, serialized_data)
-            
-            # Set tags for invalidation if provided
-            if tags and success:
-                for tag in tags:
-                    tag_key = f"tag:{tag}:{cache_key}"
-                    client.sadd(tag_key, cache_key)
-                    client.expire(tag_key, tier_obj.ttl + 300)  # Tags live longer than data
+            success = self._write_entries(tier_obj, client, [(key, value, tags)]) == 1
             
             if success:
                 logger.debug(f"Cached key '{key}' in {tier} tier (TTL: {tier_obj.ttl}s)")
                 
-            return bool(success)
+            return success
             
         except Exception as e:
             logger.error(f"Cache set failed for key '{key}' in tier '{tier}': {e}")
             return False
     
+    def set_many(self, mapping: Dict[str, Any], tier: str = "warm", tags: List[str] = None) -> int:
+        """
+        Set many values in one tier with a single pipelined round trip.
+        
+        Args:
+            mapping: Cache key -> value
+            tier: Cache tier ("hot", "warm", "cold", "predict")
+            tags: Optional tags applied to every key
+            
+        Returns:
+            Number of keys written
+        """
+        tier_obj = self._get_tier(tier)
+        if not tier_obj:
+            logger.error(f"Invalid tier: {tier}")
+            return 0
+        
+        client = self.redis_clients.get(tier)
+        if not client or not mapping:
+            return 0
+        
+        try:
+            written = self._write_entries(
+                tier_obj, client, [(key, value, tags) for key, value in mapping.items()]
+            )
+            logger.debug(f"Cached {written} keys in {tier} tier (TTL: {tier_obj.ttl}s)")
+            return written
+            
+        except Exception as e:
+            logger.error(f"Cache set_many failed for {len(mapping)} keys in tier '{tier}': {e}")
+            return 0
+    
+    def _write_entries(self, tier_obj: CacheTier, client, entries: List[Tuple[str, Any, Optional[List[str]]]],
+                       publish: bool = True) -> int:
+        """
+        Write (key, value, tags) entries and their tag index in one pipeline.
+        
+        Each tag is a Redis set of cache keys in the tier's DB, so
+        invalidate_by_tag can clear it with one script call. The L1
+        invalidation rides the same pipeline unless publish is False
+        (promotions rewrite a value that is already current).
+        """
+        keys_by_tag: Dict[str, List[str]] = {}
+        
+        pipe = client.pipeline(transaction=False)
+        for key, value, tags in entries:
+            cache_key = self._get_cache_key(tier_obj, key)
+            pipe.setex(cache_key, tier_obj.ttl, self._serialize_data(value))
+            for tag in tags or ():
+                keys_by_tag.setdefault(tag, []).append(cache_key)
+        
+        for tag, cache_keys in keys_by_tag.items():
+            tag_key = self._get_tag_key(tag)
+            pipe.sadd(tag_key, *cache_keys)
+            pipe.expire(tag_key, tier_obj.ttl + 300)  # Tags live longer than data
+        
+        written_keys = [key for key, _, _ in entries]
+        if publish:
+            self._publish_invalidation(written_keys, pipe=pipe)
+        
+        try:
+            results = pipe.execute()
+        finally:
+            if publish:
+                # Only after Redis holds the new values, or a concurrent miss
+                # could put the old value back into L1
+                self._invalidate_local(written_keys)
+        return sum(1 for result in results[:len(entries)] if result)
+    
     def get(self, key: str, tiers: List[str] = None) -> Any:
         """
         Get a value from cache, checking multiple tiers in priority order.
@@ -185,6 +505,15 @@ class IntelligentCache:
         # Track access pattern
         self._track_access_pattern(key)
         
+        # The L1 fronts the hot tier, so it only applies when hot is checked
+        use_local = "hot" in tiers and self._local_cache_active()
+        if use_local:
+            data = self.local_cache.get(key)
+            if data is not None:
+                self._record_cache_hit("l1", key)
+                return self._deserialize_data(data)
+            read_version = self.local_cache.current_version()
+        
         # Check tiers in order of priority
         for tier_name in tiers:
             # Map tier names to actual tier objects
@@ -212,6 +541,9 @@ class IntelligentCache:
                     self._record_cache_hit(tier_name, key)
                     value = self._deserialize_data(data)
                     
+                    if use_local and value is not None:
+                        self.local_cache.put(key, data, read_version)
+                    
                     # Promote to higher tier if accessed from lower tier
                     if tier_name in ["cold", "warm"] and value is not None:
                         self._promote_to_hot_cache(key, value)
@@ -228,6 +560,88 @@ class IntelligentCache:
         logger.debug(f"Cache miss for key '{key}' across all tiers")
         return None
     
+    def get_many(self, keys: List[str], tiers: List[str] = None) -> Dict[str, Any]:
+        """
+        Get many values, with one MGET round trip per tier for the keys still missing.
+        
+        Args:
+            keys: Cache keys
+            tiers: List of tiers to check (defaults to all tiers)
+            
+        Returns:
+            Dict of key -> value for the keys that were found
+        """
+        if tiers is None:
+            tiers = ["hot", "warm", "predict", "cold"]
+        
+        found: Dict[str, Any] = {}
+        promote: Dict[str, Any] = {}
+        remaining = list(dict.fromkeys(keys))
+        
+        for key in remaining:
+            self._track_access_pattern(key)
+        
+        use_local = "hot" in tiers and self._local_cache_active()
+        if use_local:
+            still_missing = []
+            for key in remaining:
+                data = self.local_cache.get(key)
+                if data is None:
+                    still_missing.append(key)
+                    continue
+                self._record_cache_hit("l1", key)
+                found[key] = self._deserialize_data(data)
+            remaining = still_missing
+            read_version = self.local_cache.current_version()
+        
+        for tier_name in tiers:
+            if not remaining:
+                break
+            
+            tier_obj = self._get_tier(tier_name)
+            client = self.redis_clients.get(tier_name)
+            if not tier_obj or not client:
+                continue
+            
+            try:
+                blobs = client.mget([self._get_cache_key(tier_obj, key) for key in remaining])
+            except Exception as e:
+                logger.error(f"Cache get_many failed in tier '{tier_name}': {e}")
+                continue
+            
+            still_missing = []
+            for key, data in zip(remaining, blobs):
+                if data is None:
+                    still_missing.append(key)
+                    continue
+                
+                value = self._deserialize_data(data)
+                self._record_cache_hit(tier_name, key)
+                found[key] = value
+                if use_local and value is not None:
+                    self.local_cache.put(key, data, read_version)
+                if tier_name in ["cold", "warm"] and value is not None:
+                    promote[key] = value
+            
+            remaining = still_missing
+        
+        for key in remaining:
+            self._record_cache_miss(key)
+        
+        # Promote lower-tier hits to the hot tier in one pipeline
+        hot_client = self.redis_clients.get("hot")
+        if promote and hot_client:
+            try:
+                self._write_entries(
+                    self.HOT_TIER, hot_client, [(key, value, None) for key, value in promote.items()],
+                    publish=False
+                )
+            except Exception as e:
+                logger.error(f"Cache promotion of {len(promote)} keys failed: {e}")
+        
+        logger.debug(f"Cache get_many: {len(found)} hits, {len(remaining)} misses")
+        return found
+    
     def delete(self, key: str, all_tiers: bool = True) -> bool:
         """
         Delete a key from cache.
@@ -266,12 +680,18 @@ class IntelligentCache:
                 except Exception as e:
                     logger.error(f"Cache delete failed for '{key}' in {tier_name}: {e}")
         
+        self._publish_invalidation([key])
+        
         return success_count > 0
     
     def invalidate_by_tag(self, tag: str) -> int:
         """
         Invalidate all cache entries with a specific tag.
         
+        Runs one Lua script per tier that deletes every key in the tag's
+        index set and then the set itself, so no keyspace SCAN is needed.
+        Hot-tier copies promoted from the other tiers are deleted with them.
+        
         Args:
             tag: Tag to invalidate
             
@@ -279,33 +699,46 @@ class IntelligentCache:
             Number of keys invalidated
         """
         invalidated_count = 0
+        promoted_keys = []
+        invalidated_keys = set()
         
         for tier_name in ["hot", "warm", "cold", "predict"]:
-            client = self.redis_clients.get(tier_name)
-            if not client:
+            script = self._invalidate_scripts.get(tier_name)
+            if not script:
                 continue
                 
             try:
-                tag_key = f"tag:{tag}:*"
-                for tag_key in client.scan_iter(match=tag_key):
-                    # Get all keys for this tag
-                    cache_keys = client.smembers(tag_key)
-                    for cache_key in cache_keys:
-                        if client.delete(cache_key):
-                            invalidated_count += 1
-                    
-                    # Delete the tag key itself
-                    client.delete(tag_key)
-                    
+                deleted, members = script(keys=[self._get_tag_key(tag)])
+                invalidated_count += int(deleted)
+                prefix_length = len(self._get_tier(tier_name).key_prefix)
+                keys = [member[prefix_length:].decode('utf-8') for member in members]
+                invalidated_keys.update(keys)
+                if tier_name != "hot":
+                    promoted_keys.extend(self._get_cache_key(self.HOT_TIER, key) for key in keys)
             except Exception as e:
                 logger.error(f"Tag invalidation failed for '{tag}' in {tier_name}: {e}")
         
+        hot_client = self.redis_clients.get("hot")
+        if promoted_keys and hot_client:
+            try:
+                invalidated_count += hot_client.delete(*promoted_keys)
+            except Exception as e:
+                logger.error(f"Tag invalidation of promoted hot keys failed for '{tag}': {e}")
+        
+        self._publish_invalidation(sorted(invalidated_keys))
+        
         logger.info(f"Invalidated {invalidated_count} cache keys with tag '{tag}'")
         return invalidated_count
     
     def _promote_to_hot_cache(self, key: str, value: Any):
         """Promote frequently accessed data to hot cache."""
-        self.set(key, value, tier="hot")
+        client = self.redis_clients.get("hot")
+        if not client:
+            return
+        try:
+            self._write_entries(self.HOT_TIER, client, [(key, value, None)], publish=False)
+        except Exception as e:
+            logger.error(f"Cache promotion failed for key '{key}': {e}")
     
     def _track_access_pattern(self, key: str):
         """Track access patterns for predictive caching."""
@@ -349,7 +782,14 @@ class IntelligentCache:
             'total_hits': total_hits,
             'total_misses': total_misses,
             'tier_breakdown': self.cache_hits,
-            'active_patterns': len(self.access_patterns)
+            'active_patterns': len(self.access_patterns),
+            'l1': {
+                'enabled': self.local_cache is not None,
+                'listener_connected': self._listener_connected,
+                'entries': len(self.local_cache),
+                'hits': self.local_cache.hits,
+                'misses': self.local_cache.misses,
+            } if self.local_cache is not None else {'enabled': False}
         }
     
     def preload_market_data(self, items: List[int], data_generator: Callable):
@@ -362,15 +802,24 @@ class IntelligentCache:
         """
         logger.info(f"Preloading market data for {len(items)} items")
         
+        entries = []
         for item_id in items:
             try:
                 data = data_generator(item_id)
                 if data:
                     cache_key = f"market_data:{item_id}"
-                    self.set(cache_key, data, tier="predict", tags=[f"item_{item_id}", "market_data"])
+                    entries.append((cache_key, data, [f"item_{item_id}", "market_data"]))
                     
             except Exception as e:
                 logger.error(f"Failed to preload data for item {item_id}: {e}")
+        
+        client = self.redis_clients.get("predict")
+        if entries and client:
+            try:
+                written = self._write_entries(self.PREDICTION_TIER, client, entries)
+                logger.info(f"Preloaded {written} market data entries")
+            except Exception as e:
+                logger.error(f"Failed to preload market data: {e}")
     
     def flush_tier(self, tier: str) -> bool:
         """
@@ -388,6 +837,7 @@ class IntelligentCache:
         
         try:
             client.flushdb()
+            self._publish_invalidation()
             logger.info(f"Flushed {tier} cache tier")
             return True
         except Exception as e:
@@ -0,0 +1,254 @@
+"""
+Inverted Keyword Index for Item Search
+
+Prebuilt postings over item names, examine text and category tags:
+- Token postings scored with BM25 (per-field weights folded into the term
+  frequency and document length, BM25F-style)
+- Character trigram index over the vocabulary, so a query term also matches
+  longer terms containing it ("scim" -> "scimitar") without scanning items
+- Category and price-bucket postings for filtering
+- Reciprocal-rank fusion helper for merging ranked lists (e.g. keyword + FAISS)
+
+A query touches only the postings of its terms, so its cost is
+O(matching postings), not O(catalog).
+"""
+
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Field weights: a hit in the name counts more than one in the examine text
+FIELD_WEIGHTS = {'name': 3.0, 'tags': 2.0, 'examine': 1.0}
+
+# Score multiplier for vocabulary terms that merely contain the query term
+PARTIAL_MATCH_WEIGHT = 0.5
+
+NGRAM_SIZE = 3
+
+# Conventional RRF damping constant
+RRF_K = 60
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens of a text."""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def _ngrams(term: str) -> Set[str]:
+    return {term[i:i + NGRAM_SIZE] for i in range(len(term) - NGRAM_SIZE + 1)}
+
+
+def price_bucket(price: int) -> int:
+    """Power-of-two price bucket (0 for unknown / zero prices)."""
+    return int(price).bit_length() if price and price > 0 else 0
+
+
+@dataclass
+class IndexedItem:
+    """Fields indexed for one item."""
+    item_id: int
+    name: str
+    examine: str = ""
+    tags: Tuple[str, ...] = ()
+    category: str = "Other"
+    price: int = 0
+
+
+class KeywordIndex:
+    """
+    Immutable inverted index with BM25 scoring and filter postings.
+
+    Build once per catalog refresh with build(); searches are read-only and
+    safe to run from several threads.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.doc_lengths: Dict[int, float] = {}
+        self.avg_doc_length = 0.0
+        self.idf: Dict[str, float] = {}
+        self.ngram_terms: Dict[str, Set[str]] = {}
+        self.category_postings: Dict[str, Set[int]] = {}
+        self.price_bucket_postings: Dict[int, Set[int]] = {}
+        self.prices: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, items: Iterable[IndexedItem], **kwargs) -> 'KeywordIndex':
+        """
+        Build an index from item fields.
+
+        Args:
+            items: Items to index
+            **kwargs: BM25 parameters (k1, b)
+
+        Returns:
+            The populated KeywordIndex
+        """
+        index = cls(**kwargs)
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        category_postings: Dict[str, Set[int]] = defaultdict(set)
+        price_bucket_postings: Dict[int, Set[int]] = defaultdict(set)
+
+        for item in items:
+            fields = {'name': item.name, 'examine': item.examine, 'tags': ' '.join(item.tags)}
+            doc_length = 0.0
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(text):
+                    doc_postings = postings[token]
+                    doc_postings[item.item_id] = doc_postings.get(item.item_id, 0.0) + weight
+                    doc_length += weight
+
+            index.doc_lengths[item.item_id] = doc_length
+            category_postings[item.category].add(item.item_id)
+            price_bucket_postings[price_bucket(item.price)].add(item.item_id)
+            index.prices[item.item_id] = item.price or 0
+
+        index.postings = dict(postings)
+        index.category_postings = dict(category_postings)
+        index.price_bucket_postings = dict(price_bucket_postings)
+
+        doc_count = len(index.doc_lengths)
+        index.avg_doc_length = sum(index.doc_lengths.values()) / doc_count if doc_count else 0.0
+        index.idf = {
+            term: math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in index.postings.items()
+        }
+
+        ngram_terms: Dict[str, Set[str]] = defaultdict(set)
+        for term in index.postings:
+            for gram in _ngrams(term):
+                ngram_terms[gram].add(term)
+        index.ngram_terms = dict(ngram_terms)
+
+        return index
+
+    def _expand_term(self, term: str) -> Dict[str, float]:
+        """Vocabulary terms matching a query term, with their match weight."""
+        matches = {term: 1.0} if term in self.postings else {}
+        grams = _ngrams(term)
+        if not grams:
+            return matches
+
+        # Terms sharing every trigram of the query term, verified as substrings
+        candidates = None
+        for gram in sorted(grams, key=lambda g: len(self.ngram_terms.get(g, ()))):
+            terms = self.ngram_terms.get(gram)
+            if not terms:
+                return matches
+            candidates = set(terms) if candidates is None else candidates & terms
+            if not candidates:
+                return matches
+
+        for candidate in candidates:
+            if candidate != term and term in candidate:
+                matches[candidate] = PARTIAL_MATCH_WEIGHT
+        return matches
+
+    def filter_ids(
+        self,
+        category_filter: Optional[str] = None,
+        price_range: Optional[Tuple[int, int]] = None
+    ) -> Optional[Set[int]]:
+        """
+        Resolve filters to the set of allowed item IDs.
+
+        Args:
+            category_filter: Case-insensitive substring of the category name ("Potion"
+                matches every "Potion (n-dose)" category)
+            price_range: Inclusive (min, max) buy price; items without a price pass
+
+        Returns:
+            Allowed item IDs, or None when no filter applies
+        """
+        allowed = None
+
+        if category_filter:
+            needle = category_filter.lower()
+            allowed = set()
+            for category, item_ids in self.category_postings.items():
+                if needle in category.lower():
+                    allowed |= item_ids
+
+        if price_range:
+            min_price, max_price = price_range
+            low_bucket, high_bucket = price_bucket(max(min_price, 1)), price_bucket(max_price)
+            in_range = set(self.price_bucket_postings.get(0, ()))
+            for bucket in range(low_bucket, high_bucket + 1):
+                item_ids = self.price_bucket_postings.get(bucket)
+                if not item_ids:
+                    continue
+                if low_bucket < bucket < high_bucket:
+                    in_range |= item_ids
+                else:
+                    # Edge buckets straddle the range; check exact prices
+                    in_range.update(i for i in item_ids if min_price <= self.prices[i] <= max_price)
+            allowed = in_range if allowed is None else allowed & in_range
+
+        return allowed
+
+    def search(
+        self,
+        query_text: str,
+        limit: Optional[int] = None,
+        allowed_ids: Optional[Set[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Score items against a query with BM25.
+
+        Args:
+            query_text: Free-text query
+            limit: Maximum results (all matches when None)
+            allowed_ids: Restrict results to these item IDs (see filter_ids)
+
+        Returns:
+            (item_id, score) tuples, best first
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        k1, b, avg_length = self.k1, self.b, self.avg_doc_length or 1.0
+
+        for query_term in set(tokenize(query_text)):
+            for term, match_weight in self._expand_term(query_term).items():
+                idf = self.idf[term] * match_weight
+                for item_id, tf in self.postings[term].items():
+                    if allowed_ids is not None and item_id not in allowed_ids:
+                        continue
+                    norm = k1 * (1 - b + b * self.doc_lengths[item_id] / avg_length)
+                    scores[item_id] += idf * tf * (k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+        return ranked[:limit] if limit is not None else ranked
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Iterable[Iterable[Hashable]],
+    k: int = RRF_K,
+    weights: Optional[Iterable[float]] = None
+) -> Dict[Hashable, float]:
+    """
+    Fuse ranked ID lists with (weighted) reciprocal-rank fusion.
+
+    Args:
+        ranked_lists: ID lists, each ordered best first
+        k: Damping constant; larger values flatten the rank curve
+        weights: Optional per-list weights (default 1.0 each)
+
+    Returns:
+        Mapping of ID to fused score (higher is better)
+    """
+    fused: Dict[Hashable, float] = defaultdict(float)
+    ranked_lists = list(ranked_lists)
+    weights = list(weights) if weights is not None else [1.0] * len(ranked_lists)
+    for ranked, weight in zip(ranked_lists, weights):
+        for rank, key in enumerate(ranked, start=1):
+            fused[key] += weight / (k + rank)
+    return dict(fused)
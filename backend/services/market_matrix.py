@@ -0,0 +1,275 @@
+"""
+Columnar In-Memory Market Matrix
+
+Process-wide, NumPy-backed view of current Grand Exchange prices shared by the
+strategy scanners (universal, decanting, flipping, crafting, set combining):
+- One bulk load of ProfitCalculation rows per refresh cycle
+- Latest PriceSnapshot fallback for items without cached prices (one query)
+- item_id -> row index lookup with buy/sell/volume/category/timestamp columns
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Q
+
+from apps.prices.models import PriceSnapshot, ProfitCalculation
+
+logger = logging.getLogger(__name__)
+
+
+# Cache key bumped by price sync tasks so every process reloads on its next scan
+MARKET_GENERATION_KEY = "market_matrix:generation"
+
+# Volume categories in ascending activity order; stored as int8 codes
+VOLUME_CATEGORIES = ('inactive', 'cold', 'cool', 'warm', 'hot')
+VOLUME_CATEGORY_CODES = {name: code for code, name in enumerate(VOLUME_CATEGORIES)}
+
+SOURCE_PROFIT_CALC = 0
+SOURCE_PRICE_SNAPSHOT = 1
+
+
+class MarketSnapshot:
+    """
+    Immutable set of aligned price columns for a single refresh cycle.
+
+    Scanners should grab one snapshot per scan so every lookup in that scan
+    sees the same data even if another thread refreshes the matrix.
+    """
+
+    def __init__(self, item_ids: np.ndarray, item_pks: np.ndarray, names: List[str], high_alch: np.ndarray,
+                 buy_prices: np.ndarray, sell_prices: np.ndarray,
+                 daily_volumes: np.ndarray, hourly_volumes: np.ndarray,
+                 volume_categories: np.ndarray, timestamps: np.ndarray,
+                 sources: np.ndarray, generation: Optional[int] = None):
+        self.item_ids = item_ids
+        self.item_pks = item_pks
+        self.names = names
+        self.high_alch = high_alch
+        self.buy_prices = buy_prices
+        self.sell_prices = sell_prices
+        self.daily_volumes = daily_volumes
+        self.hourly_volumes = hourly_volumes
+        self.volume_categories = volume_categories
+        self.timestamps = timestamps
+        self.sources = sources
+        self.generation = generation
+        self.loaded_at = time.time()
+        self.index = {int(item_id): row for row, item_id in enumerate(item_ids.tolist())}
+        self._derived: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self.index
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.loaded_at
+
+    def row_for(self, item_id: int) -> Optional[int]:
+        """Get the row index for an OSRS item ID, or None if not loaded."""
+        return self.index.get(item_id)
+
+    def rows_for(self, item_ids: Iterable[int]) -> np.ndarray:
+        """Get row indices for many item IDs (-1 for items not in the matrix)."""
+        return np.fromiter(
+            (self.index.get(item_id, -1) for item_id in item_ids), dtype=np.int64
+        )
+
+    def derived(self, name: str, builder: Callable[['MarketSnapshot'], Any]) -> Any:
+        """
+        Get a column derived from this snapshot, building it on first use.
+
+        Lets scanners compute name-based flags (potion, equipment, ...) once per
+        refresh cycle instead of once per scan.
+        """
+        if name not in self._derived:
+            self._derived[name] = builder(self)
+        return self._derived[name]
+
+    def volume_category(self, row: int) -> str:
+        return VOLUME_CATEGORIES[int(self.volume_categories[row])]
+
+    def get_price(self, item_id: int) -> Optional[Dict]:
+        """
+        Get price data for an item in the format the strategy scanners expect.
+
+        Args:
+            item_id: OSRS item ID
+
+        Returns:
+            Dict with high/low prices and highTime/lowTime volumes, or None
+        """
+        row = self.index.get(item_id)
+        if row is None:
+            return None
+
+        return {
+            'high': int(self.buy_prices[row]),    # What we pay to buy instantly
+            'low': int(self.sell_prices[row]),    # What we receive when selling instantly
+            'highTime': int(self.daily_volumes[row]),
+            'lowTime': int(self.hourly_volumes[row]),
+            'volume_category': self.volume_category(row),
+            'data_source': (
+                'cached_profit_calc' if self.sources[row] == SOURCE_PROFIT_CALC else 'price_snapshot'
+            ),
+        }
+
+
+class MarketMatrix:
+    """
+    Shared market matrix that reloads at most once per refresh cycle.
+    """
+
+    def __init__(self, max_age_seconds: Optional[int] = None):
+        self.max_age_seconds = max_age_seconds or getattr(settings, 'PRICE_UPDATE_INTERVAL', 300)
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, force_refresh: bool = False) -> MarketSnapshot:
+        """
+        Get the current market snapshot, reloading it if stale.
+
+        Args:
+            force_refresh: Reload from the database regardless of age
+
+        Returns:
+            MarketSnapshot for the current refresh cycle
+        """
+        current = self._snapshot
+        generation = self._current_generation()
+
+        if not force_refresh and current is not None and not self._is_stale(current, generation):
+            return current
+
+        with self._lock:
+            # Another thread may have reloaded while we waited on the lock
+            current = self._snapshot
+            if force_refresh or current is None or self._is_stale(current, generation):
+                self._snapshot = self._load(generation)
+            return self._snapshot
+
+    def invalidate(self):
+        """Drop the in-process snapshot so the next read reloads it."""
+        self._snapshot = None
+
+    def get_price(self, item_id: int) -> Optional[Dict]:
+        """Convenience lookup against the current snapshot."""
+        return self.snapshot().get_price(item_id)
+
+    def _is_stale(self, snapshot: MarketSnapshot, generation: Optional[int]) -> bool:
+        if snapshot.age_seconds > self.max_age_seconds:
+            return True
+        return generation is not None and generation != snapshot.generation
+
+    def _current_generation(self) -> Optional[int]:
+        try:
+            return cache.get(MARKET_GENERATION_KEY)
+        except Exception as e:
+            logger.debug(f"Market generation lookup failed: {e}")
+            return None
+
+    def _load(self, generation: Optional[int]) -> MarketSnapshot:
+        """Bulk load all market rows into aligned NumPy columns."""
+        started = time.perf_counter()
+
+        priced = ProfitCalculation.objects.filter(
+            Q(current_buy_price__gt=0) | Q(current_sell_price__gt=0)
+        )
+        rows = list(
+            priced.values_list(
+                'item__item_id', 'item_id', 'item__name', 'item__high_alch',
+                'current_buy_price', 'current_sell_price',
+                'daily_volume', 'hourly_volume', 'volume_category', 'last_updated',
+            )
+        )
+        sources = [SOURCE_PROFIT_CALC] * len(rows)
+
+        # Fallback: latest PriceSnapshot for items without cached prices
+        profit_calc_count = len(rows)
+        latest_snapshot_ids = (
+            PriceSnapshot.objects.exclude(item_id__in=priced.values('item_id'))
+            .filter(Q(high_price__gt=0) | Q(low_price__gt=0))
+            .values('item').annotate(latest_id=Max('id')).values_list('latest_id', flat=True)
+        )
+        snapshot_rows = PriceSnapshot.objects.filter(id__in=latest_snapshot_ids).values_list(
+            'item__item_id', 'item_id', 'item__name', 'item__high_alch',
+            'high_price', 'low_price',
+            'high_price_volume', 'low_price_volume', 'total_volume', 'created_at',
+        )
+        for (item_id, item_pk, name, high_alch, high, low,
+             high_volume, low_volume, total_volume, created_at) in snapshot_rows:
+            rows.append((
+                item_id, item_pk, name, high_alch, high, low, high_volume, low_volume,
+                PriceSnapshot.get_volume_category(total_volume), created_at,
+            ))
+            sources.append(SOURCE_PRICE_SNAPSHOT)
+
+        count = len(rows)
+        item_ids = np.empty(count, dtype=np.int64)
+        item_pks = np.empty(count, dtype=np.int64)
+        high_alch = np.zeros(count, dtype=np.int64)
+        buy_prices = np.zeros(count, dtype=np.int64)
+        sell_prices = np.zeros(count, dtype=np.int64)
+        daily_volumes = np.zeros(count, dtype=np.int64)
+        hourly_volumes = np.zeros(count, dtype=np.int64)
+        volume_categories = np.zeros(count, dtype=np.int8)
+        timestamps = np.zeros(count, dtype=np.float64)
+        names = []
+
+        for i, (item_id, item_pk, name, alch, buy, sell, daily, hourly, category, updated) in enumerate(rows):
+            item_ids[i] = item_id
+            item_pks[i] = item_pk
+            names.append(name)
+            high_alch[i] = alch or 0
+            buy_prices[i] = buy or 0
+            sell_prices[i] = sell or 0
+            daily_volumes[i] = daily or 0
+            hourly_volumes[i] = hourly or 0
+            volume_categories[i] = VOLUME_CATEGORY_CODES.get(category, 0)
+            timestamps[i] = updated.timestamp() if updated else 0.0
+
+        snapshot = MarketSnapshot(
+            item_ids=item_ids,
+            item_pks=item_pks,
+            names=names,
+            high_alch=high_alch,
+            buy_prices=buy_prices,
+            sell_prices=sell_prices,
+            daily_volumes=daily_volumes,
+            hourly_volumes=hourly_volumes,
+            volume_categories=volume_categories,
+            timestamps=timestamps,
+            sources=np.asarray(sources, dtype=np.int8),
+            generation=generation,
+        )
+
+        logger.info(
+            f"Loaded market matrix: {count} items "
+            f"({count - profit_calc_count} from snapshots) in {time.perf_counter() - started:.3f}s"
+        )
+        return snapshot
+
+
+def mark_market_data_updated():
+    """
+    Signal that prices changed so every process reloads its market matrix.
+
+    Called by the price sync tasks after they commit new ProfitCalculation rows.
+    """
+    try:
+        cache.set(MARKET_GENERATION_KEY, time.time_ns(), timeout=None)
+    except Exception as e:
+        logger.debug(f"Failed to bump market generation: {e}")
+    market_matrix.invalidate()
+
+
+# Global market matrix instance
+market_matrix = MarketMatrix()
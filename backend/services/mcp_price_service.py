@@ -25,6 +25,7 @@ from apps.items.models import Item
 from apps.prices.models import PriceSnapshot, ProfitCalculation
 from .api_client import RuneScapeWikiClient
 from .unified_wiki_price_client import UnifiedPriceClient, PriceData
+from .timeseries_client import timeseries_client
 
 logger = logging.getLogger(__name__)
 
@@ -395,6 +396,7 @@ class MCPPriceService:
     async def _process_bulk_price_data(self, price_data: Dict):
         """Process bulk price data and update priorities."""
         current_time = timezone.now()
+        influx_records = []
         
         # Process price data (async, so no transaction wrapper)
         for item_id_str, data in price_data.items():
@@ -435,13 +437,22 @@ class MCPPriceService:
                     
                     # Store in database for persistence
                     await self._store_price_snapshot(item_id, cache_data)
+                    influx_records.append({
+                        'item_id': item_id,
+                        'price_data': {'high_price': high_price, 'low_price': low_price},
+                        'timestamp': current_time,
+                    })
                     
             except (ValueError, KeyError) as e:
                 logger.error(f"Error processing price data for item {item_id_str}: {e}")
+        
+        # Non-blocking: spills to the writer's spool rather than stall the event loop
+        timeseries_client.write_bulk_price_data(influx_records, block=False)
                     
     async def _process_multi_source_price_data(self, price_data_map: Dict[int, PriceData]):
         """Process multi-source price data for multiple items."""
         current_time = timezone.now()
+        influx_records = []
         
         for item_id, price_data in price_data_map.items():
             try:
@@ -477,9 +488,13 @@ class MCPPriceService:
                 
                 # Store in database for persistence
                 await self._store_multi_source_price_snapshot(item_id, price_data)
+                influx_records.append(self._influx_price_record(item_id, price_data))
                 
             except Exception as e:
                 logger.error(f"Error processing multi-source price data for item {item_id}: {e}")
+        
+        # Non-blocking: spills to the writer's spool rather than stall the event loop
+        timeseries_client.write_bulk_price_data(influx_records, block=False)
 
     async def _process_multi_source_item_price(self, item_id: int, price_data: PriceData):
         """Process multi-source price data for a single item."""
@@ -517,6 +532,23 @@ class MCPPriceService:
         
         # Store in database
         await self._store_multi_source_price_snapshot(item_id, price_data)
+        record = self._influx_price_record(item_id, price_data)
+        timeseries_client.write_price_data(item_id, record['price_data'], record['timestamp'], block=False)
+
+    @staticmethod
+    def _influx_price_record(item_id: int, price_data: PriceData) -> Dict:
+        """Build a TimeSeriesClient price record from multi-source price data."""
+        return {
+            'item_id': item_id,
+            'price_data': {
+                'high_price': price_data.high_price,
+                'low_price': price_data.low_price,
+                'high_volume': price_data.volume_high,
+                'low_volume': price_data.volume_low,
+                'total_volume': price_data.total_volume,
+            },
+            'timestamp': price_data.timestamp if price_data.timestamp > 0 else timezone.now(),
+        }
 
     async def _process_item_price_data(self, item_id: int, data: Dict):
         """Process price data for a single item (legacy method for backwards compatibility)."""
@@ -386,8 +386,8 @@ RULES:
                 if query_type == 'conversational_question' or 'what' in query.lower() or 'how' in query.lower():
                     try:
                         # Use hybrid search service to find relevant items/context
-                        from services.search_service import HybridSearchService
-                        search_service = HybridSearchService()
+                        from services.search_runtime import get_search_service
+                        search_service = get_search_service()
                         
                         # Perform semantic search for context (wrap in sync_to_async for Django ORM)
                         from asgiref.sync import sync_to_async
@@ -662,8 +662,8 @@ RULES:
             
             # Try using the HybridSearchService for proper FAISS vector search
             try:
-                from services.search_service import HybridSearchService
-                search_service = HybridSearchService()
+                from services.search_runtime import get_search_service
+                search_service = get_search_service()
                 
                 # Extract profit targets from query for dynamic filtering
                 min_profit, max_profit = self._extract_profit_targets(query)
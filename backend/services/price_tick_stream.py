@@ -0,0 +1,201 @@
+"""
+Price Tick Stream
+
+Ingestion paths (price sync tasks, the unified ingestion service, the
+streaming data manager) publish every new price snapshot as a tick on a
+Redis Stream. Reactive consumers read it through a consumer group, so each
+tick is delivered once per group, survives consumer restarts (unacked ticks
+are reclaimed) and arrives as soon as it is written instead of on the next
+poll of the PriceSnapshot table.
+"""
+
+import logging
+import os
+import socket
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+PRICE_TICK_STREAM = "osrs:price_ticks"
+
+
+def _stream_url() -> str:
+    return getattr(settings, 'PRICE_TICK_STREAM_URL', None) or \
+        getattr(settings, 'CACHES', {}).get('default', {}).get('LOCATION', 'redis://127.0.0.1:6379/1')
+
+
+def tick_from_snapshot(snapshot) -> Dict:
+    """
+    Build a tick from a PriceSnapshot (saved or about to be bulk-created).
+
+    Args:
+        snapshot: PriceSnapshot with its item loaded
+
+    Returns:
+        Dict with item_id, high, low, mid price, volumes, timestamp, source
+        and interval (latest / 5m / 1h)
+    """
+    high = snapshot.high_price or 0
+    low = snapshot.low_price or 0
+    return {
+        'item_id': snapshot.item.item_id,
+        'high': high,
+        'low': low,
+        'price': (high + low) / 2 if high and low else float(high or low),
+        'volume': snapshot.total_volume or 0,
+        'high_volume': snapshot.high_price_volume or 0,
+        'low_volume': snapshot.low_price_volume or 0,
+        'ts': time.time(),
+        'source': snapshot.api_source or '',
+        'interval': snapshot.data_interval or '',
+    }
+
+
+class PriceTickPublisher:
+    """Appends price ticks to the stream; failures are logged, never raised."""
+
+    def __init__(self, url: Optional[str] = None, maxlen: Optional[int] = None):
+        self.url = url or _stream_url()
+        self.maxlen = maxlen or getattr(settings, 'PRICE_TICK_STREAM_MAXLEN', 100000)
+        self._client: Optional[redis.Redis] = None
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url, socket_timeout=5, socket_connect_timeout=5)
+        return self._client
+
+    def publish(self, ticks: Iterable[Dict]) -> int:
+        """
+        Publish ticks in one pipelined round trip.
+
+        Args:
+            ticks: Tick dicts (see tick_from_snapshot)
+
+        Returns:
+            Number of ticks written
+        """
+        ticks = list(ticks)
+        if not ticks:
+            return 0
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tick in ticks:
+                pipe.xadd(
+                    PRICE_TICK_STREAM,
+                    {field: str(value) for field, value in tick.items()},
+                    maxlen=self.maxlen,
+                    approximate=True
+                )
+            pipe.execute()
+            return len(ticks)
+        except Exception as e:
+            logger.warning(f"Failed to publish {len(ticks)} price ticks: {e}")
+            return 0
+
+    def publish_snapshots(self, snapshots: Iterable) -> int:
+        """Publish one tick per PriceSnapshot."""
+        return self.publish(tick_from_snapshot(snapshot) for snapshot in snapshots)
+
+
+class PriceTickConsumer:
+    """
+    Async consumer-group reader for the price tick stream.
+
+    Ticks must be acked once handled; ticks left pending by a consumer that
+    died are reclaimed after claim_idle_ms by whichever consumer reads next.
+    """
+
+    def __init__(self, group: str, consumer: Optional[str] = None, url: Optional[str] = None,
+                 claim_idle_ms: int = 60000):
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.url = url or _stream_url()
+        self.claim_idle_ms = claim_idle_ms
+        self._client: Optional[aioredis.Redis] = None
+        self._group_ready = False
+        self._last_claim = 0.0
+
+    async def _get_client(self) -> aioredis.Redis:
+        if self._client is None:
+            self._client = aioredis.Redis.from_url(self.url, socket_connect_timeout=5)
+        if not self._group_ready:
+            try:
+                # Start from new ticks only; history is covered by the snapshot tables
+                await self._client.xgroup_create(PRICE_TICK_STREAM, self.group, id='$', mkstream=True)
+            except redis.ResponseError as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+            self._group_ready = True
+        return self._client
+
+    async def read(self, count: int = 500, block_ms: int = 5000) -> List[Tuple[bytes, Dict]]:
+        """
+        Read the next batch of ticks for this consumer.
+
+        Stale pending ticks are reclaimed first (at most once per
+        claim_idle_ms), then new ticks are read, blocking up to block_ms
+        when the stream is idle.
+
+        Returns:
+            List of (stream entry ID, decoded tick) tuples
+        """
+        client = await self._get_client()
+        entries = []
+
+        if time.monotonic() - self._last_claim >= self.claim_idle_ms / 1000:
+            self._last_claim = time.monotonic()
+            claimed = await client.xautoclaim(
+                PRICE_TICK_STREAM, self.group, self.consumer,
+                min_idle_time=self.claim_idle_ms, start_id='0-0', count=count
+            )
+            entries.extend(claimed[1])
+
+        if len(entries) < count:
+            response = await client.xreadgroup(
+                self.group, self.consumer, {PRICE_TICK_STREAM: '>'},
+                count=count - len(entries), block=block_ms if not entries else None
+            )
+            for _, stream_entries in response or []:
+                entries.extend(stream_entries)
+
+        return [(entry_id, self._decode(fields)) for entry_id, fields in entries if fields]
+
+    async def ack(self, entry_ids: List[bytes]):
+        """Acknowledge handled ticks."""
+        if entry_ids:
+            client = await self._get_client()
+            await client.xack(PRICE_TICK_STREAM, self.group, *entry_ids)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._group_ready = False
+
+    @staticmethod
+    def _decode(fields: Dict[bytes, bytes]) -> Dict:
+        tick = {key.decode(): value.decode() for key, value in fields.items()}
+        return {
+            'item_id': int(tick['item_id']),
+            'high': int(float(tick.get('high', 0))),
+            'low': int(float(tick.get('low', 0))),
+            'price': float(tick.get('price', 0)),
+            'volume': int(float(tick.get('volume', 0))),
+            'high_volume': int(float(tick.get('high_volume', 0))),
+            'low_volume': int(float(tick.get('low_volume', 0))),
+            'ts': float(tick.get('ts', 0)),
+            'source': tick.get('source', ''),
+            'interval': tick.get('interval', ''),
+        }
+
+
+# Global publisher instance
+price_tick_publisher = PriceTickPublisher()
@@ -14,16 +14,19 @@ in real-time rather than requiring manual refresh or periodic updates.
 """
 
 import asyncio
+import heapq
 import logging
 import json
+import time
 import weakref
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Any, Callable
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional, Set, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict, deque
 from enum import Enum
 import hashlib
 
+import numpy as np
 from django.core.cache import cache
 from django.utils import timezone
 from django.db import transaction
@@ -36,14 +39,28 @@ from .unified_data_ingestion_service import UnifiedDataIngestionService
 from .price_pattern_analysis_service import PricePatternAnalysisService
 from .context_aware_chat_service import ContextAwareChatService
 from .ollama_ai_service import TradingView
+from .price_tick_stream import PriceTickConsumer
+from .websocket_fanout import BroadcastBatcher, TRADING_ALL_GROUP, chart_group, item_group, route_group
 from apps.items.models import Item
 from apps.prices.models import (
-    HistoricalPricePoint, PriceTrend, MarketAlert, PriceSnapshot, ProfitCalculation
+    HistoricalPricePoint, PriceTrend, MarketAlert, ProfitCalculation
 )
 
 logger = logging.getLogger(__name__)
 
 
+# Map WebSocket route types to trading views
+# NOTE: These enum values MUST match the TradingView enum in ollama_ai_service.py
+# Any mismatch will cause infinite WebSocket subscription loops!
+ROUTE_VIEW_MAP = {
+    'high_alch': TradingView.HIGH_ALCHEMY,  # Fixed: was HIGH_ALCH, now HIGH_ALCHEMY
+    'flipping': TradingView.FLIPPING,
+    'decanting': TradingView.DECANTING,
+    'crafting': TradingView.CRAFTING,
+    'general': TradingView.GENERAL
+}
+
+
 class UpdatePriority(Enum):
     """Priority levels for reactive updates."""
     CRITICAL = "critical"  # Flash crashes, major breakouts
@@ -102,15 +119,43 @@ class WebSocketSubscription:
 
 
 class ReactiveTaskScheduler:
-    """Manages scheduling and execution of reactive tasks."""
+    """
+    Manages scheduling and execution of reactive tasks.
+    
+    Each priority has a bounded queue drained by a fixed pool of workers.
+    Events are coalesced per (item, event type): while one is waiting to run,
+    newer events for the same key replace it instead of queueing again (a
+    more urgent replacement also puts the key on its own, faster queue).
+    Failed events go to a delay heap for retry so backoff never holds a
+    worker. When a queue is full, CRITICAL/HIGH producers wait for room
+    (backpressure) and MEDIUM/LOW events are dropped.
+    """
+    
+    WORKER_COUNTS = {
+        UpdatePriority.CRITICAL: 5,
+        UpdatePriority.HIGH: 3,
+        UpdatePriority.MEDIUM: 2,
+        UpdatePriority.LOW: 1,
+    }
+    BLOCKING_PRIORITIES = (UpdatePriority.CRITICAL, UpdatePriority.HIGH)
+    PRIORITY_RANK = {priority: rank for rank, priority in enumerate(WORKER_COUNTS)}
     
-    def __init__(self):
-        self.pending_tasks: Dict[str, asyncio.Task] = {}
+    def __init__(self, max_queue_size: int = 1000):
+        self.max_queue_size = max_queue_size
         self.task_queues: Dict[UpdatePriority, asyncio.Queue] = {
-            priority: asyncio.Queue() for priority in UpdatePriority
+            priority: asyncio.Queue(maxsize=max_queue_size) for priority in UpdatePriority
         }
+        # Latest waiting event per coalescing key; queues only carry the keys
+        self.pending_events: Dict[tuple, tuple] = {}
+        # Most urgent queue each pending key has been put on
+        self.queued_priority: Dict[tuple, UpdatePriority] = {}
+        self.retry_heap: List[tuple] = []
+        self._retry_sequence = 0
+        self._retry_wakeup: Optional[asyncio.Event] = None
+        self.in_flight = 0
         self.running = False
-        self.workers: Dict[UpdatePriority, asyncio.Task] = {}
+        self.workers: List[asyncio.Task] = []
+        self.stats = defaultdict(int)
     
     async def start(self):
         """Start the reactive task scheduler."""
@@ -120,19 +165,11 @@ class ReactiveTaskScheduler:
         self.running = True
         logger.info("🚀 Starting reactive task scheduler")
         
-        # Start priority-based workers
-        self.workers[UpdatePriority.CRITICAL] = asyncio.create_task(
-            self._process_priority_queue(UpdatePriority.CRITICAL, max_concurrent=5)
-        )
-        self.workers[UpdatePriority.HIGH] = asyncio.create_task(
-            self._process_priority_queue(UpdatePriority.HIGH, max_concurrent=3)
-        )
-        self.workers[UpdatePriority.MEDIUM] = asyncio.create_task(
-            self._process_priority_queue(UpdatePriority.MEDIUM, max_concurrent=2)
-        )
-        self.workers[UpdatePriority.LOW] = asyncio.create_task(
-            self._process_priority_queue(UpdatePriority.LOW, max_concurrent=1)
-        )
+        self._retry_wakeup = asyncio.Event()
+        for priority, worker_count in self.WORKER_COUNTS.items():
+            for _ in range(worker_count):
+                self.workers.append(asyncio.create_task(self._process_priority_queue(priority)))
+        self.workers.append(asyncio.create_task(self._process_retries()))
     
     async def stop(self):
         """Stop the reactive task scheduler."""
@@ -143,74 +180,157 @@ class ReactiveTaskScheduler:
         logger.info("🛑 Stopping reactive task scheduler")
         
         # Cancel all workers
-        for worker in self.workers.values():
+        for worker in self.workers:
             worker.cancel()
         
-        # Cancel pending tasks
-        for task in self.pending_tasks.values():
-            task.cancel()
-        
-        self.pending_tasks.clear()
+        self.workers.clear()
+        self.pending_events.clear()
+        self.queued_priority.clear()
+        self.retry_heap.clear()
     
-    async def schedule_event(self, event: MarketEvent, handler: Callable):
-        """Schedule a market event for processing."""
-        await self.task_queues[event.priority].put((event, handler))
+    @staticmethod
+    def _coalesce_key(event: MarketEvent) -> tuple:
+        return (event.item_id, event.event_type)
+    
+    async def _enqueue(self, key: tuple, priority: UpdatePriority) -> bool:
+        """Put a key on a priority queue; False if it was full and the priority doesn't block."""
+        queue = self.task_queues[priority]
+        if queue.full():
+            if priority not in self.BLOCKING_PRIORITIES:
+                return False
+            self.stats['backpressure_waits'] += 1
+            await queue.put(key)
+        else:
+            queue.put_nowait(key)
+        return True
+    
+    def _more_urgent(self, priority: UpdatePriority, other: Optional[UpdatePriority]) -> bool:
+        return other is None or self.PRIORITY_RANK[priority] < self.PRIORITY_RANK[other]
+    
+    async def schedule_event(self, event: MarketEvent, handler: Callable) -> bool:
+        """
+        Schedule a market event for processing.
+        
+        Returns:
+            False if the event was dropped because its queue is full
+        """
+        key = self._coalesce_key(event)
+        if key in self.pending_events:
+            # Already queued; only the latest event for the key will run
+            self.pending_events[key] = (event, handler)
+            self.stats['coalesced'] += 1
+            
+            # A more urgent event must not wait in the slower queue: queue the
+            # key there too; whichever copy is dequeued first runs the event
+            # and the other is skipped as a duplicate
+            if self._more_urgent(event.priority, self.queued_priority.get(key)):
+                if await self._enqueue(key, event.priority) and key in self.pending_events:
+                    self.queued_priority[key] = event.priority
+                    self.stats['escalated'] += 1
+            return True
+        
+        if not await self._enqueue(key, event.priority):
+            self.stats['dropped'] += 1
+            return False
+        
+        if key in self.pending_events:
+            # Another producer queued the same key while we waited; our key is a no-op
+            self.stats['coalesced'] += 1
+        
+        self.pending_events[key] = (event, handler)
+        if self._more_urgent(event.priority, self.queued_priority.get(key)):
+            self.queued_priority[key] = event.priority
+        self.stats['scheduled'] += 1
+        return True
     
-    async def _process_priority_queue(self, priority: UpdatePriority, max_concurrent: int):
-        """Process events from a priority queue."""
-        semaphore = asyncio.Semaphore(max_concurrent)
+    async def _process_priority_queue(self, priority: UpdatePriority):
+        """Worker loop: run the latest pending event for each queued key."""
+        queue = self.task_queues[priority]
         
         while self.running:
             try:
-                # Get next event from queue
-                event, handler = await self.task_queues[priority].get()
+                key = await queue.get()
+                pending = self.pending_events.pop(key, None)
+                if pending is None:
+                    continue  # Duplicate key already handled by another worker
+                self.queued_priority.pop(key, None)
                 
-                # Process with concurrency limit
-                async def process_with_semaphore():
-                    async with semaphore:
-                        try:
-                            await handler(event)
-                            event.processed = True
-                            logger.debug(f"Processed {event.event_type.value} event for item {event.item_id}")
-                        except Exception as e:
-                            event.retry_count += 1
-                            if event.retry_count < event.max_retries:
-                                # Retry with exponential backoff
-                                await asyncio.sleep(2 ** event.retry_count)
-                                await self.task_queues[priority].put((event, handler))
-                            else:
-                                logger.error(f"Failed to process event {event.event_id} after {event.max_retries} retries: {e}")
+                event, handler = pending
+                self.in_flight += 1
+                try:
+                    await handler(event)
+                    event.processed = True
+                    self.stats['processed'] += 1
+                    logger.debug(f"Processed {event.event_type.value} event for item {event.item_id}")
+                except Exception as e:
+                    self._schedule_retry(event, handler, e)
+                finally:
+                    self.in_flight -= 1
                 
-                # Start processing task
-                task = asyncio.create_task(process_with_semaphore())
-                self.pending_tasks[event.event_id] = task
-                
-                # Clean up completed tasks
-                def cleanup_task(task_future):
-                    self.pending_tasks.pop(event.event_id, None)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in {priority.value} priority queue: {e}")
+                await asyncio.sleep(1)
+    
+    def _schedule_retry(self, event: MarketEvent, handler: Callable, error: Exception):
+        event.retry_count += 1
+        if event.retry_count >= event.max_retries:
+            self.stats['failed'] += 1
+            logger.error(f"Failed to process event {event.event_id} after {event.max_retries} retries: {error}")
+            return
+        
+        # Exponential backoff without holding a worker
+        self._retry_sequence += 1
+        due = time.monotonic() + 2 ** event.retry_count
+        heapq.heappush(self.retry_heap, (due, self._retry_sequence, event, handler))
+        self.stats['retries'] += 1
+        self._retry_wakeup.set()
+    
+    async def _process_retries(self):
+        """Re-schedule failed events once their backoff has elapsed."""
+        while self.running:
+            try:
+                now = time.monotonic()
+                while self.retry_heap and self.retry_heap[0][0] <= now:
+                    _, _, event, handler = heapq.heappop(self.retry_heap)
+                    if self._coalesce_key(event) in self.pending_events:
+                        self.stats['coalesced'] += 1  # Superseded by a newer event
+                        continue
+                    await self.schedule_event(event, handler)
                 
-                task.add_done_callback(cleanup_task)
+                self._retry_wakeup.clear()
+                timeout = self.retry_heap[0][0] - time.monotonic() if self.retry_heap else None
+                try:
+                    await asyncio.wait_for(self._retry_wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in {priority.value} priority queue: {e}")
+                logger.error(f"Error in retry scheduler: {e}")
                 await asyncio.sleep(1)
     
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth and backpressure metrics."""
+        return {
+            'queue_depth': {priority.value: queue.qsize() for priority, queue in self.task_queues.items()},
+            'queue_capacity': self.max_queue_size,
+            'pending_events': len(self.pending_events),
+            'in_flight': self.in_flight,
+            'retry_backlog': len(self.retry_heap),
+            **{name: self.stats[name] for name in (
+                'scheduled', 'coalesced', 'dropped', 'backpressure_waits', 'processed', 'retries', 'failed'
+            )},
+        }
+    
     async def process_scheduled_tasks(self):
         """Process scheduled tasks - placeholder for monitoring cycle integration."""
         # This is called by the monitoring cycle
         # For now, just check if scheduler is running
         if not self.running:
             await self.start()
-        
-        # Clean up completed tasks
-        completed_tasks = [
-            event_id for event_id, task in self.pending_tasks.items() 
-            if task.done()
-        ]
-        for event_id in completed_tasks:
-            self.pending_tasks.pop(event_id, None)
 
 
 class ReactiveTradingEngine:
@@ -258,6 +378,9 @@ class ReactiveTradingEngine:
         
         # WebSocket management
         self.channel_layer = get_channel_layer()
+        self.broadcaster = BroadcastBatcher(
+            self.channel_layer, flush_interval=self.config.get('broadcast_flush_interval', 0.5)
+        )
         self.active_subscriptions: Dict[str, WebSocketSubscription] = {}
         self.subscription_groups: Dict[TradingView, Set[str]] = defaultdict(set)
         
@@ -282,10 +405,18 @@ class ReactiveTradingEngine:
         # Cache keys
         self.cache_keys = {
             'item_priorities': 'reactive:item_priorities',
-            'last_prices': 'reactive:last_prices',
             'active_alerts': 'reactive:active_alerts',
         }
         
+        # Price tick consumption. Consumers in one group split the stream between
+        # them, and last prices are kept in process, so only one engine may run
+        # (the start_reactive_engine process); web workers only subscribe.
+        self.tick_consumer = PriceTickConsumer(group='reactive_trading_engine')
+        # Last known price per (item, source, interval): feeds price differently
+        # (guide price vs. latest mid vs. 5m / 1h averages), so a tick is only
+        # compared against earlier ticks from the same feed
+        self.last_prices: Dict[Tuple[int, str, str], float] = {}
+        
         # System state
         self.running = False
         self.background_tasks: List[asyncio.Task] = []
@@ -324,11 +455,13 @@ class ReactiveTradingEngine:
         # Start background monitoring tasks
         self.background_tasks = [
             asyncio.create_task(self._monitor_price_changes()),
+            asyncio.create_task(self._consume_price_ticks()),
             asyncio.create_task(self._monitor_volume_changes()),
             asyncio.create_task(self._monitor_pattern_signals()),
             asyncio.create_task(self._update_recommendations()),
             asyncio.create_task(self._cleanup_old_data()),
         ]
+        self.broadcaster.start()
         
         logger.info("✅ Reactive Trading Engine started with background monitoring")
     
@@ -346,6 +479,8 @@ class ReactiveTradingEngine:
         
         # Stop task scheduler
         await self.task_scheduler.stop()
+        await self.tick_consumer.close()
+        await self.broadcaster.stop()
         
         # Clean up services
         if self.ingestion_service:
@@ -413,16 +548,14 @@ class ReactiveTradingEngine:
                 active_items = await self._get_active_items()
                 
                 if active_items:
-                    # Ingest latest price data
+                    # Ingest latest price data; the new snapshots are published as
+                    # price ticks and picked up by _consume_price_ticks
                     results = await self.ingestion_service.ingest_complete_market_data(
                         item_ids=active_items[:50],  # Limit to avoid overload
                         include_historical=True,
                         historical_periods_5m=2,  # Just last 2 periods for comparison
                         historical_periods_1h=1
                     )
-                    
-                    # Analyze price changes
-                    await self._analyze_price_changes(active_items)
                 
                 # Wait based on system load and priority
                 await asyncio.sleep(self.update_intervals['active_items'])
@@ -433,6 +566,27 @@ class ReactiveTradingEngine:
                 logger.error(f"Price monitoring error: {e}")
                 await asyncio.sleep(60)  # Wait longer on error
     
+    async def _consume_price_ticks(self):
+        """Consume price ticks from the stream and react to significant changes."""
+        logger.info("📡 Starting price tick consumer")
+        
+        while self.running:
+            try:
+                entries = await self.tick_consumer.read(count=500, block_ms=5000)
+                if not entries:
+                    continue
+                
+                ticks = [tick for _, tick in entries]
+                await self._analyze_price_changes(ticks)
+                self._broadcast_price_ticks(ticks)
+                await self.tick_consumer.ack([entry_id for entry_id, _ in entries])
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Price tick consumer error: {e}")
+                await asyncio.sleep(5)
+    
     async def _monitor_volume_changes(self):
         """Monitor volume changes for surge detection."""
         logger.info("📊 Starting volume change monitoring")
@@ -567,65 +721,77 @@ class ReactiveTradingEngine:
                 logger.error(f"Cleanup error: {e}")
                 await asyncio.sleep(1800)
     
-    async def _analyze_price_changes(self, item_ids: List[int]):
-        """Analyze price changes and generate events."""
-        last_prices = cache.get(self.cache_keys['last_prices'], {})
-        
-        # Get current prices
-        def get_current_prices():
-            current_prices = {}
-            snapshots = PriceSnapshot.objects.filter(
-                item__item_id__in=item_ids,
-                created_at__gte=timezone.now() - timedelta(minutes=30)
-            ).select_related('item')
-            
-            for snapshot in snapshots:
-                if snapshot.volume_weighted_price:
-                    current_prices[snapshot.item.item_id] = {
-                        'price': snapshot.volume_weighted_price,
-                        'volume': snapshot.total_volume or 0,
-                        'timestamp': snapshot.created_at
-                    }
-            
-            return current_prices
+    def _detect_price_changes(self, ticks: List[Dict]) -> List[Dict]:
+        """
+        Compare a batch of ticks against the last known prices.
         
-        current_prices = await asyncio.to_thread(get_current_prices)
+        Ticks are compared per (item, source, interval) feed and only the
+        latest tick per feed counts. Change percentages and priority levels
+        are computed for the whole batch at once; feeds seen for the first
+        time only seed their last known price. When several feeds of an item
+        moved, the largest change is reported.
         
-        # Compare with last known prices
-        for item_id, current_data in current_prices.items():
-            if item_id in last_prices:
-                last_price = last_prices[item_id]['price']
-                current_price = current_data['price']
-                
-                if last_price > 0:
-                    price_change_pct = abs(current_price - last_price) / last_price
-                    
-                    # Determine priority based on price change magnitude
-                    priority = UpdatePriority.LOW
-                    for threshold_priority, threshold in self.price_change_thresholds.items():
-                        if price_change_pct >= threshold:
-                            priority = threshold_priority
-                            break
-                    
-                    # Generate event if significant change
-                    if price_change_pct >= self.price_change_thresholds[UpdatePriority.LOW]:
-                        event = MarketEvent(
-                            event_id=f"price_change_{item_id}_{int(timezone.now().timestamp())}",
-                            event_type=EventType.PRICE_CHANGE,
-                            item_id=item_id,
-                            priority=priority,
-                            data={
-                                'old_price': last_price,
-                                'new_price': current_price,
-                                'change_pct': price_change_pct,
-                                'volume': current_data['volume']
-                            }
-                        )
-                        
-                        await self.task_scheduler.schedule_event(event, self._handle_price_change)
+        Returns:
+            List of change dicts (item_id, old_price, new_price, change_pct, volume, priority)
+        """
+        latest = {
+            (tick['item_id'], tick.get('source', ''), tick.get('interval', '')): tick
+            for tick in ticks if tick['price'] > 0
+        }
+        if not latest:
+            return []
+        
+        count = len(latest)
+        keys = list(latest)
+        new_prices = np.fromiter((tick['price'] for tick in latest.values()), dtype=np.float64, count=count)
+        old_prices = np.fromiter((self.last_prices.get(key, 0.0) for key in keys),
+                                 dtype=np.float64, count=count)
+        self.last_prices.update(zip(keys, new_prices.tolist()))
+        
+        known = old_prices > 0
+        change_pct = np.zeros(count)
+        np.divide(np.abs(new_prices - old_prices), old_prices, out=change_pct, where=known)
         
-        # Update cache with current prices
-        cache.set(self.cache_keys['last_prices'], current_prices, timeout=3600)
+        # Index of the highest threshold reached (-1 = below the LOW threshold)
+        levels = sorted(self.price_change_thresholds.items(), key=lambda level: level[1])
+        bounds = np.array([threshold for _, threshold in levels])
+        level_index = np.searchsorted(bounds, change_pct, side='right') - 1
+        
+        changes: Dict[int, Dict] = {}
+        for row in np.flatnonzero(known & (level_index >= 0)).tolist():
+            key = keys[row]
+            item_id = key[0]
+            if item_id in changes and changes[item_id]['change_pct'] >= change_pct[row]:
+                continue
+            changes[item_id] = {
+                'item_id': item_id,
+                'old_price': int(round(old_prices[row])),
+                'new_price': int(round(new_prices[row])),
+                'change_pct': float(change_pct[row]),
+                'volume': latest[key]['volume'],
+                'priority': levels[level_index[row]][0],
+            }
+        return list(changes.values())
+    
+    async def _analyze_price_changes(self, ticks: List[Dict]):
+        """Analyze a batch of price ticks and generate events."""
+        timestamp = int(timezone.now().timestamp())
+        
+        for change in self._detect_price_changes(ticks):
+            event = MarketEvent(
+                event_id=f"price_change_{change['item_id']}_{timestamp}",
+                event_type=EventType.PRICE_CHANGE,
+                item_id=change['item_id'],
+                priority=change['priority'],
+                data={
+                    'old_price': change['old_price'],
+                    'new_price': change['new_price'],
+                    'change_pct': change['change_pct'],
+                    'volume': change['volume']
+                }
+            )
+            
+            await self.task_scheduler.schedule_event(event, self._handle_price_change)
     
     async def _handle_price_change(self, event: MarketEvent):
         """Handle a price change event."""
@@ -739,46 +905,58 @@ class ReactiveTradingEngine:
             logger.error(f"Failed to handle pattern check: {e}")
     
     async def _broadcast_update_to_subscribers(self, update: RecommendationUpdate):
-        """Broadcast update to relevant WebSocket subscribers."""
-        if not self.channel_layer:
-            return
-        
-        # Determine which subscribers should receive this update
-        relevant_channels = set()
+        """
+        Queue an update for the item's group and the broad trading group.
         
-        # Add subscribers watching this specific item
-        for channel_name, subscription in self.active_subscriptions.items():
-            if (not subscription.item_filters or 
-                update.item_id in subscription.item_filters):
-                relevant_channels.add(channel_name)
+        Sockets subscribed to specific items sit in per-item groups, everyone
+        else in the broad group, so no per-socket filtering is needed. The
+        frame is serialized once and sent with the next batch flush.
+        """
+        message = {
+            'type': 'market_event',
+            'event_type': update.update_type,
+            'item_id': update.item_id,
+            'data': {
+                'item_name': update.item_name,
+                'message': update.message,
+                'confidence': update.confidence,
+                'priority': update.priority.value,
+                'data': update.data
+            },
+            'timestamp': update.timestamp.isoformat()
+        }
         
-        if relevant_channels:
-            message = {
-                'type': 'recommendation.update',
-                'data': {
-                    'item_id': update.item_id,
-                    'item_name': update.item_name,
-                    'update_type': update.update_type,
-                    'message': update.message,
-                    'confidence': update.confidence,
-                    'priority': update.priority.value,
-                    'timestamp': update.timestamp.isoformat(),
-                    'data': update.data
-                }
+        key = ('event', update.item_id, update.update_type)
+        self.broadcaster.add(item_group(update.item_id), key, message)
+        self.broadcaster.add(TRADING_ALL_GROUP, key, message)
+    
+    def _broadcast_price_ticks(self, ticks: List[Dict]):
+        """Queue the latest tick per item for that item's trading and chart groups."""
+        for tick in ticks:
+            item_id = tick['item_id']
+            timestamp = datetime.fromtimestamp(tick['ts'], tz=dt_timezone.utc).isoformat() if tick['ts'] else None
+            prices = {
+                'item_id': item_id,
+                'high_price': tick['high'],
+                'low_price': tick['low'],
+                'high_volume': tick['high_volume'],
+                'low_volume': tick['low_volume'],
+                'timestamp': timestamp
             }
-            
-            # Send to all relevant channels
-            tasks = []
-            for channel_name in relevant_channels:
-                task = asyncio.create_task(
-                    self._send_to_channel(channel_name, message)
-                )
-                tasks.append(task)
-            
-            # Wait for all sends to complete
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
-                logger.debug(f"Broadcasted {update.update_type} update to {len(tasks)} subscribers")
+            self.broadcaster.add(item_group(item_id), ('price', item_id), {'type': 'price_update', **prices})
+            self.broadcaster.add(chart_group(item_id), ('price', item_id), {'type': 'chart_price_update', **prices})
+    
+    async def _broadcast_recommendation_updates(self, trading_view: TradingView, recommendations: List[Dict]):
+        """Queue refreshed recommendations for the route groups of a trading view."""
+        route_types = [route for route, view in ROUTE_VIEW_MAP.items() if view == trading_view] or [trading_view.value]
+        for route_type in route_types:
+            self.broadcaster.add(route_group(route_type), ('recommendations', route_type), {
+                'type': 'recommendation_update',
+                'route_type': route_type,
+                'update_type': 'refresh',
+                'recommendations': recommendations,
+                'timestamp': timezone.now().isoformat()
+            })
     
     async def _send_to_channel(self, channel_name: str, message: dict):
         """Send message to specific WebSocket channel."""
@@ -979,7 +1157,6 @@ class ReactiveTradingEngine:
     async def _cleanup_stale_cache(self):
         """Clean up stale cache entries."""
         # This would implement cache cleanup logic
-        # For now, just clear old last_prices entries
         pass
     
     async def run_monitoring_cycle(self):
@@ -1013,6 +1190,8 @@ class ReactiveTradingEngine:
                 'last_pattern_analysis': timezone.now().isoformat(),
             }
             
+            status['scheduler'] = self.task_scheduler.get_metrics()
+            
             # Add subscription details
             status['subscription_groups'] = {
                 view.value: len(channels) 
@@ -1077,26 +1256,15 @@ class ReactiveTradingEngine:
     async def subscribe_to_route_updates(self, route_type: str, channel_name: str):
         """Subscribe to updates for a trading route."""
         try:
-            # Map route types to trading views
-            # NOTE: These enum values MUST match the TradingView enum in ollama_ai_service.py
-            # Any mismatch will cause infinite WebSocket subscription loops!
-            route_view_map = {
-                'high_alch': TradingView.HIGH_ALCHEMY,  # Fixed: was HIGH_ALCH, now HIGH_ALCHEMY
-                'flipping': TradingView.FLIPPING,
-                'decanting': TradingView.DECANTING,
-                'crafting': TradingView.CRAFTING,
-                'general': TradingView.GENERAL
-            }
-            
             # Check if channel is already subscribed to prevent infinite loops
             if channel_name in self.active_subscriptions:
                 existing_subscription = self.active_subscriptions[channel_name]
                 # Update the existing subscription to the new trading view
-                existing_subscription.trading_view = route_view_map.get(route_type, TradingView.GENERAL)
+                existing_subscription.trading_view = ROUTE_VIEW_MAP.get(route_type, TradingView.GENERAL)
                 logger.debug(f"⚠️ Channel {channel_name} already subscribed, updating to {route_type} route")
                 return
             
-            trading_view = route_view_map.get(route_type, TradingView.GENERAL)
+            trading_view = ROUTE_VIEW_MAP.get(route_type, TradingView.GENERAL)
             
             subscription = WebSocketSubscription(
                 channel_name=channel_name,
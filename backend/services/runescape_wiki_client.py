@@ -13,11 +13,13 @@ import logging
 import numpy as np
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple, Union
-import httpx
 from django.conf import settings
 from django.utils import timezone as django_timezone
 from dataclasses import dataclass
 
+from services.async_runtime import run_sync
+from services.http_transport import HttpTransportError, http_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -203,33 +205,13 @@ class RuneScapeWikiAPIClient:
         self._item_metadata_cache = {}
     
     async def __aenter__(self):
-        """Async context manager entry."""
-        self.client = httpx.AsyncClient(
-            headers={
-                "User-Agent": self.user_agent,
-                "Accept": "application/json"
-            },
-            timeout=httpx.Timeout(30.0, connect=10.0, read=20.0, write=10.0),
-            limits=httpx.Limits(
-                max_keepalive_connections=5,
-                max_connections=10,
-                keepalive_expiry=60.0
-            ),
-            follow_redirects=True
-        )
+        """Async context manager entry (requests go through the shared pooled transport)."""
+        self.client = http_transport
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.client:
-            try:
-                await asyncio.wait_for(self.client.aclose(), timeout=5.0)
-            except asyncio.TimeoutError:
-                logger.warning("RuneScape Wiki client close timed out")
-            except Exception as e:
-                logger.warning(f"Error closing RuneScape Wiki client: {e}")
-            finally:
-                self.client = None
+        """Async context manager exit; the shared transport stays attached for concurrent callers."""
+        pass
     
     async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """
@@ -249,21 +231,10 @@ class RuneScapeWikiAPIClient:
         
         try:
             logger.debug(f"Making Wiki API request to: {url} with params: {params}")
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            logger.debug(f"Wiki API response: {len(str(data))} characters")
-            
-            return data
+            return await self.client.get_json(url, params=params)
             
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code} for {url}: {e.response.text}")
-            raise RuneScapeWikiAPIError(f"HTTP {e.response.status_code}: {e.response.text}")
-            
-        except httpx.RequestError as e:
-            logger.error(f"Request error for {url}: {str(e)}")
-            raise RuneScapeWikiAPIError(f"Request failed: {str(e)}")
+        except HttpTransportError as e:
+            raise RuneScapeWikiAPIError(str(e))
             
         except Exception as e:
             logger.error(f"Unexpected error for {url}: {str(e)}")
@@ -808,18 +779,8 @@ class SyncRuneScapeWikiAPIClient:
         self.async_client = RuneScapeWikiAPIClient()
     
     def _run_async(self, coro):
-        """Run async coroutine in sync context."""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, coro)
-                    return future.result()
-            else:
-                return loop.run_until_complete(coro)
-        except RuntimeError:
-            return asyncio.run(coro)
+        """Run async coroutine on the shared background event loop."""
+        return run_sync(coro)
     
     def get_latest_prices(self, item_id: Optional[int] = None) -> Dict[int, WikiPriceData]:
         """Sync version of get_latest_prices."""
@@ -0,0 +1,221 @@
+"""
+Vectorized Hybrid Ranking for Item Search
+
+Ranks search candidates in one pass over NumPy arrays instead of per-item
+Python loops over ORM instances:
+- Candidate features come from a single values() query (item + profit_calc
+  columns), so no row ever lazily loads profit_calc
+- Name-based strategy eligibility (potion, set piece) is computed once per
+  item per process and cached as bit flags; bond eligibility is a price mask
+- Strategy bonuses and weighted scores are array expressions over a weight
+  profile selected by query intent (overridable via SEARCH_RANKING_WEIGHT_PROFILES)
+- Top-k selection uses argpartition, sorting only the k winners
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+from django.conf import settings
+
+from services.weird_gloop_client import GrandExchangeTax
+
+logger = logging.getLogger(__name__)
+
+
+ITEM_FIELDS = ('item_id', 'name', 'examine', 'high_alch', 'members', 'limit')
+
+PROFIT_FIELDS = (
+    'current_profit', 'current_profit_margin', 'current_buy_price', 'current_sell_price',
+    'recommendation_score', 'high_alch_viability_score', 'alch_efficiency_rating',
+    'sustainable_alch_potential', 'magic_xp_efficiency', 'volume_category', 'daily_volume',
+)
+
+# Columns read for every candidate, in one query
+RANKING_VALUES = ITEM_FIELDS + tuple(f'profit_calc__{field}' for field in PROFIT_FIELDS) + ('profit_calc__id',)
+
+# Weight profiles per query intent; each term multiplies a 0-1 feature
+WEIGHT_PROFILES: Dict[str, Dict[str, float]] = {
+    'alchemy': {'semantic': 0.20, 'profit_margin': 0.20, 'alch_viability': 0.35, 'alch_efficiency': 0.25},
+    'decanting': {'semantic': 0.20, 'profit_margin': 0.30, 'alch_viability': 0.15, 'alch_efficiency': 0.15,
+                  'decanting': 0.20},
+    'set_combining': {'semantic': 0.20, 'profit_margin': 0.25, 'alch_viability': 0.10, 'alch_efficiency': 0.15,
+                      'set_combining': 0.30},
+    'bond_flipping': {'semantic': 0.20, 'profit_margin': 0.35, 'alch_viability': 0.10, 'alch_efficiency': 0.05,
+                      'bond_flipping': 0.30},
+    'money_maker': {'semantic': 0.15, 'profit_margin': 0.30, 'alch_viability': 0.20, 'alch_efficiency': 0.15,
+                    'decanting': 0.10, 'set_combining': 0.05, 'bond_flipping': 0.05},
+    'default': {'semantic': 0.25, 'profit_margin': 0.30, 'alch_viability': 0.25, 'alch_efficiency': 0.20},
+    # Alchemy candidate lists (already ordered by viability)
+    'alchemy_focus': {'semantic': 0.30, 'alch_viability': 0.35, 'alch_efficiency': 0.20, 'sustainability': 0.15},
+}
+
+# Raw bonus a candidate gets when its strategy matches the query context
+STRATEGY_BONUS = 0.3
+STRATEGIES = ('decanting', 'set_combining', 'bond_flipping')
+
+FLAG_POTION = 1
+FLAG_SET_PIECE = 2
+
+POTION_KEYWORDS = ('potion', 'dose')
+SET_PIECE_KEYWORDS = (
+    'helm', 'body', 'legs', 'chestplate', 'tassets', 'set', 'dharok', 'ahrim',
+    'karil', 'torag', 'verac', 'guthan', 'armadyl', 'bandos', 'godsword', 'void',
+)
+BOND_MIN_PRICE = 1_000_000
+
+# Alchemy casts cost a nature rune
+NATURE_RUNE_COST = 180
+
+
+@dataclass
+class CandidateFeatures:
+    """Candidate rows plus aligned feature arrays."""
+    rows: List[Dict]
+    item_ids: np.ndarray
+    semantic: np.ndarray
+    profit_margin: np.ndarray
+    alch_viability: np.ndarray
+    alch_efficiency: np.ndarray
+    sustainability: np.ndarray
+    buy_price: np.ndarray
+    sell_price: np.ndarray
+    flags: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+def _column(rows: List[Dict], field: str, dtype=np.float64) -> np.ndarray:
+    return np.fromiter(((row[field] or 0) for row in rows), dtype=dtype, count=len(rows))
+
+
+class HybridRanker:
+    """
+    Scores candidate items for a query intent with array math.
+    """
+
+    def __init__(self, profiles: Optional[Mapping[str, Mapping[str, float]]] = None):
+        self.profiles = {name: dict(weights) for name, weights in WEIGHT_PROFILES.items()}
+        overrides = profiles if profiles is not None else getattr(settings, 'SEARCH_RANKING_WEIGHT_PROFILES', {})
+        for name, weights in (overrides or {}).items():
+            self.profiles.setdefault(name, {}).update(weights)
+
+        # item_id -> name-derived strategy flags (names don't change at runtime)
+        self._name_flags: Dict[int, int] = {}
+        self._flags_lock = threading.Lock()
+
+    @staticmethod
+    def _compute_name_flags(name: str) -> int:
+        name_lower = (name or '').lower()
+        flags = 0
+        if any(keyword in name_lower for keyword in POTION_KEYWORDS):
+            flags |= FLAG_POTION
+        if any(keyword in name_lower for keyword in SET_PIECE_KEYWORDS):
+            flags |= FLAG_SET_PIECE
+        return flags
+
+    def _flags_for(self, rows: List[Dict]) -> np.ndarray:
+        missing = [row for row in rows if row['item_id'] not in self._name_flags]
+        if missing:
+            computed = {row['item_id']: self._compute_name_flags(row['name']) for row in missing}
+            with self._flags_lock:
+                self._name_flags.update(computed)
+        return np.fromiter((self._name_flags[row['item_id']] for row in rows), dtype=np.int8, count=len(rows))
+
+    def load_candidates(self, queryset, semantic_scores: Mapping[int, float]) -> CandidateFeatures:
+        """
+        Read candidate features with one values() query.
+
+        Args:
+            queryset: Item queryset (already filtered / sliced to the candidates)
+            semantic_scores: item_id -> semantic similarity (missing = 0)
+
+        Returns:
+            CandidateFeatures for rows that have a profit calculation
+        """
+        rows = [row for row in queryset.values(*RANKING_VALUES) if row['profit_calc__id'] is not None]
+
+        margin = _column(rows, 'profit_calc__current_profit_margin')
+        return CandidateFeatures(
+            rows=rows,
+            item_ids=_column(rows, 'item_id', np.int64),
+            semantic=np.fromiter(
+                (semantic_scores.get(row['item_id'], 0.0) for row in rows), dtype=np.float64, count=len(rows)
+            ),
+            profit_margin=np.clip(margin / 100.0, 0.0, 1.0),
+            alch_viability=_column(rows, 'profit_calc__high_alch_viability_score') / 100.0,
+            alch_efficiency=_column(rows, 'profit_calc__alch_efficiency_rating') / 100.0,
+            sustainability=_column(rows, 'profit_calc__sustainable_alch_potential') / 100.0,
+            buy_price=_column(rows, 'profit_calc__current_buy_price', np.int64),
+            sell_price=_column(rows, 'profit_calc__current_sell_price', np.int64),
+            flags=self._flags_for(rows),
+        )
+
+    def strategy_bonuses(self, features: CandidateFeatures, contexts: Mapping[str, bool]) -> Dict[str, np.ndarray]:
+        """
+        Per-candidate strategy bonuses; a bonus only applies when its strategy is in the query context.
+
+        Args:
+            features: Candidate features
+            contexts: Strategy name -> whether the query is about it
+
+        Returns:
+            Strategy name -> bonus array (STRATEGY_BONUS or 0)
+        """
+        eligible = {
+            'decanting': (features.flags & FLAG_POTION) != 0,
+            'set_combining': (features.flags & FLAG_SET_PIECE) != 0,
+            'bond_flipping': features.buy_price >= BOND_MIN_PRICE,
+        }
+        return {
+            strategy: np.where(mask, STRATEGY_BONUS, 0.0) if contexts.get(strategy) else np.zeros(len(features))
+            for strategy, mask in eligible.items()
+        }
+
+    def score(self, features: CandidateFeatures, profile: str, bonuses: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Weighted hybrid score of every candidate under a weight profile."""
+        weights = self.profiles.get(profile) or self.profiles['default']
+        terms = {
+            'semantic': features.semantic,
+            'profit_margin': features.profit_margin,
+            'alch_viability': features.alch_viability,
+            'alch_efficiency': features.alch_efficiency,
+            'sustainability': features.sustainability,
+            **bonuses,
+        }
+        scores = np.zeros(len(features))
+        for term, weight in weights.items():
+            if weight and term in terms:
+                scores += weight * terms[term]
+        return scores
+
+    @staticmethod
+    def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first."""
+        if k <= 0 or len(scores) == 0:
+            return np.empty(0, dtype=np.int64)
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+    def net_profit_after_tax(self, features: CandidateFeatures) -> Dict[str, np.ndarray]:
+        """GE tax and after-tax profit (tax only applies when both prices are known)."""
+        priced = (features.buy_price > 0) & (features.sell_price > 0)
+        ge_tax = np.where(priced, GrandExchangeTax.calculate_tax_array(features.sell_price, features.item_ids), 0)
+        current_profit = _column(features.rows, 'profit_calc__current_profit', np.int64)
+        net_profit = np.where(priced, features.sell_price - ge_tax - features.buy_price, current_profit)
+        return {'ge_tax': ge_tax, 'net_profit_after_tax': net_profit}
+
+
+def profit_calc_fields(row: Dict) -> Dict:
+    """Profit calculation columns of a candidate row, without the lookup prefix."""
+    return {field: row[f'profit_calc__{field}'] for field in PROFIT_FIELDS}
+
+
+# Global ranker instance
+hybrid_ranker = HybridRanker()
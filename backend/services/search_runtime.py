@@ -0,0 +1,143 @@
+"""
+Process-wide Search Runtime
+
+One warm HybridSearchService per process, shared by the items API views, the
+merchant AI agent and the context-aware chat service, instead of each request
+building its own (which re-read the FAISS index and metadata from disk and
+created fresh embedding/AI clients every time).
+
+The on-disk index generation (the metadata file, which save_index writes last)
+is checked at most every SEARCH_RUNTIME_RELOAD_INTERVAL seconds. When another
+process has saved or rebuilt the index, the request that notices loads a new
+FaissVectorDatabase and swaps it in; searches already running keep the
+instance they started with, and other threads keep searching the old one
+until the swap.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+from services.faiss_manager import FaissVectorDatabase
+from services.search_service import HybridSearchService
+
+logger = logging.getLogger(__name__)
+
+
+SEARCH_INDEX_NAME = "osrs_items"
+
+
+class SearchRuntime:
+    """
+    Lazily built, hot-reloading holder for the shared search service.
+    """
+
+    def __init__(self, index_name: str = SEARCH_INDEX_NAME, reload_interval: Optional[float] = None):
+        self.index_name = index_name
+        self.reload_interval = (
+            reload_interval if reload_interval is not None
+            else getattr(settings, 'SEARCH_RUNTIME_RELOAD_INTERVAL', 5.0)
+        )
+        self._service: Optional[HybridSearchService] = None
+        self._generation: Optional[Tuple[int, int]] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self.stats = {'builds': 0, 'reloads': 0, 'reload_failures': 0}
+
+    def _index_generation(self, faiss_db: FaissVectorDatabase) -> Optional[Tuple[int, int]]:
+        """Identify the on-disk index version by its metadata file (replaced atomically on save)."""
+        try:
+            stat = os.stat(faiss_db.metadata_file)
+            return stat.st_mtime_ns, stat.st_ino
+        except FileNotFoundError:
+            return None
+
+    def _load_faiss_db(self) -> Tuple[FaissVectorDatabase, Optional[Tuple[int, int]]]:
+        faiss_db = FaissVectorDatabase(index_name=self.index_name)
+        generation = self._index_generation(faiss_db)
+        faiss_db.load()
+        return faiss_db, generation
+
+    def get_search_service(self) -> HybridSearchService:
+        """
+        Get the shared search service, reloading the index if it changed on disk.
+
+        Returns:
+            The process-wide HybridSearchService
+        """
+        service = self._service
+        if service is None or self._pid != os.getpid():
+            return self._build()
+
+        if time.monotonic() - self._last_check >= self.reload_interval:
+            self._reload_if_changed()
+        return self._service
+
+    def get_faiss_db(self) -> FaissVectorDatabase:
+        """Get the current shared FAISS index."""
+        return self.get_search_service().faiss_db
+
+    def _build(self) -> HybridSearchService:
+        with self._lock:
+            if self._service is None or self._pid != os.getpid():
+                started = time.perf_counter()
+                faiss_db, generation = self._load_faiss_db()
+                self._service = HybridSearchService(faiss_db=faiss_db)
+                self._generation = generation
+                self._last_check = time.monotonic()
+                self._pid = os.getpid()
+                self.stats['builds'] += 1
+                logger.info(
+                    f"Search runtime ready in {time.perf_counter() - started:.2f}s "
+                    f"({faiss_db.get_stats()['total_vectors']} vectors)"
+                )
+            return self._service
+
+    def _reload_if_changed(self):
+        # Only one thread checks/reloads; the rest keep using the current index
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._last_check = time.monotonic()
+            service = self._service
+            generation = self._index_generation(service.faiss_db)
+            if generation is None or generation == self._generation:
+                return
+
+            faiss_db, generation = self._load_faiss_db()
+            service.faiss_db = faiss_db
+            self._generation = generation
+            self.stats['reloads'] += 1
+            logger.info(f"Reloaded FAISS index {self.index_name} after on-disk change")
+        except Exception as e:
+            self.stats['reload_failures'] += 1
+            logger.error(f"Failed to reload FAISS index {self.index_name}: {e}")
+        finally:
+            self._lock.release()
+
+    def reload(self):
+        """Force a reload on the next access (e.g. right after this process rebuilt the index)."""
+        self._generation = None
+        self._last_check = 0.0
+
+    def get_stats(self) -> Dict:
+        service = self._service
+        return {
+            **self.stats,
+            'loaded': service is not None,
+            'index': service.faiss_db.get_stats() if service is not None else None,
+        }
+
+
+# Global runtime instance
+search_runtime = SearchRuntime()
+
+
+def get_search_service() -> HybridSearchService:
+    """Get the process-wide HybridSearchService."""
+    return search_runtime.get_search_service()
@@ -12,10 +12,11 @@ from django.utils import timezone
 # Import our models and services
 from apps.items.models import Item
 from apps.prices.models import ProfitCalculation
-from apps.embeddings.models import ItemEmbedding, SearchQuery
+from apps.embeddings.models import ItemEmbedding, SearchQuery, SimilarityCache
 from services.embedding_service import SyncOllamaEmbeddingService
 from services.faiss_manager import FaissVectorDatabase
 from services.ai_service import SyncOpenRouterAIService
+from services.search_ranking import NATURE_RUNE_COST, STRATEGIES, hybrid_ranker, profit_calc_fields
 
 logger = logging.getLogger(__name__)
 
@@ -30,10 +31,15 @@ class HybridSearchService:
     Service for hybrid search combining semantic search with profit-based ranking.
     """
     
-    def __init__(self):
-        self.embedding_service = SyncOllamaEmbeddingService()
-        self.faiss_db = FaissVectorDatabase(index_name="osrs_items")
-        self.ai_service = SyncOpenRouterAIService()
+    def __init__(
+        self,
+        embedding_service: Optional[SyncOllamaEmbeddingService] = None,
+        faiss_db: Optional[FaissVectorDatabase] = None,
+        ai_service: Optional[SyncOpenRouterAIService] = None
+    ):
+        self.embedding_service = embedding_service or SyncOllamaEmbeddingService()
+        self.faiss_db = faiss_db or FaissVectorDatabase(index_name="osrs_items")
+        self.ai_service = ai_service or SyncOpenRouterAIService()
     
     def _is_alchemy_query(self, query: str) -> bool:
         """Detect if query is related to high alchemy."""
@@ -271,45 +277,57 @@ class HybridSearchService:
                 logger.warning(f"Item {item_id} not found")
                 return []
             
-            # Get item embedding
-            try:
-                item_embedding = ItemEmbedding.objects.get(item=item)
-                query_vector = item_embedding.vector
-            except ItemEmbedding.DoesNotExist:
-                logger.warning(f"No embedding found for item {item_id}")
-                return []
-            
-            # Search for similar items using FAISS
-            similar_results = self.faiss_db.search(
-                query_vector=query_vector,
-                k=limit + 1,  # +1 to exclude the item itself
-                threshold=similarity_threshold
+            # Prefer neighbours precomputed by the precompute_similar_items task
+            similar_results = list(
+                SimilarityCache.objects.filter(
+                    item_a=item, similarity_score__gte=similarity_threshold
+                ).order_by('-similarity_score').values_list('item_b__item_id', 'similarity_score')[:limit]
             )
             
-            # Remove the item itself from results
-            similar_results = [(id_, score) for id_, score in similar_results if id_ != item_id]
+            # The precompute stores a fixed k above its own threshold, so a short
+            # list may be missing weaker neighbours this caller still wants
+            if len(similar_results) < limit:
+                # Get item embedding
+                try:
+                    item_embedding = ItemEmbedding.objects.get(item=item)
+                    query_vector = item_embedding.vector
+                except ItemEmbedding.DoesNotExist:
+                    logger.warning(f"No embedding found for item {item_id}")
+                    return []
+                
+                # Search for similar items using FAISS
+                similar_results = self.faiss_db.search(
+                    query_vector=query_vector,
+                    k=limit + 1,  # +1 to exclude the item itself
+                    threshold=similarity_threshold
+                )
+                
+                # Remove the item itself from results
+                similar_results = [(id_, score) for id_, score in similar_results if id_ != item_id]
+            
+            similar_results = similar_results[:limit]
+            similar_items = Item.objects.select_related('profit_calc').in_bulk(
+                [similar_item_id for similar_item_id, _ in similar_results], field_name='item_id'
+            )
             
             # Get item details and profit data
             results = []
-            for similar_item_id, similarity in similar_results[:limit]:
-                try:
-                    similar_item = Item.objects.get(item_id=similar_item_id)
-                    profit_calc = getattr(similar_item, 'profit_calc', None)
-                    
-                    result = {
-                        'item_id': similar_item.item_id,
-                        'name': similar_item.name,
-                        'examine': similar_item.examine,
-                        'high_alch': similar_item.high_alch,
-                        'similarity_score': similarity,
-                        'current_profit': profit_calc.current_profit if profit_calc else 0,
-                        'current_profit_margin': profit_calc.current_profit_margin if profit_calc else 0.0,
-                        'current_buy_price': profit_calc.current_buy_price if profit_calc else None,
-                    }
-                    results.append(result)
-                    
-                except Item.DoesNotExist:
+            for similar_item_id, similarity in similar_results:
+                similar_item = similar_items.get(similar_item_id)
+                if similar_item is None:
                     continue
+                
+                profit_calc = getattr(similar_item, 'profit_calc', None)
+                results.append({
+                    'item_id': similar_item.item_id,
+                    'name': similar_item.name,
+                    'examine': similar_item.examine,
+                    'high_alch': similar_item.high_alch,
+                    'similarity_score': similarity,
+                    'current_profit': profit_calc.current_profit if profit_calc else 0,
+                    'current_profit_margin': profit_calc.current_profit_margin if profit_calc else 0.0,
+                    'current_buy_price': profit_calc.current_buy_price if profit_calc else None,
+                })
             
             return results
             
@@ -502,68 +520,54 @@ class HybridSearchService:
     ) -> List[Dict]:
         """Combine semantic similarity with high alchemy viability scoring."""
         try:
-            # Get semantic item IDs and scores
             semantic_scores = {item_id: score for item_id, score in semantic_results}
             
-            # Get top alchemy items from queryset (handle async context)
-            try:
-                alchemy_items = list(alchemy_queryset[:limit * 2])  # Get more for better ranking
-            except Exception as async_error:
-                logger.warning(f"Async context issue, falling back to sync query: {async_error}")
-                from asgiref.sync import sync_to_async
-                alchemy_items = list(alchemy_queryset.select_related('profit_calc')[:limit * 2])
+            # Top alchemy candidates (queryset is ordered by viability), more than needed for re-ranking
+            features = hybrid_ranker.load_candidates(alchemy_queryset[:limit * 2], semantic_scores)
+            scores = hybrid_ranker.score(features, 'alchemy_focus', {})
             
             scored_items = []
-            for item in alchemy_items:
-                semantic_score = semantic_scores.get(item.item_id, 0.0)
-                profit_calc = getattr(item, 'profit_calc', None)
-                
-                if not profit_calc:
-                    continue
-                
-                # High Alchemy focused scoring (normalized to 0-1)
-                alch_viability = (profit_calc.high_alch_viability_score or 0) / 100.0
-                alch_efficiency = (profit_calc.alch_efficiency_rating or 0) / 100.0  
-                sustainability = (profit_calc.sustainable_alch_potential or 0) / 100.0
-                
-                # Weighted hybrid score heavily favoring alchemy metrics
-                hybrid_score = (
-                    0.3 * semantic_score +      # 30% semantic relevance
-                    0.35 * alch_viability +     # 35% alchemy viability
-                    0.20 * alch_efficiency +    # 20% efficiency 
-                    0.15 * sustainability       # 15% sustainability
-                )
-                
-                item_data = {
-                    'item_id': item.item_id,
-                    'name': item.name,
-                    'examine': item.examine,
-                    'high_alch': item.high_alch,
-                    'members': item.members,
-                    'limit': item.limit,
-                    'semantic_score': semantic_score,
-                    'hybrid_score': hybrid_score,
-                    'current_profit': profit_calc.current_profit,
-                    'current_profit_margin': profit_calc.current_profit_margin,
-                    'current_buy_price': profit_calc.current_buy_price,
-                    'daily_volume': profit_calc.daily_volume,
+            for idx in hybrid_ranker.top_k(scores, limit):
+                row = features.rows[idx]
+                profit_calc = profit_calc_fields(row)
+                scored_items.append({
+                    'item_id': row['item_id'],
+                    'name': row['name'],
+                    'examine': row['examine'],
+                    'high_alch': row['high_alch'],
+                    'members': row['members'],
+                    'limit': row['limit'],
+                    'semantic_score': float(features.semantic[idx]),
+                    'hybrid_score': float(scores[idx]),
+                    'current_profit': profit_calc['current_profit'],
+                    'current_profit_margin': profit_calc['current_profit_margin'],
+                    'current_buy_price': profit_calc['current_buy_price'],
+                    'daily_volume': profit_calc['daily_volume'],
                     # Alchemy specific metrics
-                    'high_alch_viability_score': profit_calc.high_alch_viability_score,
-                    'alch_efficiency_rating': profit_calc.alch_efficiency_rating,
-                    'sustainable_alch_potential': profit_calc.sustainable_alch_potential,
-                    'magic_xp_efficiency': profit_calc.magic_xp_efficiency,
-                    'net_alch_profit': item.high_alch - 180 - (profit_calc.current_buy_price or 0),
-                }
-                
-                scored_items.append(item_data)
+                    'high_alch_viability_score': profit_calc['high_alch_viability_score'],
+                    'alch_efficiency_rating': profit_calc['alch_efficiency_rating'],
+                    'sustainable_alch_potential': profit_calc['sustainable_alch_potential'],
+                    'magic_xp_efficiency': profit_calc['magic_xp_efficiency'],
+                    'net_alch_profit': row['high_alch'] - NATURE_RUNE_COST - (profit_calc['current_buy_price'] or 0),
+                })
             
-            # Sort by hybrid score and return top results
-            scored_items.sort(key=lambda x: x['hybrid_score'], reverse=True)
-            return scored_items[:limit]
+            return scored_items
             
         except Exception as e:
             logger.error(f"Alchemy ranking failed: {e}")
             return []
+    
+    def _ranking_profile(self, query: str) -> Tuple[str, Dict[str, bool]]:
+        """Pick the weight profile for a query and report which strategy contexts it mentions."""
+        contexts = {
+            'alchemy': self._is_alchemy_query(query),
+            'decanting': self._is_decanting_query(query),
+            'set_combining': self._is_set_combining_query(query),
+            'bond_flipping': self._is_bond_flipping_query(query),
+            'money_maker': self._is_money_maker_query(query),
+        }
+        profile = next((name for name, active in contexts.items() if active), 'default')
+        return profile, contexts
 
     def _hybrid_rank_results_balanced(
         self,
@@ -576,169 +580,54 @@ class HybridSearchService:
     ) -> List[Dict]:
         """Balanced ranking considering both alchemy and flipping opportunities."""
         try:
-            # Get semantic item IDs
-            semantic_item_ids = [item_id for item_id, _ in semantic_results]
             semantic_scores = {item_id: score for item_id, score in semantic_results}
             
-            # Get items that match both semantic search and filters
-            items = base_queryset.filter(item_id__in=semantic_item_ids)
+            # Candidate features for items that match both semantic search and filters
+            features = hybrid_ranker.load_candidates(
+                base_queryset.filter(item_id__in=list(semantic_scores)), semantic_scores
+            )
             
-            # Detect query strategy context
-            is_alchemy_context = self._is_alchemy_query(query)
-            is_decanting_context = self._is_decanting_query(query)
-            is_set_combining_context = self._is_set_combining_query(query)
-            is_bond_flipping_context = self._is_bond_flipping_query(query)
-            is_money_maker_context = self._is_money_maker_query(query)
+            profile, contexts = self._ranking_profile(query)
+            logger.info(f"Query context: {contexts} -> ranking profile '{profile}'")
             
-            logger.info(f"Query context: alchemy={is_alchemy_context}, decanting={is_decanting_context}, "
-                       f"set_combining={is_set_combining_context}, bond_flipping={is_bond_flipping_context}, "
-                       f"money_maker={is_money_maker_context}")
+            bonuses = hybrid_ranker.strategy_bonuses(features, contexts)
+            scores = hybrid_ranker.score(features, profile, bonuses)
+            tax = hybrid_ranker.net_profit_after_tax(features)
             
-            # Calculate hybrid scores
             scored_items = []
-            for item in items:
-                semantic_score = semantic_scores.get(item.item_id, 0.0)
-                profit_calc = getattr(item, 'profit_calc', None)
-                
-                if not profit_calc:
-                    continue
-                
-                # Base trading metrics (normalized to 0-1)
-                profit_margin = min(1.0, max(0.0, profit_calc.current_profit_margin / 100.0)) if profit_calc.current_profit_margin else 0.0
-                
-                # High alchemy metrics (normalized to 0-1)  
-                alch_viability = (profit_calc.high_alch_viability_score or 0) / 100.0
-                alch_efficiency = (profit_calc.alch_efficiency_rating or 0) / 100.0
-                
-                # Money maker specific scoring
-                decanting_bonus = 0.0
-                set_combining_bonus = 0.0
-                bond_flipping_bonus = 0.0
-                
-                # Decanting scoring
-                if is_decanting_context and ('potion' in item.name.lower() or 'dose' in item.name.lower()):
-                    decanting_bonus = 0.3
-                    
-                # Set combining scoring  
-                item_name_lower = item.name.lower()
-                if is_set_combining_context and any(keyword in item_name_lower for keyword in 
-                    ['helm', 'body', 'legs', 'chestplate', 'tassets', 'set', 'dharok', 'ahrim', 
-                     'karil', 'torag', 'verac', 'guthan', 'armadyl', 'bandos', 'godsword', 'void']):
-                    set_combining_bonus = 0.3
-                
-                # Bond flipping scoring (high-value items)
-                if is_bond_flipping_context and profit_calc.current_buy_price and profit_calc.current_buy_price >= 1_000_000:
-                    bond_flipping_bonus = 0.3
-                
-                # Calculate context-aware hybrid score
-                if is_alchemy_context:
-                    # Alchemy-focused scoring
-                    hybrid_score = (
-                        0.20 * semantic_score +
-                        0.20 * profit_margin +
-                        0.35 * alch_viability +
-                        0.25 * alch_efficiency
-                    )
-                elif is_decanting_context:
-                    # Decanting-focused scoring
-                    hybrid_score = (
-                        0.20 * semantic_score +
-                        0.30 * profit_margin +
-                        0.15 * alch_viability +
-                        0.15 * alch_efficiency +
-                        0.20 * decanting_bonus
-                    )
-                elif is_set_combining_context:
-                    # Set combining-focused scoring
-                    hybrid_score = (
-                        0.20 * semantic_score +
-                        0.25 * profit_margin +
-                        0.10 * alch_viability +
-                        0.15 * alch_efficiency +
-                        0.30 * set_combining_bonus
-                    )
-                elif is_bond_flipping_context:
-                    # Bond flipping-focused scoring
-                    hybrid_score = (
-                        0.20 * semantic_score +
-                        0.35 * profit_margin +
-                        0.10 * alch_viability +
-                        0.05 * alch_efficiency +
-                        0.30 * bond_flipping_bonus
-                    )
-                elif is_money_maker_context:
-                    # General money making - balanced approach
-                    hybrid_score = (
-                        0.15 * semantic_score +
-                        0.30 * profit_margin +
-                        0.20 * alch_viability +
-                        0.15 * alch_efficiency +
-                        0.10 * decanting_bonus +
-                        0.05 * set_combining_bonus +
-                        0.05 * bond_flipping_bonus
-                    )
-                else:
-                    # Default balanced scoring
-                    hybrid_score = (
-                        0.25 * semantic_score +
-                        0.30 * profit_margin +
-                        0.25 * alch_viability +
-                        0.20 * alch_efficiency
-                    )
-                
-                # Calculate GE tax aware profit
-                from services.weird_gloop_client import GrandExchangeTax
-                ge_tax = 0
-                net_profit_after_tax = profit_calc.current_profit
-                
-                if profit_calc.current_buy_price and profit_calc.current_sell_price:
-                    ge_tax = GrandExchangeTax.calculate_tax(profit_calc.current_sell_price, item.item_id)
-                    net_profit_after_tax = profit_calc.current_sell_price - ge_tax - profit_calc.current_buy_price
-                
-                item_data = {
-                    'item_id': item.item_id,
-                    'name': item.name,
-                    'examine': item.examine,
-                    'high_alch': item.high_alch,
-                    'members': item.members,
-                    'limit': item.limit,
-                    'semantic_score': semantic_score,
-                    'hybrid_score': hybrid_score,
-                    'current_profit': profit_calc.current_profit,
-                    'current_profit_margin': profit_calc.current_profit_margin,
-                    'current_buy_price': profit_calc.current_buy_price,
-                    'recommendation_score': profit_calc.recommendation_score,
-                    'profit_calc': {
-                        'current_profit': profit_calc.current_profit,
-                        'current_profit_margin': profit_calc.current_profit_margin,
-                        'current_buy_price': profit_calc.current_buy_price,
-                        'current_sell_price': profit_calc.current_sell_price,
-                        'recommendation_score': profit_calc.recommendation_score,
-                        'high_alch_viability_score': profit_calc.high_alch_viability_score,
-                        'alch_efficiency_rating': profit_calc.alch_efficiency_rating,
-                        'sustainable_alch_potential': profit_calc.sustainable_alch_potential,
-                        'magic_xp_efficiency': profit_calc.magic_xp_efficiency,
-                        'volume_category': profit_calc.volume_category,
-                        'daily_volume': profit_calc.daily_volume,
-                    },
+            for idx in hybrid_ranker.top_k(scores, limit):
+                row = features.rows[idx]
+                profit_calc = profit_calc_fields(row)
+                strategy_bonuses = {strategy: float(bonuses[strategy][idx]) for strategy in STRATEGIES}
+                scored_items.append({
+                    'item_id': row['item_id'],
+                    'name': row['name'],
+                    'examine': row['examine'],
+                    'high_alch': row['high_alch'],
+                    'members': row['members'],
+                    'limit': row['limit'],
+                    'semantic_score': float(features.semantic[idx]),
+                    'hybrid_score': float(scores[idx]),
+                    'current_profit': profit_calc['current_profit'],
+                    'current_profit_margin': profit_calc['current_profit_margin'],
+                    'current_buy_price': profit_calc['current_buy_price'],
+                    'recommendation_score': profit_calc['recommendation_score'],
+                    'profit_calc': {field: profit_calc[field] for field in (
+                        'current_profit', 'current_profit_margin', 'current_buy_price', 'current_sell_price',
+                        'recommendation_score', 'high_alch_viability_score', 'alch_efficiency_rating',
+                        'sustainable_alch_potential', 'magic_xp_efficiency', 'volume_category', 'daily_volume',
+                    )},
                     'money_maker_context': {
-                        'ge_tax': ge_tax,
-                        'net_profit_after_tax': net_profit_after_tax,
-                        'is_decanting_candidate': decanting_bonus > 0,
-                        'is_set_combining_candidate': set_combining_bonus > 0,
-                        'is_bond_flipping_candidate': bond_flipping_bonus > 0,
-                        'strategy_bonuses': {
-                            'decanting': decanting_bonus,
-                            'set_combining': set_combining_bonus,
-                            'bond_flipping': bond_flipping_bonus
-                        }
+                        'ge_tax': int(tax['ge_tax'][idx]),
+                        'net_profit_after_tax': int(tax['net_profit_after_tax'][idx]),
+                        'is_decanting_candidate': strategy_bonuses['decanting'] > 0,
+                        'is_set_combining_candidate': strategy_bonuses['set_combining'] > 0,
+                        'is_bond_flipping_candidate': strategy_bonuses['bond_flipping'] > 0,
+                        'strategy_bonuses': strategy_bonuses
                     }
-                }
-                scored_items.append(item_data)
+                })
             
-            # Sort by hybrid score and return top results
-            scored_items.sort(key=lambda x: x['hybrid_score'], reverse=True)
-            return scored_items[:limit]
+            return scored_items
             
         except Exception as e:
             logger.error(f"Balanced ranking failed: {e}")
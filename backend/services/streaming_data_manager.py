@@ -6,6 +6,7 @@ Implements data-reactive architecture with continuous market monitoring.
 """
 
 import asyncio
+import heapq
 import logging
 import time
 from typing import Dict, List, Optional, Any, Tuple
@@ -23,12 +24,130 @@ from apps.realtime_engine.models import (
     MarketMomentum, VolumeAnalysis, RiskMetrics, 
     MarketEvent, StreamingDataStatus
 )
-from services.weirdgloop_api_client import WeirdGloopAPIClient
+from services.weird_gloop_client import WeirdGloopAPIClient
 from services.timeseries_client import timeseries_client
+from services.price_tick_stream import price_tick_publisher
 import statistics
 
 logger = logging.getLogger(__name__)
 
+
+class PriorityTierIndex:
+    """
+    In-memory item -> priority tier index keyed on each item's latest volume.
+    
+    Built once from the latest snapshot per item, then kept current by reading
+    only snapshots newer than a watermark (the highest snapshot ID seen), so a
+    refresh costs the same whatever the size of the snapshot history. Each
+    tier has its own due-time heap; stale heap entries left behind when an
+    item changes tier are skipped lazily when popped.
+    """
+    
+    TIERS = ('high_volume', 'medium_volume', 'low_volume')
+    
+    def __init__(self, intervals: Dict[str, int], per_tick_limits: Dict[str, int],
+                 rebuild_interval: int = 3600):
+        self.intervals = intervals
+        self.per_tick_limits = per_tick_limits
+        self.rebuild_interval = rebuild_interval
+        self.watermark = 0
+        self.last_rebuild = 0.0
+        self.tiers: Dict[int, str] = {}           # item pk -> tier
+        self.versions: Dict[int, int] = {}        # item pk -> heap entry version
+        self.heaps: Dict[str, List[Tuple[float, int, int]]] = {tier: [] for tier in self.TIERS}
+    
+    @staticmethod
+    def tier_for_volume(volume: Optional[int]) -> str:
+        volume = volume or 0
+        if volume >= 1000:
+            return 'high_volume'
+        if volume >= 100:
+            return 'medium_volume'
+        return 'low_volume'
+    
+    def refresh(self):
+        """Apply snapshots written since the watermark (full rebuild once per rebuild_interval)."""
+        if not self.tiers or time.time() - self.last_rebuild > self.rebuild_interval:
+            self._rebuild()
+            return
+        
+        new_rows = (
+            PriceSnapshot.objects.filter(id__gt=self.watermark, item__is_active=True)
+            .order_by('id')
+            .values_list('id', 'item_id', 'total_volume')
+        )
+        for snapshot_id, item_pk, volume in new_rows.iterator(chunk_size=2000):
+            self._assign(item_pk, self.tier_for_volume(volume))
+            self.watermark = snapshot_id
+    
+    def _rebuild(self):
+        """Load the latest snapshot per active item (also drops deactivated items)."""
+        latest_ids = (
+            PriceSnapshot.objects.filter(item__is_active=True)
+            .values('item').annotate(latest_id=Max('id')).values_list('latest_id', flat=True)
+        )
+        rows = PriceSnapshot.objects.filter(id__in=latest_ids).values_list('id', 'item_id', 'total_volume')
+        
+        active = set()
+        watermark = self.watermark
+        for snapshot_id, item_pk, volume in rows.iterator(chunk_size=2000):
+            self._assign(item_pk, self.tier_for_volume(volume))
+            active.add(item_pk)
+            watermark = max(watermark, snapshot_id)
+        
+        for item_pk in set(self.tiers) - active:
+            self.tiers.pop(item_pk, None)  # Its heap entries are now stale
+        
+        self.watermark = watermark
+        self.last_rebuild = time.time()
+        logger.info(f"Priority tiers rebuilt: {self.tier_counts()}")
+    
+    def _assign(self, item_pk: int, tier: str):
+        if self.tiers.get(item_pk) == tier:
+            return
+        
+        # New items and tier changes are due immediately in their new tier
+        self.tiers[item_pk] = tier
+        self.versions[item_pk] = self.versions.get(item_pk, 0) + 1
+        heapq.heappush(self.heaps[tier], (time.time(), self.versions[item_pk], item_pk))
+    
+    def pop_due(self, now: Optional[float] = None) -> Dict[str, List[int]]:
+        """
+        Pop items whose refresh is due and reschedule them one interval ahead.
+        
+        Returns:
+            Dict of tier -> list of item primary keys, capped per tier
+        """
+        now = now or time.time()
+        due: Dict[str, List[int]] = {}
+        
+        for tier, heap in self.heaps.items():
+            limit = self.per_tick_limits.get(tier, 100)
+            batch = []
+            while heap and heap[0][0] <= now and len(batch) < limit:
+                _, version, item_pk = heapq.heappop(heap)
+                if self.versions.get(item_pk) != version or self.tiers.get(item_pk) != tier:
+                    continue  # Stale entry from before a tier change
+                batch.append(item_pk)
+                heapq.heappush(heap, (now + self.intervals[tier], version, item_pk))
+            if batch:
+                due[tier] = batch
+        
+        return due
+    
+    def next_due_in(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the earliest scheduled refresh (None when nothing is scheduled)."""
+        now = now or time.time()
+        heads = [heap[0][0] for heap in self.heaps.values() if heap]
+        return max(0.0, min(heads) - now) if heads else None
+    
+    def tier_counts(self) -> Dict[str, int]:
+        counts = {tier: 0 for tier in self.TIERS}
+        for tier in self.tiers.values():
+            counts[tier] += 1
+        return counts
+
+
 class StreamingDataManager:
     """
     Central manager for real-time market data streaming and processing.
@@ -45,6 +164,11 @@ class StreamingDataManager:
             'calculations': 120,    # 2 minutes for calculations update
             'momentum': 180,        # 3 minutes for momentum analysis
         }
+        self.batch_sizes = {'high_volume': 50, 'medium_volume': 25, 'low_volume': 25}
+        self.priority_tiers = PriorityTierIndex(
+            intervals=self.update_intervals,
+            per_tick_limits={'high_volume': 100, 'medium_volume': 200, 'low_volume': 500},
+        )
         
         # Cache keys
         self.cache_keys = {
@@ -87,36 +211,34 @@ class StreamingDataManager:
         self.is_running = False
     
     async def _stream_price_data(self):
-        """Continuously fetch and update price data."""
+        """Continuously fetch and update price data as each tier's items come due."""
         while self.is_running:
             try:
                 start_time = time.time()
                 
-                # Get items prioritized by volume and activity
-                priority_items = await self._get_priority_items()
+                # Pick up tier changes from snapshots written since the last pass
+                await sync_to_async(self.priority_tiers.refresh)()
+                due_items = await self._get_due_items()
                 
-                # Process in batches based on priority
-                for priority_level, items in priority_items.items():
+                priced = 0
+                for priority_level, items in due_items.items():
                     if not self.is_running:
                         break
-                        
-                    interval = self.update_intervals.get(priority_level, 300)
-                    batch_size = 50 if priority_level == 'high_volume' else 25
-                    
-                    await self._process_price_batch(items, batch_size)
-                    
-                    # Rate limiting between batches
-                    await asyncio.sleep(2)
-                
-                # Update data source status
-                await self._update_source_status(
-                    'weirdgloop', 
-                    success=True, 
-                    response_time=time.time() - start_time
-                )
+                    priced += await self._process_price_batch(items, self.batch_sizes.get(priority_level, 25))
+                
+                if due_items:
+                    # The client logs and swallows request errors, so no prices at all is a failed pass
+                    due_count = sum(len(items) for items in due_items.values())
+                    await self._update_source_status(
+                        'weirdgloop', 
+                        success=priced > 0, 
+                        response_time=time.time() - start_time,
+                        error='' if priced else f"No prices returned for {due_count} due items"
+                    )
                 
-                # Wait before next cycle
-                await asyncio.sleep(60)  # Base cycle: 1 minute
+                # Sleep until the next item is due (re-check at least once a minute)
+                next_due = self.priority_tiers.next_due_in()
+                await asyncio.sleep(min(60, max(1, next_due if next_due is not None else 60)))
                 
             except Exception as e:
                 logger.error(f"Price streaming error: {e}")
@@ -275,82 +397,89 @@ class StreamingDataManager:
     # Helper Methods
     
     @sync_to_async
-    def _get_priority_items(self) -> Dict[str, List[Item]]:
-        """Get items categorized by update priority."""
-        # High volume items (updated every minute)
-        high_volume = list(
-            Item.objects.filter(
-                is_active=True,
-                price_snapshots__total_volume__gte=1000
-            ).distinct()[:100]
-        )
-        
-        # Medium volume items (updated every 5 minutes) 
-        medium_volume = list(
-            Item.objects.filter(
-                is_active=True,
-                price_snapshots__total_volume__gte=100,
-                price_snapshots__total_volume__lt=1000
-            ).distinct()[:200]
-        )
-        
-        # Low volume items (updated every 15 minutes)
-        low_volume = list(
-            Item.objects.filter(
-                is_active=True,
-                price_snapshots__total_volume__lt=100
-            ).distinct()[:500]
-        )
+    def _get_due_items(self) -> Dict[str, List[Item]]:
+        """Get the items due for a price refresh, grouped by priority tier."""
+        due = self.priority_tiers.pop_due()
+        item_pks = [item_pk for batch in due.values() for item_pk in batch]
+        if not item_pks:
+            return {}
         
+        items = Item.objects.only('id', 'item_id', 'name').in_bulk(item_pks)
         return {
-            'high_volume': high_volume,
-            'medium_volume': medium_volume,
-            'low_volume': low_volume,
+            tier: [items[item_pk] for item_pk in batch if item_pk in items]
+            for tier, batch in due.items()
         }
     
-    async def _process_price_batch(self, items: List[Item], batch_size: int):
-        """Process a batch of price updates."""
-        for i in range(0, len(items), batch_size):
-            batch = items[i:i + batch_size]
-            
-            # Fetch prices for batch
-            price_updates = []
+    async def _process_price_batch(self, items: List[Item], batch_size: int) -> int:
+        """
+        Fetch and store latest prices for a priority tier.
+        
+        Items are requested batch_size at a time through the multi-item
+        /latest endpoint (the shared transport applies the per-host rate
+        limit), and the whole tier is written with one bulk insert/update.
+        
+        Returns:
+            Number of items a price was fetched for
+        """
+        if not items:
+            return 0
+        
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        async with self.api_client as client:
+            results = await asyncio.gather(
+                *(client.get_latest_prices([item.item_id for item in batch]) for batch in batches),
+                return_exceptions=True
+            )
+        
+        price_updates = []
+        for batch, prices in zip(batches, results):
+            if isinstance(prices, Exception):
+                logger.warning(f"Failed to fetch prices for {len(batch)} items: {prices}")
+                continue
             for item in batch:
-                try:
-                    price_data = await sync_to_async(
-                        self.api_client.get_latest_price
-                    )(item.item_id)
-                    
-                    if price_data:
-                        price_updates.append((item, price_data))
-                        
-                except Exception as e:
-                    logger.warning(f"Failed to fetch price for {item.name}: {e}")
-            
-            # Update prices in batch
-            if price_updates:
-                await self._batch_update_prices(price_updates)
+                price_data = prices.get(str(item.item_id))
+                if price_data:
+                    price_updates.append((item, price_data))
+        
+        if price_updates:
+            await self._batch_update_prices(price_updates)
+        return len(price_updates)
     
     @sync_to_async
     def _batch_update_prices(self, price_updates: List[Tuple[Item, Dict]]):
-        """Batch update prices in database."""
+        """Batch update prices in database (one INSERT for snapshots, one UPDATE for profit calcs)."""
+        snapshots = []
+        prices_by_item = {}
+        for item, price_data in price_updates:
+            # Weird Gloop reports a single guide price; fall back to it for both sides
+            high = price_data.get('high', price_data.get('price'))
+            low = price_data.get('low', price_data.get('price'))
+            snapshots.append(PriceSnapshot(
+                item=item,
+                high_price=high,
+                low_price=low,
+                total_volume=price_data.get('volume') or 0,
+                api_source='weirdgloop',
+            ))
+            prices_by_item[item.pk] = (high or 0, low or 0)
+        
+        now = timezone.now()
         with transaction.atomic():
-            for item, price_data in price_updates:
-                # Create new price snapshot
-                PriceSnapshot.objects.create(
-                    item=item,
-                    high_price=price_data.get('high'),
-                    low_price=price_data.get('low'),
-                    total_volume=price_data.get('volume', 0),
-                    api_source='weirdgloop',
-                )
-                
-                # Update profit calculation if needed
-                if hasattr(item, 'profit_calc'):
-                    profit_calc = item.profit_calc
-                    profit_calc.current_buy_price = price_data.get('high', 0)
-                    profit_calc.current_sell_price = price_data.get('low', 0)
-                    profit_calc.save()
+            PriceSnapshot.objects.bulk_create(snapshots, batch_size=500)
+            
+            profit_calcs = list(
+                ProfitCalculation.objects.filter(item_id__in=prices_by_item.keys())
+            )
+            for profit_calc in profit_calcs:
+                profit_calc.current_buy_price, profit_calc.current_sell_price = prices_by_item[profit_calc.item_id]
+                profit_calc.last_updated = now  # auto_now is skipped by bulk_update
+            ProfitCalculation.objects.bulk_update(
+                profit_calcs,
+                ['current_buy_price', 'current_sell_price', 'last_updated'],
+                batch_size=500
+            )
+        
+        price_tick_publisher.publish_snapshots(snapshots)
     
     async def _calculate_item_momentum(self, item: Item) -> Optional[Dict]:
         """Calculate momentum metrics for a single item."""
@@ -653,6 +782,8 @@ class StreamingDataManager:
                 defaults={
                     'is_active': True,
                     'last_successful_update': timezone.now() if success else None,
+                    'last_error': '' if success else error,
+                    'error_count_24h': 0 if success else 1,
                     'average_response_time_ms': response_time * 1000,
                 }
             )
@@ -3,14 +3,27 @@ InfluxDB Time-Series Client for High-Performance Price History Storage
 
 Handles storing and querying historical price data in a time-series optimized format.
 This allows for fast analytics, trend analysis, and real-time momentum calculations.
+
+Writes go through a buffered writer that encodes line protocol directly and
+flushes in batches (on size or time) from a background thread, so a full-market
+snapshot is one or two HTTP writes. Batches that still fail after retries are
+spooled to disk and replayed once InfluxDB accepts writes again.
 """
 
+import atexit
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+import math
+import numbers
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 from django.conf import settings
 from django.utils import timezone
-from influxdb_client import InfluxDBClient, Point, WritePrecision
+from influxdb_client import InfluxDBClient, WritePrecision
 from influxdb_client.client.write_api import SYNCHRONOUS
 from influxdb_client.client.exceptions import InfluxDBError
 import pandas as pd
@@ -18,6 +31,325 @@ import pandas as pd
 logger = logging.getLogger(__name__)
 
 
+# Outcomes of a batch write
+WRITE_OK = 'ok'
+WRITE_REJECTED = 'rejected'  # InfluxDB refused the data itself; retrying won't help
+WRITE_FAILED = 'failed'      # Transient (network, 5xx, 429) or configuration (auth) failure
+
+# Bad or rotated token, missing bucket: the data is fine once the setup is fixed
+AUTH_ERROR_STATUSES = (401, 403, 404)
+
+_MEASUREMENT_ESCAPE = str.maketrans({',': '\\,', ' ': '\\ ', '\n': '\\n'})
+_KEY_ESCAPE = str.maketrans({',': '\\,', '=': '\\=', ' ': '\\ ', '\n': '\\n'})
+
+
+def _format_field_value(value: Any) -> Optional[str]:
+    """Format a field value the way influxdb_client's Point does (ints get an 'i' suffix)."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, numbers.Integral):
+        return f"{int(value)}i"
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        return repr(value) if math.isfinite(value) else None
+    value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{value}"'
+
+
+def _timestamp_ms(timestamp: Any) -> int:
+    """Convert a datetime or epoch seconds to epoch milliseconds."""
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=dt_timezone.utc)
+        return int(timestamp.timestamp() * 1000)
+    return int(timestamp * 1000)
+
+
+def encode_line(measurement: str, tags: Dict[str, Any], fields: Dict[str, Any], timestamp: Any) -> Optional[str]:
+    """
+    Encode one point as InfluxDB line protocol with millisecond precision.
+    
+    None tags/fields are skipped like Point does; returns None when no field
+    is left to write.
+    """
+    field_parts = []
+    for key, value in fields.items():
+        if value is None:
+            continue
+        formatted = _format_field_value(value)
+        if formatted is not None:
+            field_parts.append(f"{key.translate(_KEY_ESCAPE)}={formatted}")
+    if not field_parts:
+        return None
+    
+    tag_parts = ''.join(
+        f",{key.translate(_KEY_ESCAPE)}={str(value).translate(_KEY_ESCAPE)}"
+        for key, value in sorted(tags.items())
+        if value is not None and value != ''
+    )
+    
+    return f"{measurement.translate(_MEASUREMENT_ESCAPE)}{tag_parts} {','.join(field_parts)} {_timestamp_ms(timestamp)}"
+
+
+class BufferedLineProtocolWriter:
+    """
+    Background batch writer for line protocol records.
+    
+    - Flushes when batch_size lines are buffered or flush_interval elapses
+    - Backpressure: producers block (up to enqueue_timeout) while the buffer is full
+    - Retries failed batches with exponential backoff, then spools them to disk
+      (auth failures are spooled right away so a bad token loses no data)
+    - Replays spooled batches once a write succeeds again; spooled batches
+      InfluxDB rejects outright are deleted so they can't block the spool
+    """
+    
+    def __init__(self, write_api, bucket: str, org: str, batch_size: int = 5000,
+                 flush_interval: float = 5.0, max_buffered_lines: int = 50000,
+                 max_retries: int = 3, retry_delay: float = 0.5, enqueue_timeout: float = 2.0,
+                 spool_dir: Optional[Path] = None, max_spool_bytes: int = 256 * 1024 * 1024):
+        self.write_api = write_api
+        self.bucket = bucket
+        self.org = org
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered_lines = max_buffered_lines
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.enqueue_timeout = enqueue_timeout
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self.max_spool_bytes = max_spool_bytes
+        
+        self._buffer: deque = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        
+        self.stats = {
+            'lines_written': 0,
+            'batches_written': 0,
+            'retries': 0,
+            'lines_spooled': 0,
+            'batches_replayed': 0,
+            'lines_dropped': 0,
+        }
+    
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+    
+    def enqueue(self, lines: List[str], block: bool = True) -> bool:
+        """
+        Queue line protocol records for the next batch.
+        
+        Args:
+            lines: Encoded records
+            block: Wait for buffer space (async callers should pass False)
+            
+        Returns:
+            True if buffered, False if the buffer was full and the lines were spooled
+        """
+        if not lines:
+            return True
+        
+        with self._condition:
+            self._ensure_thread()
+            deadline = time.monotonic() + (self.enqueue_timeout if block else 0)
+            
+            while self._is_full(len(lines)) and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            
+            if not self._is_full(len(lines)) and not self._closed:
+                self._buffer.extend(lines)
+                if len(self._buffer) >= self.batch_size:
+                    self._condition.notify_all()
+                return True
+        
+        logger.warning(f"InfluxDB write buffer full, spooling {len(lines)} lines")
+        self._spool(lines)
+        return False
+    
+    def _is_full(self, incoming: int) -> bool:
+        # An oversized request is still accepted into an empty buffer
+        return bool(self._buffer) and len(self._buffer) + incoming > self.max_buffered_lines
+    
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Write everything buffered now; returns False if the timeout expired first."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self._thread is None:
+                return not self._buffer
+            
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._buffer or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+    
+    def close(self, timeout: float = 10.0):
+        """Flush and stop the writer thread; anything left over is spooled."""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        
+        with self._condition:
+            leftover = list(self._buffer)
+            self._buffer.clear()
+        if leftover:
+            self._spool(leftover)
+    
+    def _ensure_thread(self):
+        # Called with the condition held; restarts after a fork
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="influxdb-writer", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.flush_interval
+                while (len(self._buffer) < self.batch_size and not self._flush_requested
+                       and not self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not self._buffer:
+                    self._flush_requested = False
+                if self._closed and not batch:
+                    return
+                self._in_flight += 1
+                # Wake producers waiting on buffer space
+                self._condition.notify_all()
+            
+            try:
+                if batch:
+                    if self._write_batch(batch) != WRITE_FAILED:
+                        self._replay_spool()
+                else:
+                    self._replay_spool()
+            except Exception as e:
+                logger.error(f"InfluxDB writer loop error: {e}")
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+    
+    def _write_batch(self, lines: List[str], spool_on_failure: bool = True) -> str:
+        """
+        Write a batch with retries.
+        
+        Returns:
+            WRITE_OK, WRITE_REJECTED (dropped: the data itself was refused) or
+            WRITE_FAILED (spooled when spool_on_failure)
+        """
+        payload = '\n'.join(lines)
+        delay = self.retry_delay
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.write_api.write(
+                    bucket=self.bucket, org=self.org, record=payload, write_precision=WritePrecision.MS
+                )
+                self.stats['lines_written'] += len(lines)
+                self.stats['batches_written'] += 1
+                logger.debug(f"Wrote {len(lines)} points to InfluxDB")
+                return WRITE_OK
+                
+            except Exception as e:
+                status = getattr(e, 'status', None)
+                if status in AUTH_ERROR_STATUSES:
+                    # Retrying won't help until the token/bucket is fixed; keep the data
+                    logger.error(f"InfluxDB refused write of {len(lines)} points ({status}), check token and bucket: {e}")
+                    break
+                
+                if status is not None and 400 <= status < 500 and status != 429:
+                    # Rejected data won't be accepted on retry either
+                    logger.error(f"InfluxDB rejected batch of {len(lines)} points ({status}): {e}")
+                    self.stats['lines_dropped'] += len(lines)
+                    return WRITE_REJECTED
+                
+                if attempt == self.max_retries:
+                    logger.error(f"InfluxDB write of {len(lines)} points failed after {attempt + 1} attempts: {e}")
+                    break
+                
+                self.stats['retries'] += 1
+                logger.warning(f"InfluxDB write failed (attempt {attempt + 1}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                delay *= 2
+        
+        if spool_on_failure:
+            self._spool(lines)
+        return WRITE_FAILED
+    
+    def _spool_files(self) -> List[Path]:
+        if self.spool_dir is None or not self.spool_dir.exists():
+            return []
+        return sorted(self.spool_dir.glob('*.lp'))
+    
+    def _spool(self, lines: List[str]):
+        """Persist a batch to the local spool (oldest files are dropped past the size cap)."""
+        if self.spool_dir is None:
+            logger.error(f"No InfluxDB spool configured, dropping {len(lines)} points")
+            self.stats['lines_dropped'] += len(lines)
+            return
+        
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            target = self.spool_dir / f"{time.time_ns()}-{threading.get_ident()}.lp"
+            temp = target.with_suffix('.tmp')
+            temp.write_text('\n'.join(lines), encoding='utf-8')
+            os.replace(temp, target)
+            self.stats['lines_spooled'] += len(lines)
+            
+            files = self._spool_files()
+            total_bytes = sum(path.stat().st_size for path in files)
+            while files and total_bytes > self.max_spool_bytes:
+                oldest = files.pop(0)
+                total_bytes -= oldest.stat().st_size
+                oldest.unlink()
+                logger.warning(f"InfluxDB spool over {self.max_spool_bytes} bytes, dropped {oldest.name}")
+                
+        except OSError as e:
+            logger.error(f"Failed to spool {len(lines)} InfluxDB points: {e}")
+            self.stats['lines_dropped'] += len(lines)
+    
+    def _replay_spool(self):
+        """Write spooled batches oldest first, stopping at the first transient failure."""
+        for path in self._spool_files():
+            try:
+                lines = path.read_text(encoding='utf-8').splitlines()
+            except OSError as e:
+                logger.error(f"Failed to read InfluxDB spool file {path.name}: {e}")
+                continue
+            
+            result = self._write_batch(lines, spool_on_failure=False) if lines else WRITE_OK
+            if result == WRITE_FAILED:
+                return
+            
+            # Rejected batches are gone for good (counted as dropped); don't let them block the spool
+            path.unlink(missing_ok=True)
+            if result == WRITE_OK:
+                self.stats['batches_replayed'] += 1
+                logger.info(f"Replayed {len(lines)} spooled points to InfluxDB")
+            else:
+                logger.error(f"Deleted rejected InfluxDB spool file {path.name}")
+
+
 class TimeSeriesClient:
     """
     High-performance time-series client for OSRS market data.
@@ -35,6 +367,7 @@ class TimeSeriesClient:
         self.client = None
         self.write_api = None
         self.query_api = None
+        self.writer = None
         self._initialize_client()
     
     def _initialize_client(self):
@@ -54,6 +387,19 @@ class TimeSeriesClient:
             self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
             self.query_api = self.client.query_api()
             
+            # Created before the health check so writes spool while InfluxDB is down
+            self.writer = BufferedLineProtocolWriter(
+                self.write_api,
+                bucket=self.bucket,
+                org=self.org,
+                batch_size=getattr(settings, 'INFLUXDB_BATCH_SIZE', 5000),
+                flush_interval=getattr(settings, 'INFLUXDB_FLUSH_INTERVAL', 5.0),
+                max_buffered_lines=getattr(settings, 'INFLUXDB_MAX_BUFFERED_POINTS', 50000),
+                max_retries=getattr(settings, 'INFLUXDB_WRITE_RETRIES', 3),
+                spool_dir=getattr(settings, 'INFLUXDB_SPOOL_DIR', None),
+            )
+            atexit.register(self.writer.close)
+            
             # Test connection
             self._test_connection()
             logger.info("✅ InfluxDB client initialized successfully")
@@ -87,154 +433,140 @@ class TimeSeriesClient:
         """Check if InfluxDB is available for use."""
         return self.client is not None
     
-    def write_price_data(self, item_id: int, price_data: Dict, timestamp: Optional[datetime] = None):
+    def _price_line(self, item_id: int, price_data: Dict, timestamp: Optional[Any] = None) -> Optional[str]:
+        """Encode a price record as a line on the "price" measurement."""
+        fields = {
+            'high_price': price_data.get('high_price', 0),
+            'low_price': price_data.get('low_price', 0),
+            'high_volume': price_data.get('high_volume', 0),
+            'low_volume': price_data.get('low_volume', 0),
+            'total_volume': price_data.get('total_volume', 0),
+        }
+        # Add optional fields if present
+        for name in ('spread', 'volatility', 'momentum_score', 'volume_weighted_price', 'liquidity_score'):
+            if name in price_data:
+                fields[name] = price_data[name]
+        
+        tags = {'item_id': str(item_id)}
+        if 'trading_activity' in price_data:
+            tags['trading_activity'] = price_data['trading_activity']
+        
+        return encode_line('price', tags, fields, timestamp or timezone.now())
+    
+    def _enqueue(self, lines: List[Optional[str]], block: bool) -> bool:
+        lines = [line for line in lines if line]
+        if not lines:
+            return False
+        self.writer.enqueue(lines, block=block)
+        return True
+    
+    def write_price_data(self, item_id: int, price_data: Dict, timestamp: Optional[datetime] = None,
+                         block: bool = True):
         """
-        Write price data to InfluxDB time-series database.
+        Queue price data for the next batched InfluxDB write.
         
         Args:
             item_id: OSRS item ID
             price_data: Dictionary containing price information
             timestamp: When the price was recorded (defaults to now)
+            block: Wait for buffer space when the writer is backed up
         """
-        if not self.is_available:
+        if self.writer is None:
             logger.warning("InfluxDB not available, skipping price write")
             return False
         
         try:
-            timestamp = timestamp or timezone.now()
-            
-            # Create data point
-            point = (
-                Point("price")
-                .tag("item_id", str(item_id))
-                .field("high_price", price_data.get('high_price', 0))
-                .field("low_price", price_data.get('low_price', 0))
-                .field("high_volume", price_data.get('high_volume', 0))
-                .field("low_volume", price_data.get('low_volume', 0))
-                .field("total_volume", price_data.get('total_volume', 0))
-                .time(timestamp, WritePrecision.MS)
-            )
-            
-            # Add optional fields if present
-            if 'spread' in price_data:
-                point = point.field("spread", price_data['spread'])
-            if 'volatility' in price_data:
-                point = point.field("volatility", price_data['volatility'])
-            if 'momentum_score' in price_data:
-                point = point.field("momentum_score", price_data['momentum_score'])
-            if 'volume_weighted_price' in price_data:
-                point = point.field("volume_weighted_price", price_data['volume_weighted_price'])
-            if 'trading_activity' in price_data:
-                point = point.tag("trading_activity", price_data['trading_activity'])
-            if 'liquidity_score' in price_data:
-                point = point.field("liquidity_score", price_data['liquidity_score'])
-            
-            # Write to InfluxDB
-            self.write_api.write(bucket=self.bucket, org=self.org, record=point)
-            logger.debug(f"Wrote price data for item {item_id} at {timestamp}")
-            return True
+            return self._enqueue([self._price_line(item_id, price_data, timestamp)], block)
             
         except Exception as e:
             logger.error(f"Failed to write price data for item {item_id}: {e}")
             return False
     
-    def write_timeseries_data(self, item_id: int, timeseries_points: List, source: str = "wiki_api"):
+    def write_timeseries_data(self, item_id: int, timeseries_points: List, source: str = "wiki_api",
+                              block: bool = True):
         """
-        Write RuneScape Wiki timeseries data to InfluxDB.
+        Queue RuneScape Wiki timeseries data for the next batched InfluxDB write.
         
         Args:
             item_id: OSRS item ID
             timeseries_points: List of TimeSeriesData points from RuneScape Wiki API
             source: Data source identifier
+            block: Wait for buffer space when the writer is backed up
         """
-        if not self.is_available or not timeseries_points:
+        if self.writer is None or not timeseries_points:
             logger.warning("InfluxDB not available or no timeseries data, skipping write")
             return False
         
         try:
-            points = []
+            lines = []
             for ts_data in timeseries_points:
-                # Convert timestamp to datetime
-                ts_datetime = datetime.fromtimestamp(ts_data.timestamp, tz=timezone.utc)
-                
-                point = (
-                    Point("timeseries")
-                    .tag("item_id", str(item_id))
-                    .tag("source", source)
-                    .field("avg_high_price", ts_data.avg_high_price or 0)
-                    .field("avg_low_price", ts_data.avg_low_price or 0)
-                    .field("high_price_volume", ts_data.high_price_volume)
-                    .field("low_price_volume", ts_data.low_price_volume)
-                    .field("total_volume", ts_data.total_volume)
-                    .time(ts_datetime, WritePrecision.MS)
-                )
+                fields = {
+                    'avg_high_price': ts_data.avg_high_price or 0,
+                    'avg_low_price': ts_data.avg_low_price or 0,
+                    'high_price_volume': ts_data.high_price_volume,
+                    'low_price_volume': ts_data.low_price_volume,
+                    'total_volume': ts_data.total_volume,
+                }
                 
                 # Add volume-weighted price if available
                 if ts_data.volume_weighted_price:
-                    point = point.field("volume_weighted_price", ts_data.volume_weighted_price)
+                    fields['volume_weighted_price'] = ts_data.volume_weighted_price
                 
                 # Add trading activity classification
                 if ts_data.total_volume > 100:
-                    point = point.tag("activity_level", "very_active")
+                    activity_level = "very_active"
                 elif ts_data.total_volume > 50:
-                    point = point.tag("activity_level", "active")
+                    activity_level = "active"
                 elif ts_data.total_volume > 10:
-                    point = point.tag("activity_level", "moderate")
+                    activity_level = "moderate"
                 elif ts_data.total_volume > 0:
-                    point = point.tag("activity_level", "low")
+                    activity_level = "low"
                 else:
-                    point = point.tag("activity_level", "inactive")
+                    activity_level = "inactive"
                 
-                points.append(point)
+                tags = {'item_id': str(item_id), 'source': source, 'activity_level': activity_level}
+                lines.append(encode_line('timeseries', tags, fields, ts_data.timestamp))
             
-            # Bulk write
-            self.write_api.write(bucket=self.bucket, org=self.org, record=points)
-            logger.info(f"Wrote {len(points)} timeseries data points for item {item_id}")
-            return True
+            queued = self._enqueue(lines, block)
+            logger.debug(f"Queued {len(lines)} timeseries data points for item {item_id}")
+            return queued
             
         except Exception as e:
             logger.error(f"Failed to write timeseries data for item {item_id}: {e}")
             return False
     
-    def write_bulk_price_data(self, price_records: List[Dict]):
+    def write_bulk_price_data(self, price_records: List[Dict], block: bool = True):
         """
-        Write multiple price records efficiently.
+        Queue multiple price records for batched writing.
         
         Args:
             price_records: List of dicts with 'item_id', 'price_data', 'timestamp'
+            block: Wait for buffer space when the writer is backed up
         """
-        if not self.is_available or not price_records:
+        if self.writer is None or not price_records:
             return False
         
         try:
-            points = []
-            for record in price_records:
-                item_id = record['item_id']
-                price_data = record['price_data']
-                timestamp = record.get('timestamp', timezone.now())
-                
-                point = (
-                    Point("price")
-                    .tag("item_id", str(item_id))
-                    .field("high_price", price_data.get('high_price', 0))
-                    .field("low_price", price_data.get('low_price', 0))
-                    .field("high_volume", price_data.get('high_volume', 0))
-                    .field("low_volume", price_data.get('low_volume', 0))
-                    .field("total_volume", price_data.get('total_volume', 0))
-                    .time(timestamp, WritePrecision.MS)
-                )
-                
-                points.append(point)
+            now = timezone.now()
+            lines = [
+                self._price_line(record['item_id'], record['price_data'], record.get('timestamp') or now)
+                for record in price_records
+            ]
             
-            # Bulk write
-            self.write_api.write(bucket=self.bucket, org=self.org, record=points)
-            logger.info(f"Bulk wrote {len(points)} price records to InfluxDB")
-            return True
+            queued = self._enqueue(lines, block)
+            logger.debug(f"Queued {len(lines)} price records for InfluxDB")
+            return queued
             
         except Exception as e:
             logger.error(f"Bulk price write failed: {e}")
             return False
     
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Write all buffered points now."""
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout)
+    
     def get_price_history(self, item_id: int, duration: str = "24h") -> pd.DataFrame:
         """
         Get price history for an item over a specific duration.
@@ -416,7 +748,9 @@ class TimeSeriesClient:
             return {}
     
     def close(self):
-        """Close InfluxDB client connection."""
+        """Flush buffered writes and close InfluxDB client connection."""
+        if self.writer:
+            self.writer.close()
         if self.client:
             self.client.close()
             logger.info("InfluxDB client connection closed")
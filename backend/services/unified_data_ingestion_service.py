@@ -18,13 +18,14 @@ from dataclasses import dataclass, field
 from enum import Enum
 import json
 
-from django.db import transaction, IntegrityError
+from django.db import transaction
 from django.utils import timezone
 from django.core.cache import cache
 from django.conf import settings
 
 from .unified_wiki_price_client import UnifiedPriceClient, PriceData
 from .runescape_wiki_client import RuneScapeWikiAPIClient, ItemMetadata, TimeSeriesData, HistoricalPriceData
+from .price_tick_stream import price_tick_publisher
 from apps.items.models import Item
 from apps.prices.models import PriceSnapshot, HistoricalPricePoint
 
@@ -527,122 +528,91 @@ class UnifiedDataIngestionService:
     async def _save_packages_to_database(self, packages: List[ItemDataPackage]) -> Dict[str, int]:
         """Save processed packages to database."""
         def save_batch():
-            items_created = 0
-            items_updated = 0
             prices_created = 0
             historical_points_created = 0
+            historical_points = []
+            snapshots = []
+            
+            packages_with_metadata = [package for package in packages if package.metadata]
             
             with transaction.atomic():
-                for package in packages:
-                    if not package.metadata:
+                # One diffed upsert for all item rows instead of update_or_create per package
+                upsert = Item.bulk_upsert([
+                    Item(
+                        item_id=package.item_id,
+                        name=package.metadata.name,
+                        examine=package.metadata.examine,
+                        icon=package.metadata.icon,
+                        value=package.metadata.value,
+                        high_alch=package.metadata.highalch,
+                        low_alch=package.metadata.lowalch,
+                        limit=package.metadata.limit,
+                        members=package.metadata.members,
+                        is_active=True,
+                    )
+                    for package in packages_with_metadata
+                ])
+                items = Item.objects.in_bulk(
+                    [package.item_id for package in packages_with_metadata], field_name='item_id'
+                )
+                
+                for package in packages_with_metadata:
+                    item = items.get(package.item_id)
+                    if item is None:
                         continue
                     
-                    try:
-                        # Update or create Item
-                        item, created = Item.objects.update_or_create(
-                            item_id=package.item_id,
-                            defaults={
-                                'name': package.metadata.name,
-                                'examine': package.metadata.examine,
-                                'icon': package.metadata.icon,
-                                'value': package.metadata.value,
-                                'high_alch': package.metadata.highalch,
-                                'low_alch': package.metadata.lowalch,
-                                'limit': package.metadata.limit,
-                                'members': package.metadata.members,
-                                'is_active': True,
-                                'updated_at': timezone.now()
-                            }
-                        )
+                    # Create PriceSnapshot if we have valid price data
+                    if package.has_valid_price_data:
+                        price_data = package.price_data
                         
-                        if created:
-                            items_created += 1
-                        else:
-                            items_updated += 1
+                        # Convert timestamps
+                        high_time = datetime.fromtimestamp(price_data.timestamp, tz=timezone.get_current_timezone()) if price_data.timestamp > 0 else None
+                        low_time = high_time  # Same timestamp for both in latest API
                         
-                        # Create PriceSnapshot if we have valid price data
-                        if package.has_valid_price_data:
-                            price_data = package.price_data
-                            
-                            # Convert timestamps
-                            high_time = datetime.fromtimestamp(price_data.timestamp, tz=timezone.get_current_timezone()) if price_data.timestamp > 0 else None
-                            low_time = high_time  # Same timestamp for both in latest API
-                            
-                            # Calculate volume metrics
-                            total_volume = price_data.volume_high + price_data.volume_low
-                            
-                            # Calculate volatility from volume analysis
-                            price_volatility = None
-                            if package.volume_analysis and isinstance(package.volume_analysis, dict):
-                                price_volatility = package.volume_analysis.get('price_stability', 0.0)
-                            
-                            PriceSnapshot.objects.create(
-                                item=item,
-                                high_price=price_data.high_price,
-                                high_time=high_time,
-                                low_price=price_data.low_price,
-                                low_time=low_time,
-                                high_price_volume=price_data.volume_high,
-                                low_price_volume=price_data.volume_low,
-                                total_volume=total_volume,
-                                price_volatility=price_volatility,
-                                api_source='runescape_wiki',
-                                data_interval='latest'
-                            )
-                            
-                            prices_created += 1
+                        # Calculate volume metrics
+                        total_volume = price_data.volume_high + price_data.volume_low
                         
-                        # Create historical price points
-                        for historical_data in package.historical_5m:
-                            try:
-                                HistoricalPricePoint.objects.update_or_create(
-                                    item=item,
-                                    interval='5m',
-                                    timestamp=datetime.fromtimestamp(
-                                        historical_data.timestamp, 
-                                        tz=timezone.get_current_timezone()
-                                    ),
-                                    defaults={
-                                        'avg_high_price': historical_data.avg_high_price,
-                                        'avg_low_price': historical_data.avg_low_price,
-                                        'high_price_volume': historical_data.high_price_volume,
-                                        'low_price_volume': historical_data.low_price_volume,
-                                        'data_source': historical_data.data_source,
-                                    }
-                                )
-                                historical_points_created += 1
-                            except Exception as e:
-                                logger.warning(f"Failed to save 5m historical point for {item.name}: {e}")
+                        # Calculate volatility from volume analysis
+                        price_volatility = None
+                        if package.volume_analysis and isinstance(package.volume_analysis, dict):
+                            price_volatility = package.volume_analysis.get('price_stability', 0.0)
                         
-                        for historical_data in package.historical_1h:
-                            try:
-                                HistoricalPricePoint.objects.update_or_create(
-                                    item=item,
-                                    interval='1h',
-                                    timestamp=datetime.fromtimestamp(
-                                        historical_data.timestamp, 
-                                        tz=timezone.get_current_timezone()
-                                    ),
-                                    defaults={
-                                        'avg_high_price': historical_data.avg_high_price,
-                                        'avg_low_price': historical_data.avg_low_price,
-                                        'high_price_volume': historical_data.high_price_volume,
-                                        'low_price_volume': historical_data.low_price_volume,
-                                        'data_source': historical_data.data_source,
-                                    }
-                                )
-                                historical_points_created += 1
-                            except Exception as e:
-                                logger.warning(f"Failed to save 1h historical point for {item.name}: {e}")
-                            
-                    except IntegrityError as e:
-                        logger.warning(f"Database integrity error for item {package.item_id}: {e}")
-                    except Exception as e:
-                        logger.error(f"Database error for item {package.item_id}: {e}")
+                        snapshots.append(PriceSnapshot(
+                            item=item,
+                            high_price=price_data.high_price,
+                            high_time=high_time,
+                            low_price=price_data.low_price,
+                            low_time=low_time,
+                            high_price_volume=price_data.volume_high,
+                            low_price_volume=price_data.volume_low,
+                            total_volume=total_volume,
+                            price_volatility=price_volatility,
+                            api_source='runescape_wiki',
+                            data_interval='latest'
+                        ))
+                    
+                    # Collect historical price points for one set-based upsert
+                    historical_points.extend(
+                        self._build_historical_points(item, '5m', package.historical_5m)
+                    )
+                    historical_points.extend(
+                        self._build_historical_points(item, '1h', package.historical_1h)
+                    )
+                
+                PriceSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+                prices_created = len(snapshots)
+                
+                try:
+                    with transaction.atomic():
+                        historical_points_created = HistoricalPricePoint.bulk_upsert(historical_points)
+                except Exception as e:
+                    logger.warning(f"Failed to save {len(historical_points)} historical points: {e}")
+            
+            price_tick_publisher.publish_snapshots(snapshots)
             
             return {
-                'items_created': items_created,
-                'items_updated': items_updated,
+                'items_created': len(upsert['created']),
+                'items_updated': len(upsert['updated']),
                 'prices_created': prices_created,
                 'historical_points_created': historical_points_created
             }
@@ -724,65 +694,43 @@ class UnifiedDataIngestionService:
                                        data_1h: Dict[int, List[HistoricalPriceData]]) -> int:
         """Save only historical price data to database."""
         def save_historical():
-            points_created = 0
-            
-            with transaction.atomic():
-                # Process 5-minute data
-                for item_id, price_points in data_5m.items():
-                    try:
-                        item = Item.objects.get(item_id=item_id)
-                        for historical_data in price_points:
-                            HistoricalPricePoint.objects.update_or_create(
-                                item=item,
-                                interval='5m',
-                                timestamp=datetime.fromtimestamp(
-                                    historical_data.timestamp, 
-                                    tz=timezone.get_current_timezone()
-                                ),
-                                defaults={
-                                    'avg_high_price': historical_data.avg_high_price,
-                                    'avg_low_price': historical_data.avg_low_price,
-                                    'high_price_volume': historical_data.high_price_volume,
-                                    'low_price_volume': historical_data.low_price_volume,
-                                    'data_source': historical_data.data_source,
-                                }
-                            )
-                            points_created += 1
-                    except Item.DoesNotExist:
-                        logger.warning(f"Item {item_id} not found, skipping historical data")
-                    except Exception as e:
-                        logger.warning(f"Failed to save 5m data for item {item_id}: {e}")
-                
-                # Process 1-hour data
-                for item_id, price_points in data_1h.items():
-                    try:
-                        item = Item.objects.get(item_id=item_id)
-                        for historical_data in price_points:
-                            HistoricalPricePoint.objects.update_or_create(
-                                item=item,
-                                interval='1h',
-                                timestamp=datetime.fromtimestamp(
-                                    historical_data.timestamp, 
-                                    tz=timezone.get_current_timezone()
-                                ),
-                                defaults={
-                                    'avg_high_price': historical_data.avg_high_price,
-                                    'avg_low_price': historical_data.avg_low_price,
-                                    'high_price_volume': historical_data.high_price_volume,
-                                    'low_price_volume': historical_data.low_price_volume,
-                                    'data_source': historical_data.data_source,
-                                }
-                            )
-                            points_created += 1
-                    except Item.DoesNotExist:
+            item_ids = set(data_5m) | set(data_1h)
+            items = Item.objects.in_bulk(list(item_ids), field_name='item_id')
+            
+            historical_points = []
+            for interval, data in (('5m', data_5m), ('1h', data_1h)):
+                for item_id, price_points in data.items():
+                    item = items.get(item_id)
+                    if not item:
                         logger.warning(f"Item {item_id} not found, skipping historical data")
-                    except Exception as e:
-                        logger.warning(f"Failed to save 1h data for item {item_id}: {e}")
+                        continue
+                    historical_points.extend(
+                        self._build_historical_points(item, interval, price_points)
+                    )
             
-            return points_created
+            with transaction.atomic():
+                return HistoricalPricePoint.bulk_upsert(historical_points)
         
         return await asyncio.to_thread(save_historical)
 
+    def _build_historical_points(self, item: Item, interval: str,
+                                 price_points: List[HistoricalPriceData]) -> List[HistoricalPricePoint]:
+        """Build unsaved HistoricalPricePoint rows for HistoricalPricePoint.bulk_upsert."""
+        current_tz = timezone.get_current_timezone()
+        return [
+            HistoricalPricePoint(
+                item=item,
+                interval=interval,
+                timestamp=datetime.fromtimestamp(historical_data.timestamp, tz=current_tz),
+                avg_high_price=historical_data.avg_high_price,
+                avg_low_price=historical_data.avg_low_price,
+                high_price_volume=historical_data.high_price_volume,
+                low_price_volume=historical_data.low_price_volume,
+                data_source=historical_data.data_source,
+            )
+            for historical_data in price_points
+        ]
+
     async def get_ingestion_health_status(self) -> Dict[str, Any]:
         """Get health status of the ingestion system including historical data support."""
         try:
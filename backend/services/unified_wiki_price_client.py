@@ -8,6 +8,7 @@ Features:
 - Complete item coverage via /mapping endpoint
 - Real-time prices via /latest endpoint  
 - Volume data via /timeseries endpoint
+- Whole-market snapshot mode: /latest, /5m and /1h fetched once per cycle
 - Advanced data freshness validation
 - Volume-weighted confidence scoring
 - AI-ready data structures
@@ -15,15 +16,21 @@ Features:
 
 import asyncio
 import logging
+import time
+import weakref
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
+from django.conf import settings
 from django.utils import timezone
 from django.core.cache import cache
 
-from .runescape_wiki_client import RuneScapeWikiAPIClient, RuneScapeWikiAPIError, WikiPriceData, TimeSeriesData, ItemMetadata
+from .runescape_wiki_client import (
+    RuneScapeWikiAPIClient, RuneScapeWikiAPIError, WikiPriceData, TimeSeriesData, ItemMetadata,
+    HistoricalPriceData
+)
 
 logger = logging.getLogger(__name__)
 
@@ -70,11 +77,35 @@ class PriceData:
         return (self.high_price > 0 or self.low_price > 0) and self.high_price != self.low_price
 
 
+@dataclass
+class MarketPriceSnapshot:
+    """Whole-market /latest, /5m and /1h data joined into PriceData for every item."""
+    prices: Dict[int, PriceData]
+    fetched_at: float = field(default_factory=time.time)
+    fetch_seconds: float = 0.0
+    
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.fetched_at
+    
+    def get(self, item_id: int, max_staleness_hours: float = 24.0) -> Optional[PriceData]:
+        """Get a copy of an item's price data, or None if missing or too stale."""
+        price_data = self.prices.get(item_id)
+        if price_data is None or price_data.age_hours > max_staleness_hours:
+            return None
+        return replace(price_data)
+
+
 class UnifiedPriceClient:
     """
     Unified RuneScape Wiki API price client with comprehensive volume analysis.
     """
     
+    # Shared by every client in the process; snapshots are replaced, never mutated
+    _shared_snapshot: Optional[MarketPriceSnapshot] = None
+    # One refresh lock per event loop, shared by every client running on it
+    _snapshot_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+    
     def __init__(self):
         self.wiki_client = None
         self._cleanup_attempted = False
@@ -95,6 +126,10 @@ class UnifiedPriceClient:
         self.request_delay = 1.0  # 1 second delay between batches
         self.max_retries = 3  # More retries for reliable source
         self.consecutive_failures = 0
+        
+        # Snapshot mode: serve lookups from one whole-market fetch per cycle
+        self.snapshot_mode = getattr(settings, 'WIKI_PRICE_SNAPSHOT_MODE', True)
+        self.snapshot_max_age = getattr(settings, 'WIKI_PRICE_SNAPSHOT_MAX_AGE', 60)  # seconds
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -294,6 +329,153 @@ class UnifiedPriceClient:
             logger.warning(f"Failed to fetch comprehensive price data for item {item_id}: {e}")
             return None
     
+    def _snapshot_volume_analysis(self, five_minute: Optional[HistoricalPriceData],
+                                  one_hour: Optional[HistoricalPriceData]) -> Dict:
+        """
+        Build a volume analysis from the /5m and /1h windows.
+        
+        Coarser than the /timeseries analysis (two windows instead of 24
+        points) but needs no per-item request.
+        """
+        hour_volume = one_hour.total_volume if one_hour else 0
+        five_minute_volume = five_minute.total_volume if five_minute else 0
+        
+        # Compare the last 5 minutes, scaled to an hour, with the last hour
+        if hour_volume > 0:
+            projected_volume = five_minute_volume * 12
+            if projected_volume > hour_volume * 1.2:
+                volume_trend = "increasing"
+            elif projected_volume < hour_volume * 0.8:
+                volume_trend = "decreasing"
+            else:
+                volume_trend = "stable"
+        else:
+            volume_trend = "no_data"
+        
+        if hour_volume > 100:
+            trading_activity = "very_active"
+        elif hour_volume > 50:
+            trading_activity = "active"
+        elif hour_volume > 10:
+            trading_activity = "moderate"
+        elif hour_volume > 1:
+            trading_activity = "low"
+        else:
+            trading_activity = "inactive"
+        
+        # Fraction of the two windows with any trades
+        liquidity_score = ((hour_volume > 0) + (five_minute_volume > 0)) / 2
+        
+        # Relative spread of the hourly averages (lower value = more stable)
+        price_stability = 1.0
+        if one_hour and one_hour.avg_high_price and one_hour.avg_low_price:
+            midpoint = (one_hour.avg_high_price + one_hour.avg_low_price) / 2
+            price_stability = abs(one_hour.avg_high_price - one_hour.avg_low_price) / midpoint
+        
+        return {
+            "total_volume": hour_volume,
+            "avg_volume_per_hour": hour_volume,
+            "volume_5m": five_minute_volume,
+            "volume_trend": volume_trend,
+            "trading_activity": trading_activity,
+            "liquidity_score": round(liquidity_score, 3),
+            "price_stability": round(price_stability, 3),
+            "timestep": "1h",
+            "source": "market_snapshot"
+        }
+    
+    def _build_snapshot_price_data(self, wiki_price_data: WikiPriceData,
+                                   five_minute: Optional[HistoricalPriceData],
+                                   one_hour: Optional[HistoricalPriceData]) -> Optional[PriceData]:
+        """Join one item's /latest, /5m and /1h entries into PriceData."""
+        high_price = wiki_price_data.best_buy_price
+        low_price = wiki_price_data.best_sell_price
+        if high_price == 0 and low_price == 0:
+            return None
+        
+        timestamp = max(wiki_price_data.high_time or 0, wiki_price_data.low_time or 0)
+        quality, age_hours = self._calculate_quality(timestamp)
+        
+        price_data = PriceData(
+            item_id=wiki_price_data.item_id,
+            high_price=high_price,
+            low_price=low_price,
+            timestamp=timestamp,
+            source=DataSource.RUNESCAPE_WIKI,
+            quality=quality,
+            age_hours=age_hours,
+            # Real hourly high/low split rather than an estimate
+            volume_high=one_hour.high_price_volume if one_hour else 0,
+            volume_low=one_hour.low_price_volume if one_hour else 0,
+            raw_data=wiki_price_data.raw_data,
+            volume_analysis=self._snapshot_volume_analysis(five_minute, one_hour)
+        )
+        price_data.confidence_score = self._calculate_confidence_score(price_data)
+        return price_data
+    
+    async def get_market_snapshot(self, force_refresh: bool = False) -> MarketPriceSnapshot:
+        """
+        Get the whole-market price snapshot, refetching it once it is older
+        than snapshot_max_age.
+        
+        Args:
+            force_refresh: Refetch regardless of age
+            
+        Returns:
+            MarketPriceSnapshot covering every item in /latest
+        """
+        snapshot = UnifiedPriceClient._shared_snapshot
+        if not force_refresh and snapshot is not None and snapshot.age_seconds < self.snapshot_max_age:
+            return snapshot
+        
+        loop = asyncio.get_running_loop()
+        lock = UnifiedPriceClient._snapshot_locks.get(loop)
+        if lock is None:
+            lock = UnifiedPriceClient._snapshot_locks.setdefault(loop, asyncio.Lock())
+        
+        async with lock:
+            # Another task may have refreshed while we waited on the lock
+            snapshot = UnifiedPriceClient._shared_snapshot
+            if force_refresh or snapshot is None or snapshot.age_seconds >= self.snapshot_max_age:
+                snapshot = await self._fetch_market_snapshot()
+                UnifiedPriceClient._shared_snapshot = snapshot
+            return snapshot
+    
+    async def _fetch_market_snapshot(self) -> MarketPriceSnapshot:
+        """Fetch /latest, /5m and /1h (three requests) and join them per item."""
+        started = time.perf_counter()
+        
+        latest, five_minute, one_hour = await asyncio.gather(
+            self.wiki_client.get_latest_prices(),
+            self.wiki_client.get_historical_prices_5m(),
+            self.wiki_client.get_historical_prices_1h(),
+            return_exceptions=True
+        )
+        
+        # Prices are required; the volume windows only enrich them
+        if isinstance(latest, Exception):
+            raise latest
+        if isinstance(five_minute, Exception):
+            logger.warning(f"5m snapshot fetch failed, continuing without it: {five_minute}")
+            five_minute = {}
+        if isinstance(one_hour, Exception):
+            logger.warning(f"1h snapshot fetch failed, continuing without it: {one_hour}")
+            one_hour = {}
+        
+        prices = {}
+        for item_id, wiki_price_data in latest.items():
+            price_data = self._build_snapshot_price_data(
+                wiki_price_data, five_minute.get(item_id), one_hour.get(item_id)
+            )
+            if price_data is not None:
+                prices[item_id] = price_data
+        
+        fetch_seconds = time.perf_counter() - started
+        logger.info(f"📸 Market snapshot: {len(prices)} items "
+                    f"({len(five_minute)} with 5m, {len(one_hour)} with 1h data) in {fetch_seconds:.2f}s")
+        
+        return MarketPriceSnapshot(prices=prices, fetch_seconds=fetch_seconds)
+    
     async def get_best_price_data(self, item_id: int, max_staleness_hours: float = 24.0, include_volume: bool = True) -> Optional[PriceData]:
         """
         Get comprehensive price data with volume analysis for an item.
@@ -306,6 +488,13 @@ class UnifiedPriceClient:
         Returns:
             Comprehensive price data with volume analysis or None
         """
+        if self.snapshot_mode:
+            try:
+                snapshot = await self.get_market_snapshot()
+                return snapshot.get(item_id, max_staleness_hours)
+            except Exception as e:
+                logger.warning(f"Market snapshot unavailable, fetching item {item_id} directly: {e}")
+        
         logger.info(f"Fetching comprehensive price data for item {item_id} (max age: {max_staleness_hours}h)")
         
         # Check cache first
@@ -353,6 +542,22 @@ class UnifiedPriceClient:
         Returns:
             Dictionary mapping item_id -> PriceData
         """
+        if self.snapshot_mode:
+            try:
+                snapshot = await self.get_market_snapshot()
+                self.consecutive_failures = 0
+                price_data = {}
+                for item_id in item_ids:
+                    result = snapshot.get(item_id, max_staleness_hours)
+                    if result is not None:
+                        price_data[item_id] = result
+                logger.info(f"📊 Served {len(price_data)}/{len(item_ids)} items from market snapshot "
+                            f"({snapshot.age_seconds:.0f}s old)")
+                return price_data
+            except Exception as e:
+                self.consecutive_failures += 1
+                logger.warning(f"Market snapshot unavailable, falling back to per-item batches: {e}")
+        
         logger.info(f"🔄 Fetching comprehensive price data for {len(item_ids)} items (batch optimized)")
         
         # Process items in optimized batches for Wiki API
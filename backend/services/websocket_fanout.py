@@ -0,0 +1,134 @@
+"""
+WebSocket Fan-out Helpers
+
+Group naming and batched broadcasting for the trading WebSocket consumers:
+- Per-item and per-route channel groups, so a socket only receives what it
+  subscribed to instead of filtering a broad stream in Python
+- Updates are coalesced per (group, key) and flushed once per interval as a
+  single 'batch' frame per group
+- Each frame is serialized to JSON once and relayed verbatim by consumers
+  (see the ws_frame handlers), not re-encoded per socket
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+
+# Broad group for trading sockets without item subscriptions
+TRADING_ALL_GROUP = "trading_intelligence"
+
+# Channel layer message type relayed by the consumers' ws_frame handlers
+FRAME_MESSAGE_TYPE = "ws.frame"
+
+
+def item_group(item_id: int) -> str:
+    """Group for trading sockets subscribed to one item."""
+    return f"trading.item.{int(item_id)}"
+
+
+def route_group(route: str) -> str:
+    """Group for trading sockets subscribed to one trading route / view."""
+    return f"trading.route.{route}"
+
+
+def chart_group(item_id: int) -> str:
+    """Group for chart sockets showing one item."""
+    return f"charts.item.{int(item_id)}"
+
+
+def encode_frame(payload: Any) -> str:
+    """Serialize a client frame once for all its recipients."""
+    return json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+class BroadcastBatcher:
+    """
+    Buffers client updates per channel group and flushes them periodically.
+
+    Updates added under the same (group, key) before a flush replace each
+    other, so a burst of ticks for one item becomes its latest tick. A group
+    with a single update gets it as a plain frame; otherwise the updates go
+    out as one {'type': 'batch', 'updates': [...]} frame.
+    """
+
+    def __init__(self, channel_layer, flush_interval: float = 0.5, max_pending: int = 20000):
+        self.channel_layer = channel_layer
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[str, "OrderedDict[Hashable, Dict]"] = {}
+        self._pending_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'updates': 0, 'coalesced': 0, 'frames': 0, 'dropped': 0, 'send_errors': 0}
+
+    def add(self, group: str, key: Hashable, update: Dict):
+        """
+        Queue a client update for a group.
+
+        Args:
+            group: Channel group name
+            key: Coalescing key (e.g. ('price', item_id)); later updates replace earlier ones
+            update: JSON-serializable client message
+        """
+        updates = self._pending.setdefault(group, OrderedDict())
+        if key in updates:
+            updates.move_to_end(key)
+            self.stats['coalesced'] += 1
+        elif self._pending_count >= self.max_pending:
+            self.stats['dropped'] += 1
+            return
+        else:
+            self._pending_count += 1
+
+        updates[key] = update
+        self.stats['updates'] += 1
+
+    def start(self):
+        """Start the periodic flush loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and send anything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"WebSocket broadcast flush error: {e}")
+
+    async def flush(self):
+        """Send one frame per group with buffered updates."""
+        if not self._pending or not self.channel_layer:
+            return
+
+        pending, self._pending, self._pending_count = self._pending, {}, 0
+
+        sends = []
+        for group, updates in pending.items():
+            values = list(updates.values())
+            frame = values[0] if len(values) == 1 else {'type': 'batch', 'updates': values}
+            sends.append(self.channel_layer.group_send(
+                group, {'type': FRAME_MESSAGE_TYPE, 'text': encode_frame(frame)}
+            ))
+
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.stats['send_errors'] += 1
+                logger.warning(f"WebSocket group send failed: {result}")
+        self.stats['frames'] += len(sends)
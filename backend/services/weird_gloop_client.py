@@ -5,14 +5,16 @@ This client provides access to more recent price data than the RuneScape Wiki AP
 with better data freshness and reliability for real-time trading information.
 """
 
-import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Union
-import httpx
+import numpy as np
 from django.conf import settings
 from django.utils import timezone as django_timezone
 
+from services.async_runtime import run_sync
+from services.http_transport import HttpTransportError, http_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,36 +37,13 @@ class WeirdGloopAPIClient:
         self.client = None
     
     async def __aenter__(self):
-        """Async context manager entry."""
-        self.client = httpx.AsyncClient(
-            headers={"User-Agent": self.user_agent},
-            timeout=httpx.Timeout(30.0, connect=10.0, read=20.0, write=10.0),
-            limits=httpx.Limits(
-                max_keepalive_connections=2,  # Reduced from 5
-                max_connections=5,            # Reduced from 10
-                keepalive_expiry=30.0         # Close idle connections after 30s
-            ),
-            follow_redirects=True
-        )
+        """Async context manager entry (requests go through the shared pooled transport)."""
+        self.client = http_transport
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit with proper cleanup."""
-        if self.client:
-            try:
-                # Force close with timeout protection
-                await asyncio.wait_for(self.client.aclose(), timeout=3.0)
-            except asyncio.TimeoutError:
-                logger.warning("Weird Gloop client close timed out after 3s, forcing cleanup")
-                # Force cleanup if timeout occurs
-                try:
-                    self.client._transport.close()
-                except Exception as e:
-                    logger.debug(f"Force cleanup failed: {e}")
-            except Exception as e:
-                logger.warning(f"Error closing Weird Gloop client: {e}")
-            finally:
-                self.client = None
+        """Async context manager exit; the shared transport stays attached for concurrent callers."""
+        pass
     
     async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """
@@ -87,25 +66,19 @@ class WeirdGloopAPIClient:
         
         try:
             logger.debug(f"Making Weird Gloop request to: {url} with params: {params}")
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            logger.debug(f"Weird Gloop response: {len(str(data))} characters")
+            data = await self.client.get_json(url, params=params)
             
-            if not data.get('success', True):
+            if isinstance(data, dict) and not data.get('success', True):
                 error_msg = data.get('error', 'Unknown API error')
                 raise WeirdGloopAPIError(f"API returned error: {error_msg}")
             
             return data
             
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code} for {url}: {e.response.text}")
-            raise WeirdGloopAPIError(f"HTTP {e.response.status_code}: {e.response.text}")
+        except WeirdGloopAPIError:
+            raise
             
-        except httpx.RequestError as e:
-            logger.error(f"Request error for {url}: {str(e)}")
-            raise WeirdGloopAPIError(f"Request failed: {str(e)}")
+        except HttpTransportError as e:
+            raise WeirdGloopAPIError(str(e))
             
         except Exception as e:
             logger.error(f"Unexpected error for {url}: {str(e)}")
@@ -181,7 +154,12 @@ class WeirdGloopAPIClient:
                         result[str(item_data['id'])] = item_data
             elif isinstance(response, dict) and 'id' in response:
                 result[str(response['id'])] = response
-            
+            elif isinstance(response, dict):
+                # Multi-ID requests come back keyed by item ID
+                for key, item_data in response.items():
+                    if isinstance(item_data, dict):
+                        result[str(item_data.get('id', key))] = item_data
+
             return result
             
         except WeirdGloopAPIError as e:
@@ -468,21 +446,8 @@ class SyncWeirdGloopAPIClient:
         self.async_client = WeirdGloopAPIClient()
     
     def _run_async(self, coro):
-        """Run async coroutine in sync context."""
-        try:
-            # Try to get existing event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If we're in an async context, we need to create a new loop
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, coro)
-                    return future.result()
-            else:
-                return loop.run_until_complete(coro)
-        except RuntimeError:
-            # No event loop, create one
-            return asyncio.run(coro)
+        """Run async coroutine on the shared background event loop."""
+        return run_sync(coro)
     
     def get_exchange_status(self) -> Dict:
         """Sync version of get_exchange_status."""
@@ -583,6 +548,31 @@ class GrandExchangeTax:
         # Apply cap (5M GP max per item)
         return min(raw_tax, cls.TAX_CAP_PER_ITEM)
     
+    @classmethod
+    def calculate_tax_array(cls, sell_prices: np.ndarray, item_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Vectorized calculate_tax for many sell prices at once.
+        
+        Args:
+            sell_prices: Array of prices the items sell for in GP
+            item_ids: Optional aligned array of item IDs (for checking exemptions)
+            
+        Returns:
+            Int64 array of tax amounts in GP (rounded down)
+        """
+        sell_prices = np.asarray(sell_prices, dtype=np.int64)
+        
+        # Calculate 2% tax, capped at 5M GP per item
+        tax = np.minimum(np.floor(sell_prices * cls.TAX_RATE).astype(np.int64), cls.TAX_CAP_PER_ITEM)
+        
+        # Apply exemptions
+        exempt = sell_prices < cls.TAX_EXEMPTION_THRESHOLD
+        if item_ids is not None:
+            exempt |= np.isin(item_ids, list(cls.EXEMPT_ITEMS))
+        tax[exempt] = 0
+        
+        return tax
+    
     @classmethod
     def calculate_net_received(cls, sell_price: int, quantity: int = 1, item_id: int = None) -> int:
         """
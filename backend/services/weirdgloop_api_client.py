@@ -8,7 +8,6 @@ API Documentation: https://api.weirdgloop.org/exchange/docs
 """
 
 import asyncio
-import aiohttp
 import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
@@ -17,6 +16,8 @@ import json
 from django.core.cache import cache
 from django.conf import settings
 
+from services.http_transport import HttpTransportError, http_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,20 +47,18 @@ class WeirdGloopAPIClient:
     BASE_URL = "https://api.weirdgloop.org/exchange"
     
     def __init__(self, rate_limit_requests_per_minute=60):
-        """Initialize client with rate limiting."""
+        """Initialize client; rate limiting is enforced per host by the shared transport."""
         self.rate_limit = rate_limit_requests_per_minute
         self.session = None
-        self._rate_limiter = asyncio.Semaphore(rate_limit_requests_per_minute)
     
     async def __aenter__(self):
-        """Async context manager entry."""
-        self.session = aiohttp.ClientSession()
+        """Async context manager entry (requests go through the shared pooled transport)."""
+        self.session = http_transport
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit; the shared session stays open for reuse."""
+        self.session = None
     
     async def get_historical_data(self, 
                                 item_id: int, 
@@ -93,73 +92,60 @@ class WeirdGloopAPIClient:
         }
         
         try:
-            async with self._rate_limiter:
-                logger.info(f"Fetching historical data for item {item_id} from WeirdGloop API")
-                
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if not data.get('success', True) and 'error' in data:
-                            logger.warning(f"API returned error for item {item_id}: {data['error']}")
-                            return []
-                        
-                        # Handle response format - could be array or object
-                        if isinstance(data, list):
-                            raw_points = data
-                        elif isinstance(data, dict) and 'data' in data:
-                            raw_points = data['data']
-                        else:
-                            logger.warning(f"Unexpected response format for item {item_id}: {type(data)}")
-                            return []
-                        
-                        if not raw_points:
-                            logger.info(f"No historical data available for item {item_id}")
-                            return []
-                        
-                        # Convert to data points
-                        data_points = []
-                        for point in raw_points:
-                            try:
-                                if isinstance(point, dict) and 'price' in point and 'timestamp' in point:
-                                    data_points.append(HistoricalDataPoint.from_api_response(point))
-                                elif isinstance(point, list) and len(point) >= 2:
-                                    # Handle array format [timestamp, price, volume?]
-                                    timestamp_ms = point[0]
-                                    price = point[1]
-                                    volume = point[2] if len(point) > 2 else None
-                                    
-                                    data_points.append(HistoricalDataPoint(
-                                        price=int(price),
-                                        volume=volume,
-                                        timestamp=datetime.fromtimestamp(
-                                            timestamp_ms / 1000, 
-                                            tz=timezone.utc
-                                        )
-                                    ))
-                            except (ValueError, KeyError, IndexError) as e:
-                                logger.warning(f"Skipping malformed data point for item {item_id}: {point} - {e}")
-                                continue
-                        
-                        # Cache successful results for 1 hour
-                        if data_points:
-                            cache.set(cache_key, raw_points, 3600)
-                            logger.info(f"Fetched {len(data_points)} historical data points for item {item_id}")
+            logger.info(f"Fetching historical data for item {item_id} from WeirdGloop API")
+            data = await self.session.get_json(url, params=params)
+            
+            if isinstance(data, dict) and not data.get('success', True) and 'error' in data:
+                logger.warning(f"API returned error for item {item_id}: {data['error']}")
+                return []
+            
+            # Handle response format - could be array or object
+            if isinstance(data, list):
+                raw_points = data
+            elif isinstance(data, dict) and 'data' in data:
+                raw_points = data['data']
+            else:
+                logger.warning(f"Unexpected response format for item {item_id}: {type(data)}")
+                return []
+            
+            if not raw_points:
+                logger.info(f"No historical data available for item {item_id}")
+                return []
+            
+            # Convert to data points
+            data_points = []
+            for point in raw_points:
+                try:
+                    if isinstance(point, dict) and 'price' in point and 'timestamp' in point:
+                        data_points.append(HistoricalDataPoint.from_api_response(point))
+                    elif isinstance(point, list) and len(point) >= 2:
+                        # Handle array format [timestamp, price, volume?]
+                        timestamp_ms = point[0]
+                        price = point[1]
+                        volume = point[2] if len(point) > 2 else None
                         
-                        return data_points
-                    
-                    elif response.status == 429:
-                        logger.warning(f"Rate limited by WeirdGloop API for item {item_id}")
-                        # Wait and retry once
-                        await asyncio.sleep(60)
-                        return await self.get_historical_data(item_id, game, filter_type)
-                    
-                    else:
-                        logger.error(f"HTTP {response.status} error fetching data for item {item_id}")
-                        return []
+                        data_points.append(HistoricalDataPoint(
+                            price=int(price),
+                            volume=volume,
+                            timestamp=datetime.fromtimestamp(
+                                timestamp_ms / 1000, 
+                                tz=timezone.utc
+                            )
+                        ))
+                except (ValueError, KeyError, IndexError) as e:
+                    logger.warning(f"Skipping malformed data point for item {item_id}: {point} - {e}")
+                    continue
+            
+            # Cache successful results for 1 hour
+            if data_points:
+                cache.set(cache_key, raw_points, 3600)
+                logger.info(f"Fetched {len(data_points)} historical data points for item {item_id}")
+            
+            return data_points
         
-        except asyncio.TimeoutError:
-            logger.error(f"Timeout fetching historical data for item {item_id}")
+        except HttpTransportError as e:
+            # 429s and 5xx were already retried with backoff by the transport
+            logger.error(f"Failed to fetch historical data for item {item_id}: {e}")
             return []
         except Exception as e:
             logger.error(f"Unexpected error fetching historical data for item {item_id}: {e}")
@@ -246,20 +232,17 @@ class WeirdGloopAPIClient:
         }
         
         try:
-            async with self._rate_limiter:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Cache for 24 hours (item info doesn't change often)
-                        if data:
-                            cache.set(cache_key, data, 86400)
-                        
-                        return data
-                    else:
-                        logger.warning(f"Failed to get item info for {item_id}: HTTP {response.status}")
-                        return None
+            data = await self.session.get_json(url, params=params)
+            
+            # Cache for 24 hours (item info doesn't change often)
+            if data:
+                cache.set(cache_key, data, 86400)
+            
+            return data
         
+        except HttpTransportError as e:
+            logger.warning(f"Failed to get item info for {item_id}: {e}")
+            return None
         except Exception as e:
             logger.error(f"Error getting item info for {item_id}: {e}")
             return None
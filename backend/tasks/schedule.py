@@ -40,6 +40,12 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(minute=0),  # Every hour
     },
     
+    # Refresh precomputed similar items after the nightly embedding runs
+    'precompute-similar-items': {
+        'task': 'tasks.sync_data.precompute_similar_items',
+        'schedule': crontab(hour=3, minute=0),  # Daily at 3 AM UTC
+    },
+    
     # Generate daily market summary twice per day
     'daily-market-summary': {
         'task': 'tasks.sync_data.generate_daily_market_summary',
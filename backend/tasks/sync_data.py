@@ -4,19 +4,25 @@ Celery tasks for syncing data from RuneScape Wiki API.
 
 import logging
 from typing import Dict, List, Any
+import numpy as np
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from datetime import datetime
 
 from apps.items.models import Item, ItemCategory, ItemCategoryMapping
 from apps.prices.models import PriceSnapshot, ProfitCalculation
-from apps.embeddings.models import ItemEmbedding
+from apps.embeddings.models import SimilarityCache
 from services.api_client import SyncRuneScapeWikiClient
 from services.embedding_service import SyncOllamaEmbeddingService
+from services.embedding_refresh import embedding_refresh_pipeline
 from services.faiss_manager import FaissVectorDatabase
 from services.websocket_service import WebSocketService
 from services.ai_service import SyncOpenRouterAIService
+from services.market_matrix import mark_market_data_updated
+from services.timeseries_client import timeseries_client
+from services.price_tick_stream import price_tick_publisher, tick_from_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -36,46 +42,45 @@ def sync_item_mapping(self):
         if not isinstance(mapping_data, list):
             raise ValueError("Invalid mapping data format")
         
-        created_count = 0
-        updated_count = 0
+        items = [
+            Item(
+                item_id=item_data['id'],
+                name=item_data.get('name', ''),
+                examine=item_data.get('examine', ''),
+                icon=item_data.get('icon', ''),
+                value=item_data.get('value', 0),
+                high_alch=item_data.get('highalch', 0),
+                low_alch=item_data.get('lowalch', 0),
+                limit=item_data.get('limit', 0),
+                members=item_data.get('members', False),
+                is_active=True,
+            )
+            for item_data in mapping_data
+            if item_data.get('id')
+        ]
         
         with transaction.atomic():
-            for item_data in mapping_data:
-                item_id = item_data.get('id')
-                if not item_id:
-                    continue
-                
-                # Create or update item
-                item, created = Item.objects.update_or_create(
-                    item_id=item_id,
-                    defaults={
-                        'name': item_data.get('name', ''),
-                        'examine': item_data.get('examine', ''),
-                        'icon': item_data.get('icon', ''),
-                        'value': item_data.get('value', 0),
-                        'high_alch': item_data.get('highalch', 0),
-                        'low_alch': item_data.get('lowalch', 0),
-                        'limit': item_data.get('limit', 0),
-                        'members': item_data.get('members', False),
-                        'is_active': True,
-                        'updated_at': timezone.now()
-                    }
-                )
-                
-                if created:
-                    created_count += 1
-                    # Create initial profit calculation record
-                    ProfitCalculation.objects.get_or_create(
-                        item=item,
-                        defaults={
-                            'current_profit': 0,
-                            'current_profit_margin': 0.0
-                        }
-                    )
-                else:
-                    updated_count += 1
+            # Writes only new or changed items
+            upsert = Item.bulk_upsert(items)
+            
+            # Create initial profit calculation records for items that lack one
+            missing_profit_calcs = Item.objects.filter(profit_calc__isnull=True).values_list('id', flat=True)
+            ProfitCalculation.objects.bulk_create(
+                [
+                    ProfitCalculation(item_id=item_pk, current_profit=0, current_profit_margin=0.0)
+                    for item_pk in missing_profit_calcs
+                ],
+                batch_size=1000,
+                ignore_conflicts=True
+            )
+        
+        created_count = len(upsert['created'])
+        updated_count = len(upsert['updated'])
         
-        logger.info(f"Item mapping sync completed: {created_count} created, {updated_count} updated")
+        logger.info(
+            f"Item mapping sync completed: {created_count} created, {updated_count} updated, "
+            f"{len(upsert['unchanged'])} unchanged"
+        )
         
         # Schedule embedding generation for new items
         if created_count > 0:
@@ -93,6 +98,21 @@ def sync_item_mapping(self):
         raise
 
 
+def _influx_price_record(price_snapshot: PriceSnapshot) -> Dict:
+    """Build a TimeSeriesClient price record from a freshly created snapshot."""
+    return {
+        'item_id': price_snapshot.item.item_id,
+        'price_data': {
+            'high_price': price_snapshot.high_price,
+            'low_price': price_snapshot.low_price,
+            'high_volume': price_snapshot.high_price_volume,
+            'low_volume': price_snapshot.low_price_volume,
+            'total_volume': price_snapshot.total_volume,
+        },
+        'timestamp': price_snapshot.created_at,
+    }
+
+
 @shared_task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
 def sync_hot_items_5m(self):
     """
@@ -121,6 +141,8 @@ def sync_hot_items_5m(self):
             raise ValueError("Invalid 5m volume data format")
         
         updated_count = 0
+        influx_records = []
+        price_ticks = []
         websocket_service = WebSocketService()
         
         with transaction.atomic():
@@ -159,6 +181,8 @@ def sync_hot_items_5m(self):
                     data_interval='5m',
                     api_source='runescape_wiki'
                 )
+                influx_records.append(_influx_price_record(price_snapshot))
+                price_ticks.append(tick_from_snapshot(price_snapshot))
                 
                 # Update profit calculation
                 profit_calc = ProfitCalculation.objects.get(item=item)
@@ -176,6 +200,15 @@ def sync_hot_items_5m(self):
                         'hot_item_update'
                     )
         
+        if updated_count:
+            mark_market_data_updated()
+        
+        # Buffered; the whole batch goes out in one or two InfluxDB writes
+        timeseries_client.write_bulk_price_data(influx_records)
+        
+        # Reactive consumers pick these up from the price tick stream
+        price_tick_publisher.publish(price_ticks)
+        
         logger.info(f"5-minute hot items sync completed: {updated_count} items updated")
         
         return {
@@ -216,6 +249,8 @@ def sync_warm_items_1h(self):
             raise ValueError("Invalid 1h data format")
         
         updated_count = 0
+        influx_records = []
+        price_ticks = []
         
         with transaction.atomic():
             for item_id_str, price_info in hour_data['data'].items():
@@ -244,6 +279,8 @@ def sync_warm_items_1h(self):
                     data_interval='1h',
                     api_source='runescape_wiki'
                 )
+                influx_records.append(_influx_price_record(price_snapshot))
+                price_ticks.append(tick_from_snapshot(price_snapshot))
                 
                 # Update profit calculation
                 profit_calc = ProfitCalculation.objects.get(item=item)
@@ -252,6 +289,15 @@ def sync_warm_items_1h(self):
                 
                 updated_count += 1
         
+        if updated_count:
+            mark_market_data_updated()
+        
+        # Buffered; the whole batch goes out in one or two InfluxDB writes
+        timeseries_client.write_bulk_price_data(influx_records)
+        
+        # Reactive consumers pick these up from the price tick stream
+        price_tick_publisher.publish(price_ticks)
+        
         logger.info(f"1-hour warm items sync completed: {updated_count} items updated")
         
         return {
@@ -282,6 +328,8 @@ def sync_latest_prices(self):
         price_data = prices_data['data']
         updated_count = 0
         profit_updates = []
+        influx_records = []
+        price_ticks = []
         websocket_service = WebSocketService()
         
         with transaction.atomic():
@@ -309,6 +357,8 @@ def sync_latest_prices(self):
                     low_price=price_info.get('low'),
                     low_time=low_time
                 )
+                influx_records.append(_influx_price_record(price_snapshot))
+                price_ticks.append(tick_from_snapshot(price_snapshot))
                 
                 # Update profit calculation
                 profit_calc, _ = ProfitCalculation.objects.get_or_create(
@@ -345,6 +395,15 @@ def sync_latest_prices(self):
                         }
                     })
         
+        if updated_count:
+            mark_market_data_updated()
+        
+        # Buffered; the whole batch goes out in one or two InfluxDB writes
+        timeseries_client.write_bulk_price_data(influx_records)
+        
+        # Reactive consumers pick these up from the price tick stream
+        price_tick_publisher.publish(price_ticks)
+        
         # Send WebSocket notifications for significant price changes
         for update in profit_updates[:50]:  # Limit to avoid spam
             websocket_service.send_price_update(
@@ -369,76 +428,104 @@ def sync_latest_prices(self):
 @shared_task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 2, 'countdown': 300})
 def generate_embeddings_for_new_items(self):
     """
-    Generate embeddings for items that don't have them yet.
-    This is a heavy task and should be run less frequently.
+    Embed new items and re-embed items whose source text changed.
+    
+    Source texts are hashed and compared with the stored content hash, so a
+    run only calls the embedding model for new or changed items, and the
+    search FAISS index is patched in place rather than rebuilt.
     """
     try:
-        logger.info("Starting embedding generation for new items...")
-        
-        # Get items without embeddings
-        items_without_embeddings = Item.objects.filter(
-            is_active=True,
-            embedding__isnull=True
-        )[:100]  # Process in batches
+        logger.info("Starting incremental embedding refresh...")
         
-        if not items_without_embeddings.exists():
-            logger.info("No items need embedding generation")
-            return {'status': 'success', 'items_processed': 0}
-        
-        embedding_service = SyncOllamaEmbeddingService()
-        faiss_db = FaissVectorDatabase()
+        stats = embedding_refresh_pipeline.refresh(
+            max_items=getattr(settings, 'EMBEDDING_REFRESH_MAX_ITEMS', None)
+        )
         
-        # Prepare texts for embedding
-        items_data = []
-        texts = []
+        logger.info(f"Embedding refresh completed: {stats['embedded']} embeddings written")
         
-        for item in items_without_embeddings:
-            source_text = ItemEmbedding.create_source_text(item)
-            items_data.append(item)
-            texts.append(source_text)
+        return {
+            'status': 'success',
+            'embeddings_created': stats['embedded'],
+            'faiss_updated': stats['faiss_upserted'] + stats['faiss_backfilled'],
+            **stats
+        }
         
-        # Generate embeddings in batch
-        embeddings = embedding_service.generate_embeddings_batch(texts, batch_size=5)
+    except Exception as e:
+        logger.error(f"Embedding generation failed: {e}")
+        raise
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 2, 'countdown': 600})
+def precompute_similar_items(self, index_name: str = "osrs_items", k: int = 20,
+                             threshold: float = 0.5, batch_size: int = 1024):
+    """
+    Fill SimilarityCache with the nearest neighbours of every indexed item.
+    
+    Queries the FAISS index in batches with its own stored vectors, so the
+    whole corpus takes a handful of FAISS calls and bulk upserts.
+    """
+    try:
+        logger.info("Starting similar-item precompute...")
+        started_at = timezone.now()
         
-        created_count = 0
-        faiss_updates = []
+        faiss_db = FaissVectorDatabase(index_name=index_name)
+        item_ids, vectors = faiss_db.export_vectors()
+        if not len(item_ids):
+            logger.info("FAISS index is empty, nothing to precompute")
+            return {'status': 'success', 'items_processed': 0, 'pairs_cached': 0}
         
-        with transaction.atomic():
-            for item, embedding, source_text in zip(items_data, embeddings, texts):
-                if embedding is None:
-                    logger.warning(f"Failed to generate embedding for item {item.name}")
-                    continue
-                
-                # Create embedding record
-                item_embedding = ItemEmbedding.objects.create(
-                    item=item,
-                    vector=embedding,
-                    source_text=source_text,
-                    model_name='snowflake-arctic-embed2',
-                    model_version='latest'
-                )
-                
-                # Prepare for FAISS update
-                faiss_updates.append((item.item_id, embedding))
-                created_count += 1
+        pk_by_item_id = dict(
+            Item.objects.filter(item_id__in=item_ids.tolist()).values_list('item_id', 'id')
+        )
         
-        # Update FAISS index
-        for item_id, embedding in faiss_updates:
-            faiss_db.add_vector(item_id, embedding)
+        pairs_cached = 0
+        for start in range(0, len(item_ids), batch_size):
+            batch_ids = item_ids[start:start + batch_size]
+            # k + 1 because every item finds itself first
+            neighbour_ids, scores = faiss_db.search_batch(
+                vectors[start:start + batch_size], k=k + 1, threshold=threshold
+            )
+            
+            keep = (neighbour_ids >= 0) & (neighbour_ids != batch_ids[:, None])
+            rows, cols = np.nonzero(keep)
+            
+            entries = []
+            for source_id, neighbour_id, score in zip(
+                batch_ids[rows].tolist(), neighbour_ids[rows, cols].tolist(), scores[rows, cols].tolist()
+            ):
+                item_a = pk_by_item_id.get(source_id)
+                item_b = pk_by_item_id.get(neighbour_id)
+                if item_a and item_b:
+                    entries.append(SimilarityCache(
+                        item_a_id=item_a, item_b_id=item_b, similarity_score=score
+                    ))
+            
+            SimilarityCache.objects.bulk_create(
+                entries,
+                batch_size=5000,
+                update_conflicts=True,
+                unique_fields=['item_a', 'item_b'],
+                update_fields=['similarity_score', 'updated_at'],
+            )
+            pairs_cached += len(entries)
         
-        if faiss_updates:
-            faiss_db.save_index()
+        # Pairs not refreshed in this pass are no longer nearest neighbours
+        stale_deleted, _ = SimilarityCache.objects.filter(updated_at__lt=started_at).delete()
         
-        logger.info(f"Embedding generation completed: {created_count} embeddings created")
+        logger.info(
+            f"Similar-item precompute completed: {len(item_ids)} items, "
+            f"{pairs_cached} pairs cached, {stale_deleted} stale pairs removed"
+        )
         
         return {
             'status': 'success',
-            'embeddings_created': created_count,
-            'faiss_updated': len(faiss_updates)
+            'items_processed': len(item_ids),
+            'pairs_cached': pairs_cached,
+            'stale_deleted': stale_deleted
         }
         
     except Exception as e:
-        logger.error(f"Embedding generation failed: {e}")
+        logger.error(f"Similar-item precompute failed: {e}")
         raise
 
 
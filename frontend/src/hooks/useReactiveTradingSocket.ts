@@ -80,6 +80,7 @@ export type TradingSocketMessage =
   | { type: 'current_recommendations'; route_type: string; recommendations: any[]; timestamp: string }
   | { type: 'market_alerts'; alerts: MarketAlert[]; timestamp: string }
   | { type: 'error'; message: string }
+  | { type: 'batch'; updates: TradingSocketMessage[] }  // Several updates flushed together
 
 export interface TradingSocketState {
   isConnected: boolean
@@ -342,96 +343,104 @@ export const useReactiveTradingSocket = (): UseReactiveTradingSocketReturn => {
           }))
         }
 
-        ws.current.onmessage = (event) => {
-          try {
-            const message: TradingSocketMessage = JSON.parse(event.data)
-            setState(prev => ({ ...prev, lastMessage: message }))
-
-            switch (message.type) {
-              case 'connection_established':
-                console.log('🔌 Trading WebSocket connected:', message.message)
-                break
-
-              case 'market_event':
-                setState(prev => ({
-                  ...prev,
-                  marketEvents: [message, ...prev.marketEvents.slice(0, 99)]
-                }))
-                break
-
-              case 'recommendation_update':
-                setState(prev => ({
-                  ...prev,
-                  recommendations: {
-                    ...prev.recommendations,
-                    [message.route_type]: message.recommendations
-                  }
-                }))
-                break
-
-              case 'price_update':
-                setState(prev => ({
-                  ...prev,
-                  priceUpdates: {
-                    ...prev.priceUpdates,
-                    [message.item_id]: message
-                  }
-                }))
-                break
-
-              case 'pattern_detected':
-                setState(prev => ({
-                  ...prev,
-                  patternDetections: [message, ...prev.patternDetections.slice(0, 49)]
-                }))
-                break
-
-              case 'volume_surge':
-                setState(prev => ({
-                  ...prev,
-                  volumeSurges: [message, ...prev.volumeSurges.slice(0, 49)]
-                }))
-                break
-
-              case 'current_recommendations':
-                setState(prev => ({
-                  ...prev,
-                  recommendations: {
-                    ...prev.recommendations,
-                    [message.route_type]: message.recommendations
-                  }
-                }))
-                break
-
-              case 'market_alerts':
-                setState(prev => ({ ...prev, marketAlerts: message.alerts }))
-                break
-
-              case 'subscription_confirmed':
-                // Reduced logging: only log initial route subscriptions, not every item
-                if (message.subscription.startsWith('route_')) {
-                  console.log('✅ Route subscription confirmed:', message.subscription)
+        const handleMessage = (message: TradingSocketMessage): void => {
+          switch (message.type) {
+            case 'connection_established':
+              console.log('🔌 Trading WebSocket connected:', message.message)
+              break
+
+            case 'market_event':
+              setState(prev => ({
+                ...prev,
+                marketEvents: [message, ...prev.marketEvents.slice(0, 99)]
+              }))
+              break
+
+            case 'recommendation_update':
+              setState(prev => ({
+                ...prev,
+                recommendations: {
+                  ...prev.recommendations,
+                  [message.route_type]: message.recommendations
                 }
-                break
-
-              case 'unsubscription_confirmed':
-                // Reduced logging: only log route unsubscriptions, not every item
-                if (message.subscription.startsWith('route_')) {
-                  console.log('🔌 Route unsubscription confirmed:', message.subscription)
+              }))
+              break
+
+            case 'price_update':
+              setState(prev => ({
+                ...prev,
+                priceUpdates: {
+                  ...prev.priceUpdates,
+                  [message.item_id]: message
+                }
+              }))
+              break
+
+            case 'pattern_detected':
+              setState(prev => ({
+                ...prev,
+                patternDetections: [message, ...prev.patternDetections.slice(0, 49)]
+              }))
+              break
+
+            case 'volume_surge':
+              setState(prev => ({
+                ...prev,
+                volumeSurges: [message, ...prev.volumeSurges.slice(0, 49)]
+              }))
+              break
+
+            case 'current_recommendations':
+              setState(prev => ({
+                ...prev,
+                recommendations: {
+                  ...prev.recommendations,
+                  [message.route_type]: message.recommendations
                 }
-                break
+              }))
+              break
+
+            case 'market_alerts':
+              setState(prev => ({ ...prev, marketAlerts: message.alerts }))
+              break
+
+            case 'subscription_confirmed':
+              // Reduced logging: only log initial route subscriptions, not every item
+              if (message.subscription.startsWith('route_')) {
+                console.log('✅ Route subscription confirmed:', message.subscription)
+              }
+              break
 
-              case 'unsubscribe_from_item':
-                console.log('📤 Backend unsubscribed from item:', message.item_id)
-                break
+            case 'unsubscription_confirmed':
+              // Reduced logging: only log route unsubscriptions, not every item
+              if (message.subscription.startsWith('route_')) {
+                console.log('🔌 Route unsubscription confirmed:', message.subscription)
+              }
+              break
+
+            case 'unsubscribe_from_item':
+              console.log('📤 Backend unsubscribed from item:', message.item_id)
+              break
+
+            case 'error':
+              console.error('❌ Trading WebSocket error:', message.message)
+              setState(prev => ({ ...prev, error: message.message }))
+              break
+
+            default:
+              console.log('📨 Unknown trading message type:', message)
+          }
+        }
 
-              case 'error':
-                console.error('❌ Trading WebSocket error:', message.message)
-                setState(prev => ({ ...prev, error: message.message }))
-                break
+        ws.current.onmessage = (event) => {
+          try {
+            const message: TradingSocketMessage = JSON.parse(event.data)
+            setState(prev => ({ ...prev, lastMessage: message }))
 
-              default:
-                console.log('📨 Unknown trading message type:', message)
+            if (message.type === 'batch') {
+              message.updates.forEach(handleMessage)
+            } else {
+              handleMessage(message)
             }
           } catch (error) {
             console.error('Error parsing trading WebSocket message:', error)